@@ -0,0 +1,113 @@
+"""
+Compare the pandas and Polars backends across data sizes: results must match, timings are printed.
+
+Index computation is timed per method on synthetic data with a share of
+missing values. With --xlsx, reading a workbook is timed as well. Without
+polars installed only the pandas timings are shown.
+
+Usage:
+  python benchmarks/bench_backends.py                       # 10k, 100k, 1M rows
+  python benchmarks/bench_backends.py --sizes 5000 50000 --impute district_mean
+  python benchmarks/bench_backends.py --xlsx demo_data_full.xlsx
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.federal_districts import FEDERAL_DISTRICTS   # noqa: E402
+from src.config.settings import IMPUTATION_METHODS           # noqa: E402
+from src.core.backends import get_backend                    # noqa: E402
+from src.core.calculator import CalculationError             # noqa: E402
+
+N_INDICATORS = 6
+METHODS = ['min_max_normalized', 'simple_average', 'pca', 'cbr_method', 'winsorized', 'percentile_rank']
+
+
+def make_frame(rows, missing):
+    rng = np.random.default_rng(42)
+    regions = np.array([r for d in FEDERAL_DISTRICTS.values() for r in d], dtype=object)
+    df = pd.DataFrame({'Регион': regions[rng.integers(0, len(regions), rows)]})
+    for j in range(N_INDICATORS):
+        col = rng.uniform(0, 100, rows)
+        col[rng.random(rows) < missing] = np.nan
+        df[f"Показатель {j + 1}"] = col
+    return df
+
+
+def timed(fn, repeat):
+    fn()  # прогрев
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--impute', choices=list(IMPUTATION_METHODS), default='mean')
+    parser.add_argument('--missing', type=float, default=0.02, help="Share of missing values")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--xlsx', help="Also time reading this workbook")
+    args = parser.parse_args(argv)
+
+    pandas_backend = get_backend('pandas')
+    try:
+        polars_backend = get_backend('polars')
+    except CalculationError as e:
+        print(f"{e}; only pandas timings are shown")
+        polars_backend = None
+
+    print(f"impute={args.impute}  missing={args.missing:.0%}")
+    print(f"{'rows':>9}  {'method':<20}{'pandas, ms':>12}{'polars, ms':>12}{'speedup':>10}  parity")
+
+    failed = 0
+    for rows in args.sizes:
+        df = make_frame(rows, args.missing)
+        columns = [c for c in df.columns if c != 'Регион']
+        for method in METHODS:
+            # PCA не работает с пропусками без заполнения
+            impute = 'drop' if method == 'pca' and args.impute == 'skip' else args.impute
+
+            def run(backend):
+                # Новая таблица на каждый замер: без кэша калькуляторов и подготовленных данных
+                return lambda: backend.calculate_values(df.copy(deep=False), method, None, columns, impute)
+
+            expected, t_pd = timed(run(pandas_backend), args.repeat)
+            if polars_backend is None:
+                print(f"{rows:>9}  {method:<20}{t_pd * 1000:>12.1f}")
+                continue
+            actual, t_pl = timed(run(polars_backend), args.repeat)
+
+            ok = np.allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+            failed += not ok
+            print(f"{rows:>9}  {method:<20}{t_pd * 1000:>12.1f}{t_pl * 1000:>12.1f}"
+                  f"{t_pd / t_pl:>9.1f}x  {'ok' if ok else 'MISMATCH'}")
+
+    if args.xlsx:
+        print(f"\nreading {os.path.basename(args.xlsx)}")
+        expected, t_pd = timed(lambda: pandas_backend.read_excel(args.xlsx), args.repeat)
+        line = f"{'read_excel':<31}{t_pd * 1000:>12.1f}"
+        if polars_backend is not None:
+            actual, t_pl = timed(lambda: polars_backend.read_excel(args.xlsx), args.repeat)
+            numeric = expected.select_dtypes(include=[np.number]).columns
+            ok = (list(actual.columns) == list(expected.columns)
+                  and np.allclose(actual[numeric].to_numpy(np.float64),
+                                  expected[numeric].to_numpy(np.float64), equal_nan=True))
+            failed += not ok
+            line += f"{t_pl * 1000:>12.1f}{t_pd / t_pl:>9.1f}x  {'ok' if ok else 'MISMATCH'}"
+        print(line)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
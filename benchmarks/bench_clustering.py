@@ -0,0 +1,90 @@
+"""
+Time, peak memory and quality of indicator-profile clustering on synthetic blobs.
+
+Rows are drawn around known profile centres, so the recovered groups can be
+checked against the truth (purity: share of rows whose group's majority
+truth label matches their own). Each size runs in a fresh process, because
+peak RSS only grows.
+
+Usage:
+  python benchmarks/bench_clustering.py                    # 10k, 100k, 1M rows, k chosen by silhouette
+  python benchmarks/bench_clustering.py --sizes 200000 --k 4
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_INDICATORS = 6
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def make_frame(rows, groups, missing):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(42)
+    centres = rng.uniform(10, 90, (groups, N_INDICATORS))
+    truth = rng.integers(0, groups, rows)
+    block = centres[truth] + rng.normal(0, 4, (rows, N_INDICATORS))
+    block[rng.random(block.shape) < missing] = np.nan
+    df = pd.DataFrame(block, columns=[f"Показатель {j + 1}" for j in range(N_INDICATORS)])
+    df.insert(0, 'Регион', [f"Филиал {i % 5000}" for i in range(rows)])
+    return df, truth
+
+
+def purity(labels, truth):
+    import numpy as np
+
+    present = labels >= 0
+    labels, truth = labels[present], truth[present]
+    table = np.zeros((labels.max() + 1, truth.max() + 1), dtype=np.int64)
+    np.add.at(table, (labels, truth), 1)
+    return table.max(axis=1).sum() / len(labels)
+
+
+def run_case(rows, groups, k, missing, queue):
+    from src.core.calculator import IndexCalculator
+    from src.core.clustering import cluster_profiles
+
+    df, truth = make_frame(rows, groups, missing)
+    calc = IndexCalculator(df, impute='mean')
+    calc.n_prepared  # подготовка матрицы - вне замера
+    before = peak_rss_mb()
+    t0 = time.perf_counter()
+    result = cluster_profiles(calc, k=k)
+    elapsed = time.perf_counter() - t0
+    queue.put((before, peak_rss_mb(), elapsed, result.k, result.silhouette, purity(result.labels, truth)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--groups', type=int, default=4, help="True number of profile groups")
+    parser.add_argument('--k', type=int, help="Fixed number of groups (default: chosen by silhouette)")
+    parser.add_argument('--missing', type=float, default=0.02, help="Share of missing values")
+    args = parser.parse_args(argv)
+
+    ctx = mp.get_context('spawn')
+    print(f"groups={args.groups}  k={args.k or 'auto'}  missing={args.missing:.0%}")
+    print(f"{'rows':>9}{'time, s':>10}{'extra RSS, MB':>15}{'k':>4}{'silhouette':>12}{'purity':>9}")
+    for rows in args.sizes:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=run_case, args=(rows, args.groups, args.k, args.missing, queue))
+        proc.start()
+        before, peak, elapsed, k, silhouette, share = queue.get()
+        proc.join()
+        print(f"{rows:>9}{elapsed:>10.2f}{peak - before:>15.1f}{k:>4}{silhouette:>12.3f}{share:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
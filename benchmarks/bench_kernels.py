@@ -0,0 +1,90 @@
+"""
+Compare the numba kernels with the NumPy fallback: timings are printed.
+
+Without numba installed only the NumPy timings are shown. Parity of the two
+paths is tested in tests/test_kernels.py; the parity column here is only a
+sanity check on the benchmark data.
+
+Usage:
+  python benchmarks/bench_kernels.py               # 1M rows
+  python benchmarks/bench_kernels.py --rows 200000 --repeat 10
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import jit, kernels                # noqa: E402
+from src.core.aggregation import grouped_stats   # noqa: E402
+
+N_INDICATORS = 4
+N_GROUPS = 9
+
+
+def make_cases(rows):
+    rng = np.random.default_rng(42)
+    values = rng.uniform(0, 100, (rows, N_INDICATORS))
+    values[:, -1] = 7.0  # постоянный показатель
+    sparse = values.copy()
+    sparse[rng.random(sparse.shape) < 0.05] = np.nan
+    weights = np.full(N_INDICATORS, 1.0 / N_INDICATORS)
+    index = rng.uniform(0, 100, rows)
+    codes = rng.integers(0, N_GROUPS, rows).astype(np.int32)
+
+    return {
+        'column_min_max': lambda: np.concatenate(kernels.column_min_max(values)),
+        'minmax_weighted_sum': lambda: kernels.minmax_weighted_sum(values, weights, 0.5),
+        'minmax_weighted_sum f32': lambda: kernels.minmax_weighted_sum(
+            values.astype(np.float32), weights, 0.5),
+        'nan_minmax_weighted_sum': lambda: kernels.nan_minmax_weighted_sum(sparse, weights, 0.5),
+        'grouped_stats': lambda: np.concatenate(
+            [v for v in grouped_stats(codes, index, N_GROUPS).values()]),
+    }
+
+
+def timed(fn, repeat):
+    fn()  # прогрев (и компиляция/загрузка из кэша для numba)
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    has_jit = jit.AVAILABLE
+    print(f"rows={args.rows}  numba={'yes' if has_jit else 'no'}")
+    print(f"{'kernel':<26}{'numpy, ms':>12}{'numba, ms':>12}{'speedup':>10}  parity")
+
+    failed = 0
+    for name, fn in make_cases(args.rows).items():
+        jit.AVAILABLE = False
+        expected, t_np = timed(fn, args.repeat)
+        if not has_jit:
+            print(f"{name:<26}{t_np * 1000:>12.2f}")
+            continue
+        jit.AVAILABLE = True
+        actual, t_jit = timed(fn, args.repeat)
+
+        rtol = 1e-5 if 'f32' in name else 1e-9
+        ok = np.allclose(actual, expected, rtol=rtol, atol=rtol, equal_nan=True)
+        failed += not ok
+        print(f"{name:<26}{t_np * 1000:>12.2f}{t_jit * 1000:>12.2f}{t_np / t_jit:>9.1f}x  "
+              f"{'ok' if ok else 'MISMATCH'}")
+
+    jit.AVAILABLE = has_jit
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""
+Peak RSS benchmark for index calculation on a large synthetic dataset.
+
+Each configuration runs in a fresh process, because peak RSS only grows.
+
+Usage:
+  python benchmarks/bench_memory.py               # 1M rows
+  python benchmarks/bench_memory.py --rows 200000
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_INDICATORS = 4
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def make_frame(rows):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(42)
+    data = {'Регион': np.array([f"Филиал {i % 5000}" for i in range(rows)], dtype=object)}
+    for j in range(N_INDICATORS):
+        data[f"Показатель {j + 1}"] = rng.uniform(0, 100, rows)
+    return pd.DataFrame(data)
+
+
+def run_case(rows, dtype_name, method, frame, queue):
+    import numpy as np
+    from src.core.calculator import IndexCalculator
+
+    df = make_frame(rows)
+    before = peak_rss_mb()
+    t0 = time.perf_counter()
+    calc = IndexCalculator(df, dtype=getattr(np, dtype_name))
+    if frame:
+        calc.calculate_index(method)
+    else:
+        calc.calculate_values(method)
+    elapsed = time.perf_counter() - t0
+    queue.put((before, peak_rss_mb(), elapsed, calc.dataset.nbytes / 2 ** 20))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    ctx = mp.get_context('spawn')
+    print(f"rows={args.rows:,} indicators={N_INDICATORS}")
+    print(f"{'dtype':<8}{'method':<20}{'output':<8}{'data MB':>9}{'peak MB':>9}{'delta MB':>10}{'sec':>8}")
+    for dtype_name in ('float64', 'float32'):
+        for method in ('min_max_normalized', 'cbr_method', 'pca'):
+            for frame in (False, True):
+                queue = ctx.Queue()
+                p = ctx.Process(target=run_case, args=(args.rows, dtype_name, method, frame, queue))
+                p.start()
+                before, peak, elapsed, data_mb = queue.get()
+                p.join()
+                print(f"{dtype_name:<8}{method:<20}{'frame' if frame else 'array':<8}"
+                      f"{data_mb:>9.1f}{peak:>9.1f}{peak - before:>10.1f}{elapsed:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Time the outlier-robust methods (winsorized, percentile_rank) against min-max and full-sort references.
+
+The references compute the same quantities with np.sort (winsorization
+bounds) and argsort-based average ranks, so the table shows what selection
+with np.partition saves. Results are checked against the references:
+winsorized must match exactly; percentile_rank is exact up to
+PERCENTILE_KNOTS rows and grid-interpolated beyond (max error is printed).
+
+Usage:
+  python benchmarks/bench_robust.py                        # 10k, 100k, 1M rows
+  python benchmarks/bench_robust.py --sizes 85 5000 --missing 0
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.settings import WINSOR_LIMITS, PERCENTILE_KNOTS  # noqa: E402
+from src.core.calculator import IndexCalculator                  # noqa: E402
+from src.core.dataset import CompactDataset                      # noqa: E402
+
+N_INDICATORS = 6
+
+
+def make_block(rows, missing):
+    rng = np.random.default_rng(42)
+    # Логнормальные показатели: длинный правый хвост, как у крупных регионов
+    block = rng.lognormal(3.0, 1.0, (rows, N_INDICATORS))
+    block[rng.random(block.shape) < missing] = np.nan
+    return block
+
+
+def sorted_winsorized(block, weights):
+    present = ~np.isnan(block)
+    ordered = np.sort(block, axis=0)
+    counts = present.sum(axis=0)
+    bounds = []
+    for q in WINSOR_LIMITS:
+        pos = q * (counts - 1)
+        lo, hi = np.floor(pos).astype(int), np.ceil(pos).astype(int)
+        cols = np.arange(block.shape[1])
+        bounds.append(ordered[lo, cols] + (ordered[hi, cols] - ordered[lo, cols]) * (pos - lo))
+    low, high = bounds
+    span = high - low
+    norm = np.where(span > 0, (np.clip(block, low, high) - low) / np.where(span > 0, span, 1), 0.5)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 * np.nansum(norm * weights, axis=1) / (present @ weights)
+
+
+def sorted_percentile_rank(block, weights):
+    ranks = np.full(block.shape, np.nan)
+    for j in range(block.shape[1]):
+        col = block[:, j]
+        rows = np.flatnonzero(~np.isnan(col))
+        values = col[rows]
+        order = np.argsort(values, kind='stable')
+        ordered = values[order]
+        # Средний ранг для совпадающих значений
+        first = np.searchsorted(ordered, values, 'left')
+        last = np.searchsorted(ordered, values, 'right') - 1
+        ranks[rows, j] = (first + last) / 2 / max(len(values) - 1, 1)
+    present = ~np.isnan(ranks)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 * (np.where(present, ranks, 0.0) @ weights) / (present @ weights)
+
+
+def timed(fn, repeat):
+    fn()  # прогрев
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--missing', type=float, default=0.02, help="Share of missing values")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    weights = np.full(N_INDICATORS, 1.0 / N_INDICATORS)
+    references = {'winsorized': sorted_winsorized, 'percentile_rank': sorted_percentile_rank}
+
+    print(f"missing={args.missing:.0%}  limits={WINSOR_LIMITS}  knots={PERCENTILE_KNOTS}")
+    print(f"{'rows':>9}  {'method':<20}{'calc, ms':>10}{'sort, ms':>10}{'speedup':>9}{'max error':>12}")
+    failed = 0
+    for rows in args.sizes:
+        block = make_block(rows, args.missing)
+        dataset = CompactDataset.from_dataframe(
+            pd.DataFrame(block, columns=[f"Показатель {j + 1}" for j in range(N_INDICATORS)]))
+
+        def run(method):
+            # Новый калькулятор на каждый замер: без кэша значений
+            return lambda: IndexCalculator.from_dataset(dataset).calculate_values(method)
+
+        _, t_minmax = timed(run('min_max_normalized'), args.repeat)
+        print(f"{rows:>9}  {'min_max_normalized':<20}{t_minmax * 1000:>10.1f}")
+        for method, reference in references.items():
+            actual, t_calc = timed(run(method), args.repeat)
+            expected, t_sort = timed(lambda: reference(block, weights), args.repeat)
+            error = float(np.nanmax(np.abs(actual - expected)))
+            exact = method == 'winsorized' or rows <= PERCENTILE_KNOTS
+            ok = error < (1e-9 if exact else 0.1)
+            failed += not ok
+            print(f"{rows:>9}  {method:<20}{t_calc * 1000:>10.1f}{t_sort * 1000:>10.1f}"
+                  f"{t_sort / t_calc:>8.1f}x{error:>12.2e}{'' if ok else '  MISMATCH'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+"""
+Time Moran's I and LISA permutation inference and check them against a direct computation.
+
+Global I is compared with the dense textbook formula. Local pseudo p-values
+are compared with a per-region loop that draws its own permutations, so they
+agree only up to Monte Carlo noise (the tolerance scales with 1/sqrt(P)).
+
+Usage:
+  python benchmarks/bench_spatial.py
+  python benchmarks/bench_spatial.py --permutations 99999 --replicate 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.federal_districts import FEDERAL_DISTRICTS          # noqa: E402
+from src.core.spatial import SpatialWeights, morans_i, local_moran  # noqa: E402
+
+
+def make_frame(replicate, seed=42):
+    """Every region `replicate` times (branch-level data), values with a north-south trend"""
+    rng = np.random.default_rng(seed)
+    regions = [r for d in FEDERAL_DISTRICTS.values() for r in d] * replicate
+    trend = np.repeat(np.arange(len(FEDERAL_DISTRICTS)), [len(d) for d in FEDERAL_DISTRICTS.values()])
+    values = np.tile(trend * 5.0, replicate) + rng.normal(50, 10, len(regions))
+    return pd.DataFrame({'Регион': regions, 'Индекс': values})
+
+
+def dense_moran(values, weights):
+    mask = ~weights.islands
+    W = weights.subset(mask).matrix.toarray()
+    z = values[mask] - values[mask].mean()
+    return len(z) / W.sum() * (z @ W @ z) / (z @ z)
+
+
+def loop_lisa_p(values, weights, permutations, seed):
+    """Reference: for each region draw its own k values from the others"""
+    rng = np.random.default_rng(seed)
+    mask = ~weights.islands
+    w = weights.subset(mask)
+    z = values[mask] - values[mask].mean()
+    n = len(z)
+    local = (n - 1) * z * w.lag(z) / (z @ z)
+    p = np.empty(n)
+    for i in range(n):
+        others = np.delete(z, i)
+        k = w.cardinalities[i]
+        draws = np.array([rng.choice(others, k, replace=False).mean() for _ in range(permutations)])
+        sims = (n - 1) * z[i] * draws / (z @ z)
+        larger = (sims >= local[i]).sum()
+        p[i] = (min(larger, permutations - larger) + 1) / (permutations + 1)
+    return p
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--permutations', type=int, default=9999)
+    parser.add_argument('--replicate', type=int, default=1, help="Copies of every region")
+    parser.add_argument('--reference-permutations', type=int, default=999,
+                        help="Permutations of the slow per-region reference loop")
+    args = parser.parse_args(argv)
+
+    df = make_frame(args.replicate)
+    values = df['Индекс'].to_numpy()
+
+    start = time.perf_counter()
+    weights = SpatialWeights.from_regions(df['Регион'].tolist())
+    t_weights = time.perf_counter() - start
+    start = time.perf_counter()
+    moran = morans_i(values, weights, args.permutations, seed=0)
+    t_global = time.perf_counter() - start
+    start = time.perf_counter()
+    lisa = local_moran(df, weights, permutations=args.permutations, seed=0)
+    t_local = time.perf_counter() - start
+
+    print(f"rows={len(df)}  edges={weights.binary.nnz // 2}  permutations={args.permutations}")
+    print(f"weights {t_weights * 1000:8.1f} ms")
+    print(f"global  {t_global * 1000:8.1f} ms  {moran}")
+    print(f"local   {t_local * 1000:8.1f} ms  clusters: {lisa['Кластер'].value_counts().to_dict()}")
+
+    failed = 0
+    ok = np.isclose(moran.I, dense_moran(values, weights), rtol=1e-12)
+    failed += not ok
+    print(f"global I vs dense formula: {'ok' if ok else 'MISMATCH'}")
+
+    if args.replicate == 1:
+        reference = loop_lisa_p(values, weights, args.reference_permutations, seed=1)
+        ours = lisa.loc[~weights.islands, 'p'].to_numpy()
+        # Стандартная ошибка оценки p по меньшему из двух чисел перестановок
+        tolerance = 5 * np.sqrt(0.25 / args.reference_permutations)
+        worst = np.abs(ours - reference).max()
+        ok = worst <= tolerance
+        failed += not ok
+        print(f"local p vs per-region loop: max |Δp| = {worst:.4f} "
+              f"(tolerance {tolerance:.4f}) {'ok' if ok else 'MISMATCH'}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""
+Concurrency benchmark for IndexCalculator shared between many threads.
+
+A barrier releases all threads at once, so identical requests really do race.
+Every round checks that each distinct request was computed exactly once and
+that all threads got the same array. Throughput is reported for a cold cache
+and for a warm one. The exit code is non-zero if a check fails.
+
+Usage:
+  python benchmarks/bench_threads.py
+  python benchmarks/bench_threads.py --rows 1000000 --threads 64 --keys 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.calculator import IndexCalculator  # noqa: E402
+from src.core.dataset import CompactDataset      # noqa: E402
+
+N_INDICATORS = 4
+METHODS = ['min_max_normalized', 'cbr_method', 'simple_average']
+
+
+def make_calculator(rows):
+    rng = np.random.default_rng(42)
+    values = rng.uniform(0, 100, (rows, N_INDICATORS))
+    dataset = CompactDataset(np.full(rows, -1, dtype=np.int32), np.array([]), values,
+                             [f"Показатель {j + 1}" for j in range(N_INDICATORS)])
+    return IndexCalculator.from_dataset(dataset)
+
+
+def make_requests(n_keys):
+    """n_keys distinct (method, weights) pairs"""
+    requests = []
+    for i in range(n_keys):
+        weights = None if i < len(METHODS) else [1.0 + i] + [1.0] * (N_INDICATORS - 1)
+        requests.append((METHODS[i % len(METHODS)], weights))
+    return requests
+
+
+def storm(calc, requests, threads, per_thread):
+    """All threads start together and cycle through the requests; returns (seconds, results)"""
+    barrier = threading.Barrier(threads)
+
+    def worker(t):
+        barrier.wait()
+        out = []
+        for i in range(per_thread):
+            method, weights = requests[(t + i) % len(requests)]
+            out.append(((method, str(weights)), calc.calculate_values(method, weights)))
+        return out
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = [r for chunk in pool.map(worker, range(threads)) for r in chunk]
+    return time.perf_counter() - start, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--keys', type=int, default=6, help="Distinct (method, weights) requests")
+    parser.add_argument('--per-thread', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    calc = make_calculator(args.rows)
+    calc.dataset.fingerprint  # хэш данных - вне замеров
+    requests = make_requests(args.keys)
+    calls = args.threads * args.per_thread
+
+    # Счётчик фактических расчётов
+    computed = []
+    compute = calc._compute
+
+    def counting_compute(method, w):
+        computed.append(method)
+        return compute(method, w)
+
+    calc._compute = counting_compute
+
+    failed = 0
+    print(f"rows={args.rows} threads={args.threads} distinct requests={args.keys} calls/round={calls}")
+    for r in range(args.rounds):
+        calc.clear_cache()
+        computed.clear()
+        cold, results = storm(calc, requests, args.threads, args.per_thread)
+        n_cold = len(computed)
+        warm, _ = storm(calc, requests, args.threads, args.per_thread)
+
+        by_key = {}
+        consistent = all(by_key.setdefault(key, arr) is arr for key, arr in results)
+        ok = n_cold == len(requests) and len(computed) == n_cold and consistent
+        failed += not ok
+        print(f"round {r + 1}: cold {calls / cold:>10.0f} calls/s ({n_cold} computations)  "
+              f"warm {calls / warm:>10.0f} calls/s  {'ok' if ok else 'FAILED'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -5,6 +5,8 @@ FinTrustMap launcher. Run from project root.
 Usage:
   python run.py              # Launch GUI
   python run.py --cli --file data.xlsx --method pca --export out.xlsx
+  python run.py --cli --file data.xlsx --top 5 --watch   # extra flags go to the CLI
+  python run.py --cli scenarios scenarios.yaml            # CLI subcommands
 """
 import sys
 import argparse
@@ -17,12 +19,13 @@ def main(argv=None):
     parser = argparse.ArgumentParser(prog='fintrustmap', description='FinTrustMap launcher')
     parser.add_argument('--cli', action='store_true', help='Run in CLI mode (non-GUI)')
     parser.add_argument('--file', '-f', help='Excel file for CLI mode')
-    parser.add_argument('--method', '-m', default='min_max_normalized', help='Calculation method for CLI')
+    parser.add_argument('--method', '-m', help='Calculation method for CLI')
     parser.add_argument('--export', '-e', help='Export path for CLI results')
-    args = parser.parse_args(argv)
+    args, extra = parser.parse_known_args(argv)
 
     if args.cli:
-        cli_argv = []
+        # Subcommands and extra flags go first, as given
+        cli_argv = list(extra)
         if args.file:
             cli_argv += ['--file', args.file]
         if args.method:
@@ -31,6 +34,8 @@ def main(argv=None):
             cli_argv += ['--export', args.export]
         return run_cli(cli_argv)
     else:
+        if extra:
+            parser.error(f"unrecognized arguments: {' '.join(extra)}")
         run_gui()
         return 0
 
@@ -0,0 +1,208 @@
+"""
+Соседство регионов России (общая сухопутная граница) для пространственного анализа
+"""
+
+# Названия совпадают со справочником FEDERAL_DISTRICTS. Граница учитывается
+# только между субъектами РФ; государственные границы не включены.
+REGION_NEIGHBORS = {
+    # Центральный ФО
+    "Белгородская область": ["Курская область", "Воронежская область"],
+    "Брянская область": ["Смоленская область", "Калужская область", "Орловская область",
+                         "Курская область"],
+    "Владимирская область": ["Московская область", "Ярославская область", "Ивановская область",
+                             "Нижегородская область", "Рязанская область"],
+    "Воронежская область": ["Белгородская область", "Курская область", "Липецкая область",
+                            "Тамбовская область", "Саратовская область", "Волгоградская область",
+                            "Ростовская область"],
+    "Ивановская область": ["Ярославская область", "Костромская область", "Нижегородская область",
+                           "Владимирская область"],
+    "Калужская область": ["Смоленская область", "Брянская область", "Орловская область",
+                          "Тульская область", "Московская область", "Москва"],
+    "Костромская область": ["Ярославская область", "Вологодская область", "Кировская область",
+                            "Нижегородская область", "Ивановская область"],
+    "Курская область": ["Брянская область", "Орловская область", "Липецкая область",
+                        "Воронежская область", "Белгородская область"],
+    "Липецкая область": ["Орловская область", "Тульская область", "Рязанская область",
+                         "Тамбовская область", "Воронежская область", "Курская область"],
+    "Московская область": ["Москва", "Тверская область", "Смоленская область", "Калужская область",
+                           "Тульская область", "Рязанская область", "Владимирская область",
+                           "Ярославская область"],
+    "Орловская область": ["Брянская область", "Калужская область", "Тульская область",
+                          "Липецкая область", "Курская область"],
+    "Рязанская область": ["Московская область", "Владимирская область", "Нижегородская область",
+                          "Республика Мордовия", "Пензенская область", "Тамбовская область",
+                          "Липецкая область", "Тульская область"],
+    "Смоленская область": ["Псковская область", "Тверская область", "Московская область",
+                           "Калужская область", "Брянская область"],
+    "Тамбовская область": ["Рязанская область", "Пензенская область", "Саратовская область",
+                           "Воронежская область", "Липецкая область"],
+    "Тверская область": ["Псковская область", "Новгородская область", "Вологодская область",
+                         "Ярославская область", "Московская область", "Смоленская область"],
+    "Тульская область": ["Московская область", "Рязанская область", "Липецкая область",
+                         "Орловская область", "Калужская область"],
+    "Ярославская область": ["Тверская область", "Вологодская область", "Костромская область",
+                            "Ивановская область", "Владимирская область", "Московская область"],
+    "Москва": ["Московская область", "Калужская область"],
+
+    # Северо-Западный ФО
+    "Республика Карелия": ["Мурманская область", "Архангельская область", "Вологодская область",
+                           "Ленинградская область"],
+    "Республика Коми": ["Ненецкий АО", "Архангельская область", "Кировская область", "Пермский край",
+                        "Свердловская область", "Ханты-Мансийский автономный округ",
+                        "Ямало-Ненецкий автономный округ"],
+    "Архангельская область": ["Республика Карелия", "Вологодская область", "Кировская область",
+                              "Республика Коми", "Ненецкий АО"],
+    "Вологодская область": ["Республика Карелия", "Архангельская область", "Кировская область",
+                            "Костромская область", "Ярославская область", "Тверская область",
+                            "Новгородская область", "Ленинградская область"],
+    "Калининградская область": [],
+    "Ленинградская область": ["Санкт-Петербург", "Республика Карелия", "Вологодская область",
+                              "Новгородская область", "Псковская область"],
+    "Мурманская область": ["Республика Карелия"],
+    "Новгородская область": ["Ленинградская область", "Вологодская область", "Тверская область",
+                             "Псковская область"],
+    "Псковская область": ["Ленинградская область", "Новгородская область", "Тверская область",
+                          "Смоленская область"],
+    "Санкт-Петербург": ["Ленинградская область"],
+    "Ненецкий АО": ["Архангельская область", "Республика Коми", "Ямало-Ненецкий автономный округ"],
+
+    # Южный ФО
+    "Республика Адыгея": ["Краснодарский край"],
+    "Республика Калмыкия": ["Астраханская область", "Волгоградская область", "Ростовская область",
+                            "Ставропольский край", "Республика Дагестан"],
+    "Республика Крым": ["Севастополь"],
+    "Краснодарский край": ["Республика Адыгея", "Ростовская область", "Ставропольский край",
+                           "Карачаево-Черкесская Республика"],
+    "Астраханская область": ["Волгоградская область", "Республика Калмыкия"],
+    "Волгоградская область": ["Астраханская область", "Республика Калмыкия", "Ростовская область",
+                              "Воронежская область", "Саратовская область"],
+    "Ростовская область": ["Краснодарский край", "Ставропольский край", "Республика Калмыкия",
+                           "Волгоградская область", "Воронежская область"],
+    "Севастополь": ["Республика Крым"],
+
+    # Северо-Кавказский ФО
+    "Республика Дагестан": ["Республика Калмыкия", "Ставропольский край", "Чеченская Республика"],
+    "Ингушетия": ["Чеченская Республика", "Республика Северная Осетия — Алания"],
+    "Кабардино-Балкарская Республика": ["Ставропольский край", "Карачаево-Черкесская Республика",
+                                        "Республика Северная Осетия — Алания"],
+    "Карачаево-Черкесская Республика": ["Краснодарский край", "Ставропольский край",
+                                        "Кабардино-Балкарская Республика"],
+    "Республика Северная Осетия — Алания": ["Кабардино-Балкарская Республика", "Ставропольский край",
+                                            "Ингушетия", "Чеченская Республика"],
+    "Чеченская Республика": ["Республика Дагестан", "Ставропольский край", "Ингушетия",
+                             "Республика Северная Осетия — Алания"],
+    "Ставропольский край": ["Краснодарский край", "Ростовская область", "Республика Калмыкия",
+                            "Республика Дагестан", "Чеченская Республика",
+                            "Республика Северная Осетия — Алания", "Кабардино-Балкарская Республика",
+                            "Карачаево-Черкесская Республика"],
+
+    # Приволжский ФО
+    "Республика Башкортостан": ["Пермский край", "Удмуртская Республика", "Республика Татарстан",
+                                "Оренбургская область", "Челябинская область", "Свердловская область"],
+    "Республика Марий Эл": ["Кировская область", "Республика Татарстан", "Чувашская Республика",
+                            "Нижегородская область"],
+    "Республика Мордовия": ["Нижегородская область", "Чувашская Республика", "Ульяновская область",
+                            "Пензенская область", "Рязанская область"],
+    "Республика Татарстан": ["Республика Марий Эл", "Кировская область", "Удмуртская Республика",
+                             "Республика Башкортостан", "Оренбургская область", "Самарская область",
+                             "Ульяновская область", "Чувашская Республика"],
+    "Удмуртская Республика": ["Кировская область", "Пермский край", "Республика Башкортостан",
+                              "Республика Татарстан"],
+    "Чувашская Республика": ["Нижегородская область", "Республика Марий Эл", "Республика Татарстан",
+                             "Ульяновская область", "Республика Мордовия"],
+    "Кировская область": ["Архангельская область", "Республика Коми", "Пермский край",
+                          "Удмуртская Республика", "Республика Татарстан", "Республика Марий Эл",
+                          "Нижегородская область", "Костромская область", "Вологодская область"],
+    "Нижегородская область": ["Костромская область", "Кировская область", "Республика Марий Эл",
+                              "Чувашская Республика", "Республика Мордовия", "Рязанская область",
+                              "Владимирская область", "Ивановская область"],
+    "Оренбургская область": ["Самарская область", "Республика Татарстан", "Республика Башкортостан",
+                             "Челябинская область", "Саратовская область"],
+    "Пензенская область": ["Рязанская область", "Республика Мордовия", "Ульяновская область",
+                           "Саратовская область", "Тамбовская область"],
+    "Пермский край": ["Республика Коми", "Свердловская область", "Республика Башкортостан",
+                      "Удмуртская Республика", "Кировская область"],
+    "Самарская область": ["Ульяновская область", "Республика Татарстан", "Оренбургская область",
+                          "Саратовская область"],
+    "Саратовская область": ["Пензенская область", "Ульяновская область", "Самарская область",
+                            "Оренбургская область", "Волгоградская область", "Воронежская область",
+                            "Тамбовская область"],
+    "Ульяновская область": ["Чувашская Республика", "Республика Татарстан", "Самарская область",
+                            "Саратовская область", "Пензенская область", "Республика Мордовия"],
+
+    # Уральский ФО
+    "Курганская область": ["Челябинская область", "Свердловская область", "Тюменская область"],
+    "Свердловская область": ["Пермский край", "Республика Коми", "Ханты-Мансийский автономный округ",
+                             "Тюменская область", "Курганская область", "Челябинская область",
+                             "Республика Башкортостан"],
+    "Тюменская область": ["Свердловская область", "Курганская область", "Омская область",
+                          "Ханты-Мансийский автономный округ"],
+    "Челябинская область": ["Республика Башкортостан", "Свердловская область", "Курганская область",
+                            "Оренбургская область"],
+    "Ханты-Мансийский автономный округ": ["Ямало-Ненецкий автономный округ", "Республика Коми",
+                                          "Свердловская область", "Тюменская область",
+                                          "Томская область", "Красноярский край"],
+    "Ямало-Ненецкий автономный округ": ["Ненецкий АО", "Республика Коми",
+                                        "Ханты-Мансийский автономный округ", "Красноярский край"],
+
+    # Сибирский ФО
+    "Республика Алтай": ["Алтайский край", "Кемеровская область", "Республика Хакасия",
+                         "Республика Тыва"],
+    "Республика Бурятия": ["Иркутская область", "Забайкальский край", "Республика Тыва"],
+    "Республика Тыва": ["Республика Алтай", "Республика Хакасия", "Красноярский край",
+                        "Иркутская область", "Республика Бурятия"],
+    "Республика Хакасия": ["Красноярский край", "Кемеровская область", "Республика Алтай",
+                           "Республика Тыва"],
+    "Алтайский край": ["Новосибирская область", "Кемеровская область", "Республика Алтай"],
+    "Забайкальский край": ["Республика Бурятия", "Иркутская область", "Республика Саха (Якутия)",
+                           "Амурская область"],
+    "Красноярский край": ["Ямало-Ненецкий автономный округ", "Ханты-Мансийский автономный округ",
+                          "Томская область", "Кемеровская область", "Республика Хакасия",
+                          "Республика Тыва", "Иркутская область", "Республика Саха (Якутия)"],
+    "Иркутская область": ["Красноярский край", "Республика Тыва", "Республика Бурятия",
+                          "Забайкальский край", "Республика Саха (Якутия)"],
+    "Кемеровская область": ["Томская область", "Новосибирская область", "Алтайский край",
+                            "Республика Алтай", "Республика Хакасия", "Красноярский край"],
+    "Новосибирская область": ["Омская область", "Томская область", "Кемеровская область",
+                              "Алтайский край"],
+    "Омская область": ["Тюменская область", "Томская область", "Новосибирская область"],
+    "Томская область": ["Ханты-Мансийский автономный округ", "Красноярский край",
+                        "Кемеровская область", "Новосибирская область", "Омская область"],
+
+    # Дальневосточный ФО
+    "Республика Саха (Якутия)": ["Красноярский край", "Иркутская область", "Забайкальский край",
+                                 "Амурская область", "Хабаровский край", "Магаданская область",
+                                 "Чукотский автономный округ"],
+    "Камчатский край": ["Чукотский автономный округ", "Магаданская область"],
+    "Приморский край": ["Хабаровский край"],
+    "Хабаровский край": ["Приморский край", "Еврейская автономная область", "Амурская область",
+                         "Республика Саха (Якутия)", "Магаданская область"],
+    "Амурская область": ["Забайкальский край", "Республика Саха (Якутия)", "Хабаровский край",
+                         "Еврейская автономная область"],
+    "Магаданская область": ["Республика Саха (Якутия)", "Чукотский автономный округ",
+                            "Камчатский край", "Хабаровский край"],
+    "Сахалинская область": [],
+    "Еврейская автономная область": ["Хабаровский край", "Амурская область"],
+    "Чукотский автономный округ": ["Республика Саха (Якутия)", "Магаданская область",
+                                   "Камчатский край"],
+}
+
+# Постоянные транспортные связи регионов без общей сухопутной границы
+# (мост, паромная переправа). Подключаются по запросу, чтобы в анализе
+# не было регионов без соседей, кроме эксклава.
+REGION_LINKS = [
+    ("Республика Крым", "Краснодарский край"),      # Крымский мост
+    ("Сахалинская область", "Хабаровский край"),    # переправа Ванино - Холмск
+]
+
+
+def get_neighbors(region_name: str, links: bool = False) -> list:
+    """Возвращает соседей региона (links - с учётом транспортных связей)"""
+    neighbors = list(REGION_NEIGHBORS.get(region_name, []))
+    if links:
+        for a, b in REGION_LINKS:
+            if region_name == a:
+                neighbors.append(b)
+            elif region_name == b:
+                neighbors.append(a)
+    return neighbors
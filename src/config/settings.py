@@ -2,6 +2,8 @@
 Конфигурация и константы приложения
 """
 
+import os
+
 # Версия приложения
 VERSION = "2.0.0"
 LICENSE = "MIT"
@@ -39,7 +41,21 @@ COLORMAPS = [
 
 # Методы расчёта индекса
 CALCULATION_METHODS = {
-    'cbr_method': 'Методика ЦБ РФ'
+    'cbr_method': 'Методика ЦБ РФ',
+    'winsorized': 'Min-Max с обрезкой выбросов (5-95 перцентили)',
+    'percentile_rank': 'Перцентильный ранг',
+}
+
+# Устойчивые к выбросам методы: уровни квантилей обрезки и узлы сетки рангов
+WINSOR_LIMITS = (0.05, 0.95)
+PERCENTILE_KNOTS = 1001  # при большем числе строк ранг интерполируется по сетке квантилей
+
+# Обработка пропущенных значений показателей
+IMPUTATION_METHODS = {
+    'skip': 'Без пропущенных показателей (веса перераспределяются)',
+    'mean': 'Среднее по показателю',
+    'district_mean': 'Среднее по федеральному округу',
+    'drop': 'Исключить регионы с пропусками',
 }
 
 # Настройки matplotlib
@@ -53,9 +69,22 @@ HEATMAP_GRID_COLS = 2
 HEATMAP_ANNOT_SIZE = 8
 HEATMAP_LINEWIDTH = 1.5
 
+# Пространственный анализ (Moran's I, LISA)
+SPATIAL_PERMUTATIONS = 9999
+SPATIAL_ALPHA = 0.05
+SPATIAL_BATCH = 1000  # перестановок за один векторизованный шаг
+
+# Группировка регионов по профилю показателей (mini-batch k-means)
+CLUSTER_K_RANGE = (2, 8)  # диапазон количества групп при автоматическом выборе
+CLUSTER_BATCH_SIZE = 2048
+CLUSTER_MAX_ITER = 200
+CLUSTER_SAMPLE = 10000  # строк для начальных центров (и 1/5 - для оценки силуэта)
+CLUSTER_CHUNK_ROWS = 65536
+
 # Форматы файлов
 EXCEL_FORMATS = "Excel Files (*.xlsx *.xls);;All Files (*)"
 EXPORT_FORMAT = "Excel Files (*.xlsx)"
+HTML_EXPORT_FORMAT = "HTML Files (*.html)"
 
 # Логирование
 LOG_TIMESTAMP_FORMAT = "%H:%M:%S"
@@ -64,8 +93,32 @@ LOG_FONT_SIZE = 9
 
 # Валидация данных
 REQUIRED_COLUMN = "Регион"
+SHEET_COLUMN = "Лист"
+POPULATION_COLUMN = "Население"  # веса для агрегатов по округам
+# Числовые колонки, которые не являются показателями индекса: служебные
+# колонки загрузки и результаты расчёта ('Индекс', 'Группа')
+NON_INDICATOR_COLUMNS = (SHEET_COLUMN, POPULATION_COLUMN, "Индекс", "Группа")
 MIN_NUMERIC_COLUMNS = 1
+NUMERIC_LIKE_THRESHOLD = 0.9  # доля значений текстовой колонки, похожих на числа
+STREAM_CHUNK_ROWS = 10000
+
+# Допустимые диапазоны показателей {колонка: (min, max)}
+INDICATOR_RANGES = {
+    "Качество кредитного портфеля (NPL, %)": (0, 100),
+    "Проникновение цифровых услуг (%)": (0, 100),
+    "Удовлетворенность клиентов (1-5)": (1, 5),
+}
+
+# JIT-ядра numba (если установлена); FINTRUSTMAP_DISABLE_NUMBA=1 - только NumPy
+NUMBA_ENABLED = not os.environ.get("FINTRUSTMAP_DISABLE_NUMBA")
 
 # Кэширование
 CACHE_ENABLED = True
-CACHE_SIZE_LIMIT = 100  # MB
\ No newline at end of file
+CACHE_SIZE_LIMIT = 100  # MB
+
+# История расчётов (SQLite)
+HISTORY_DB_PATH = os.path.join(os.path.expanduser("~"), ".fintrustmap", "history.sqlite")
+
+# Отслеживание изменений файла
+WATCH_POLL_INTERVAL = 0.5  # сек
+WATCH_DEBOUNCE = 1.0  # сек
\ No newline at end of file
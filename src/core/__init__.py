@@ -2,12 +2,55 @@
 Модуль базовой функциональности
 """
 
+from .dataset import CompactDataset
+from .validation import (
+    ValidationIssue, ValidationReport, ValidationSchema, validate_dataframe
+)
 from .data_loader import DataLoader, DataLoadError
 from .calculator import IndexCalculator, CalculationError
+from .aggregation import RollupEngine, grouped_stats
+from .layout import DistrictLayout
+from .ranking import top_n, bottom_n, ranked_frame, compare_ranks, movers
+from .watcher import FileWatcher, FrameDiff, diff_frames
+from .history import HistoryStore
+from .pipeline import Pipeline, PipelineResult, PipelineError
+from .backends import Backend, get_backend
+from .spatial import SpatialWeights, SpatialError, MoranResult, morans_i, local_moran
+from .clustering import ClusterResult, ClusteringError, cluster_profiles
 
 __all__ = [
+    'CompactDataset',
+    'ValidationIssue',
+    'ValidationReport',
+    'ValidationSchema',
+    'validate_dataframe',
     'DataLoader',
     'DataLoadError',
     'IndexCalculator',
-    'CalculationError'
+    'CalculationError',
+    'RollupEngine',
+    'grouped_stats',
+    'DistrictLayout',
+    'top_n',
+    'bottom_n',
+    'ranked_frame',
+    'compare_ranks',
+    'movers',
+    'FileWatcher',
+    'FrameDiff',
+    'diff_frames',
+    'HistoryStore',
+    'Pipeline',
+    'PipelineResult',
+    'PipelineError',
+    'Backend',
+    'get_backend',
+    'SpatialWeights',
+    'SpatialError',
+    'MoranResult',
+    'morans_i',
+    'local_moran',
+    'ClusterResult',
+    'ClusteringError',
+    'cluster_profiles'
 ]
\ No newline at end of file
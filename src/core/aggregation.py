@@ -0,0 +1,207 @@
+"""
+Агрегирование индекса по уровням: филиал → регион → федеральный округ
+"""
+
+from typing import Dict, List, Optional
+
+import pandas as pd
+import numpy as np
+
+from ..config.settings import REQUIRED_COLUMN, POPULATION_COLUMN
+from ..config.federal_districts import FEDERAL_DISTRICTS
+from . import jit
+
+OTHER_DISTRICT = "Прочие"
+DISTRICT_COLUMN = "Федеральный округ"
+
+
+def grouped_stats(codes: np.ndarray, values: np.ndarray, n_groups: int,
+                  weights: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Статистики значений по группам без цикла по группам
+
+    Args:
+        codes: Номер группы для каждой строки (0..n_groups-1; -1 - пропустить)
+        values: Значения
+        n_groups: Количество групп
+        weights: Веса строк (например, население) для взвешенного среднего
+
+    Returns:
+        Словарь массивов длины n_groups: count, mean, median, min, max, std
+        и weighted (если заданы веса). Для пустых групп - NaN
+    """
+    keep = (codes >= 0) & ~np.isnan(values)
+    codes = codes[keep]
+    values = values[keep].astype(np.float64, copy=False)
+
+    if jit.AVAILABLE:
+        count, total, total_sq = jit.group_moments(codes, values, n_groups)
+    else:
+        count = np.bincount(codes, minlength=n_groups)
+        total = np.bincount(codes, weights=values, minlength=n_groups)
+        total_sq = np.bincount(codes, weights=values * values, minlength=n_groups)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        var = (total_sq - count * mean * mean) / (count - 1)
+    std = np.sqrt(np.clip(var, 0, None))
+
+    # Медиана, минимум и максимум - по значениям, отсортированным внутри групп
+    order = np.lexsort((values, codes))
+    ordered = values[order]
+    starts = np.concatenate(([0], np.cumsum(count)[:-1]))
+    present = count > 0
+    lo = starts + (count - 1) // 2
+    hi = starts + count // 2
+
+    median = np.full(n_groups, np.nan)
+    vmin = np.full(n_groups, np.nan)
+    vmax = np.full(n_groups, np.nan)
+    median[present] = (ordered[lo[present]] + ordered[hi[present]]) / 2
+    vmin[present] = ordered[starts[present]]
+    vmax[present] = ordered[starts[present] + count[present] - 1]
+
+    stats = {'count': count, 'mean': mean, 'median': median,
+             'min': vmin, 'max': vmax, 'std': std}
+
+    if weights is not None:
+        w = np.asarray(weights, dtype=np.float64)[keep]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats['weighted'] = (np.bincount(codes, weights=values * w, minlength=n_groups)
+                                 / np.bincount(codes, weights=w, minlength=n_groups))
+    return stats
+
+
+class RollupEngine:
+    """
+    Агрегаты индекса по федеральным округам (и по регионам для филиалов).
+
+    Справочники переводятся в целочисленные массивы кодов один раз при
+    создании; каждый расчёт - это get_indexer по названиям и несколько
+    bincount по всем строкам сразу.
+    """
+
+    def __init__(self, districts: Dict[str, List[str]] = FEDERAL_DISTRICTS,
+                 lower_mapping: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            districts: Справочник {федеральный округ: [регионы]}
+            lower_mapping: Справочник нижнего уровня {филиал/муниципалитет: регион}
+        """
+        self._district_names = list(districts) + [OTHER_DISTRICT]
+        other = len(self._district_names) - 1
+
+        regions = [r for d in districts.values() for r in d]
+        region_district = [i for i, d in enumerate(districts.values()) for _ in d]
+
+        # Регионы нижнего уровня, отсутствующие в справочнике округов, - в "Прочие"
+        extra = []
+        if lower_mapping:
+            known = set(regions)
+            extra = list(dict.fromkeys(r for r in lower_mapping.values() if r not in known))
+
+        self._regions = pd.Index(regions + extra)
+        self._region_district = np.array(region_district + [other] * len(extra), dtype=np.int32)
+
+        if lower_mapping:
+            self._units = pd.Index(list(lower_mapping))
+            self._unit_region = self._regions.get_indexer(list(lower_mapping.values())).astype(np.int32)
+        else:
+            self._units = None
+            self._unit_region = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, unit_column: str,
+                   region_column: str = REQUIRED_COLUMN,
+                   districts: Dict[str, List[str]] = FEDERAL_DISTRICTS) -> 'RollupEngine':
+        """
+        Строит движок со справочником нижнего уровня из таблицы соответствий
+
+        Args:
+            df: Таблица с колонками филиала и региона
+            unit_column: Колонка с названием филиала/муниципалитета
+            region_column: Колонка с названием региона
+            districts: Справочник федеральных округов
+        """
+        pairs = df[[unit_column, region_column]].drop_duplicates(unit_column)
+        return cls(districts, dict(zip(pairs[unit_column], pairs[region_column])))
+
+    @property
+    def districts(self) -> List[str]:
+        """Федеральные округа в порядке кодов"""
+        return list(self._district_names)
+
+    def region_codes(self, df: pd.DataFrame, key: str = REQUIRED_COLUMN) -> np.ndarray:
+        """
+        Коды регионов для строк df
+
+        Если задан справочник нижнего уровня, значения key ищутся сначала
+        среди филиалов, затем среди регионов. -1 - неизвестное значение.
+        """
+        names = df[key].to_numpy()
+        codes = self._regions.get_indexer(names).astype(np.int32)
+        if self._units is not None:
+            unit_idx = self._units.get_indexer(names)
+            is_unit = unit_idx >= 0
+            codes[is_unit] = self._unit_region[unit_idx[is_unit]]
+        return codes
+
+    def district_codes(self, region_codes: np.ndarray) -> np.ndarray:
+        """Коды федеральных округов по кодам регионов (неизвестные - "Прочие")"""
+        other = len(self._district_names) - 1
+        return np.where(region_codes >= 0,
+                        self._region_district[np.maximum(region_codes, 0)],
+                        other).astype(np.int32)
+
+    def rollup(self, df: pd.DataFrame, value_column: str = 'Индекс',
+               key: str = REQUIRED_COLUMN,
+               weight_column: Optional[str] = POPULATION_COLUMN) -> Dict[str, pd.DataFrame]:
+        """
+        Рассчитывает агрегаты по всем уровням
+
+        Args:
+            df: Результаты расчёта (строки - регионы или филиалы)
+            value_column: Агрегируемая колонка
+            key: Колонка с названием строки
+            weight_column: Колонка весов (население); игнорируется, если её нет в df
+
+        Returns:
+            Словарь {'Федеральные округа': DataFrame} и, если строки - филиалы,
+            {'Регионы (агрегаты)': DataFrame}
+        """
+        values = df[value_column].to_numpy(dtype=np.float64)
+        weights = None
+        if weight_column and weight_column in df.columns:
+            weights = df[weight_column].to_numpy(dtype=np.float64)
+
+        region_codes = self.region_codes(df, key)
+        district_codes = self.district_codes(region_codes)
+
+        result = {}
+        stats = grouped_stats(district_codes, values, len(self._district_names), weights)
+        result['Федеральные округа'] = self._to_frame(DISTRICT_COLUMN, self._district_names, stats)
+
+        if self._units is not None:
+            stats = grouped_stats(region_codes, values, len(self._regions), weights)
+            frame = self._to_frame(REQUIRED_COLUMN, list(self._regions), stats)
+            frame.insert(1, DISTRICT_COLUMN,
+                         np.asarray(self._district_names, dtype=object)[self._region_district][stats['count'] > 0])
+            result['Регионы (агрегаты)'] = frame
+
+        return result
+
+    @staticmethod
+    def _to_frame(name_column: str, names: List[str], stats: Dict[str, np.ndarray]) -> pd.DataFrame:
+        present = stats['count'] > 0
+        data = {
+            name_column: np.asarray(names, dtype=object)[present],
+            'Количество': stats['count'][present],
+            'Среднее': stats['mean'][present],
+            'Медиана': stats['median'][present],
+            'Мин': stats['min'][present],
+            'Макс': stats['max'][present],
+            'Ст. откл.': stats['std'][present],
+        }
+        if 'weighted' in stats:
+            data['Взвешенный индекс'] = stats['weighted'][present]
+        return pd.DataFrame(data)
@@ -0,0 +1,254 @@
+"""
+Вычислительные бэкенды: pandas/NumPy (по умолчанию) и Polars (необязательный)
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import REQUIRED_COLUMN, WINSOR_LIMITS, PERCENTILE_KNOTS
+from ..config.federal_districts import FEDERAL_DISTRICTS
+from .aggregation import OTHER_DISTRICT
+from .calculator import IndexCalculator, CalculationError, Weights, resolve_weights
+from .dataset import CompactDataset, indicator_columns
+from .kernels import rescale_0_100, has_missing, percentile_rank_weighted_sum
+
+METHODS = ('min_max_normalized', 'simple_average', 'pca', 'cbr_method',
+           'winsorized', 'percentile_rank')
+
+# Значение нормализованного показателя, если он одинаков во всех регионах
+_CONSTANT_FILL = {'min_max_normalized': 0.0, 'cbr_method': 0.5, 'winsorized': 0.5}
+
+
+class Backend(ABC):
+    """
+    Интерфейс бэкенда: чтение листа Excel и расчёт значений индекса.
+
+    Результаты всех бэкендов совпадают с IndexCalculator (до погрешности
+    округления); остальные этапы (проверка, агрегаты, рейтинг, экспорт)
+    работают с pandas.DataFrame.
+    """
+
+    name = ''
+
+    @abstractmethod
+    def read_excel(self, file_path: str, sheet: Union[str, int] = 0,
+                   usecols: Optional[Callable[[str], bool]] = None) -> pd.DataFrame:
+        """
+        Читает лист Excel
+
+        Args:
+            file_path: Путь к файлу
+            sheet: Имя или номер листа (с нуля)
+            usecols: Фильтр колонок по имени (None - все)
+        """
+
+    @abstractmethod
+    def calculate_values(self, df: pd.DataFrame, method: str, weights: Weights = None,
+                         columns: Optional[List[str]] = None, impute: str = 'skip') -> np.ndarray:
+        """
+        Значения индекса для строк df
+
+        Args:
+            df: Данные регионов
+            method: Метод расчёта (см. IndexCalculator)
+            weights: Веса показателей
+            columns: Показатели (по умолчанию - все числовые колонки)
+            impute: Обработка пропусков (см. IndexCalculator)
+        """
+
+
+class PandasBackend(Backend):
+    """pandas для чтения, NumPy-ядра IndexCalculator для расчёта"""
+
+    name = 'pandas'
+
+    def read_excel(self, file_path, sheet=0, usecols=None):
+        return pd.read_excel(file_path, sheet_name=sheet, usecols=usecols)
+
+    def calculate_values(self, df, method, weights=None, columns=None, impute='skip'):
+        dataset = CompactDataset.from_dataframe(df, columns=columns)
+        return IndexCalculator.from_dataset(dataset, impute).calculate_values(method, weights)
+
+
+class PolarsBackend(Backend):
+    """
+    Polars: чтение через calamine и расчёт выражениями ленивого движка.
+
+    Нормализация, взвешивание и заполнение пропусков описываются одним
+    запросом LazyFrame, который Polars выполняет параллельно по колонкам.
+    Для PCA в Polars выполняется стандартизация, разложение - scikit-learn,
+    как и в основном пути. Перцентильный ранг считается ядром NumPy по
+    подготовленным в Polars колонкам: ранги по сетке квантилей совпадают
+    с основным путём.
+    """
+
+    name = 'polars'
+
+    def __init__(self):
+        try:
+            import polars
+        except ImportError:
+            raise CalculationError("Для бэкенда Polars требуется polars: pip install polars fastexcel")
+        self._pl = polars
+
+    def read_excel(self, file_path, sheet=0, usecols=None):
+        target = {'sheet_id': sheet + 1} if isinstance(sheet, int) else {'sheet_name': sheet}
+        frame = self._pl.read_excel(file_path, engine='calamine', **target)
+        if usecols is not None:
+            frame = frame.select([c for c in frame.columns if usecols(c)])
+        return self.to_pandas(frame)
+
+    @staticmethod
+    def to_pandas(frame) -> pd.DataFrame:
+        """Polars → pandas по колонкам через NumPy (без pyarrow); null в числах - NaN"""
+        return pd.DataFrame({
+            name: frame[name].to_numpy() for name in frame.columns
+        })
+
+    def from_pandas(self, df: pd.DataFrame, columns: Sequence[str]):
+        """pandas → Polars только для нужных колонок"""
+        data = {c: df[c].to_numpy(dtype=np.float64) for c in columns}
+        if REQUIRED_COLUMN in df.columns:
+            data[REQUIRED_COLUMN] = df[REQUIRED_COLUMN].astype(str).to_numpy()
+        return self._pl.DataFrame(data)
+
+    def _impute(self, lf, columns: List[str], impute: str):
+        pl = self._pl
+        cols = [pl.col(c) for c in columns]
+        if impute == 'mean':
+            return lf.with_columns([c.fill_null(c.mean()) for c in cols])
+        if impute == 'district_mean':
+            if REQUIRED_COLUMN not in lf.collect_schema().names():
+                raise CalculationError("Для заполнения по округам нужны названия регионов")
+            mapping = {r: d for d, regions in FEDERAL_DISTRICTS.items() for r in regions}
+            district = (pl.col(REQUIRED_COLUMN)
+                        .replace_strict(mapping, default=OTHER_DISTRICT, return_dtype=pl.String)
+                        .alias('__district'))
+            return (lf.with_columns(district)
+                    .with_columns([c.fill_null(c.mean().over('__district')).fill_null(c.mean())
+                                   for c in cols]))
+        return lf
+
+    def calculate_values(self, df, method, weights=None, columns=None, impute='skip'):
+        pl = self._pl
+        if method not in METHODS:
+            raise CalculationError(f"Неизвестный метод: {method}")
+        if columns is None:
+            columns = indicator_columns(df)
+        if not columns:
+            raise CalculationError("Нет числовых показателей для расчёта")
+        if weights is not None and method == 'pca':
+            raise CalculationError("Метод PCA не поддерживает веса показателей")
+        w = resolve_weights(weights, columns)
+
+        # NaN из pandas - null в Polars: агрегаты и sum_horizontal их пропускают
+        lf = self.from_pandas(df, columns).lazy().with_columns(
+            [pl.col(c).fill_nan(None) for c in columns])
+        lf = self._impute(lf, columns, impute)
+
+        keep = None
+        if impute == 'drop':
+            keep = pl.all_horizontal([pl.col(c).is_not_null() for c in columns])
+            lf = lf.with_row_index('__row').filter(keep)
+
+        present = pl.sum_horizontal([pl.when(pl.col(c).is_not_null()).then(float(wj)).otherwise(0.0)
+                                     for c, wj in zip(columns, w)])
+        if method == 'simple_average':
+            index = pl.sum_horizontal([pl.col(c) * float(wj) for c, wj in zip(columns, w)]) / present
+        elif method == 'pca':
+            return self._pca(lf, columns, keep is not None, len(df))
+        elif method == 'percentile_rank':
+            return self._percentile_rank(lf, columns, w, keep is not None, len(df))
+        else:
+            fill = _CONSTANT_FILL[method]
+            terms = []
+            for c, wj in zip(columns, w):
+                col = pl.col(c)
+                if method == 'winsorized':
+                    # Квантили в Polars - выбором, с линейной интерполяцией как np.quantile
+                    lo, hi = (col.quantile(q, interpolation='linear') for q in WINSOR_LIMITS)
+                    col = col.clip(lo, hi)
+                else:
+                    lo, hi = col.min(), col.max()
+                span = hi - lo
+                norm = pl.when(span > 0).then((col - lo) / span).otherwise(
+                    pl.when(col.is_not_null()).then(fill))
+                terms.append(norm * float(wj))
+            index = pl.sum_horizontal(terms) / present * 100.0
+
+        out = lf.select(
+            ([pl.col('__row')] if keep is not None else []) + [index.alias('Индекс')]
+        ).collect()
+        return self._scatter(out, keep is not None, len(df))
+
+    @staticmethod
+    def _scatter(out, dropped: bool, n_rows: int) -> np.ndarray:
+        values = out['Индекс'].to_numpy().astype(np.float64)
+        if not dropped:
+            return values
+        full = np.full(n_rows, np.nan)
+        full[out['__row'].to_numpy()] = values
+        return full
+
+    def _percentile_rank(self, lf, columns: List[str], w: np.ndarray,
+                         dropped: bool, n_rows: int) -> np.ndarray:
+        pl = self._pl
+        frame = lf.select(([pl.col('__row')] if dropped else []) + columns).collect()
+        matrix = frame.select(columns).to_numpy().astype(np.float64)
+        index = percentile_rank_weighted_sum(matrix, w, PERCENTILE_KNOTS, skipna=has_missing(matrix))
+        index *= 100
+        result = pl.DataFrame({'Индекс': index})
+        if dropped:
+            result = result.with_columns(frame['__row'])
+        return self._scatter(result, dropped, n_rows)
+
+    def _pca(self, lf, columns: List[str], dropped: bool, n_rows: int) -> np.ndarray:
+        try:
+            from sklearn.decomposition import PCA
+        except ImportError:
+            raise CalculationError(
+                "Для метода PCA требуется установить scikit-learn: pip install scikit-learn"
+            )
+        pl = self._pl
+        # Стандартизация как в StandardScaler: ddof=0, постоянный показатель - нули
+        scaled = []
+        for c in columns:
+            col = pl.col(c)
+            std = col.std(ddof=0)
+            scaled.append(((col - col.mean()) / pl.when(std > 0).then(std).otherwise(1.0)).alias(c))
+        frame = lf.select(([pl.col('__row')] if dropped else []) + scaled).collect()
+        if frame.select(pl.any_horizontal([pl.col(c).is_null().any() for c in columns])).item():
+            raise CalculationError(
+                "Метод PCA не работает с пропусками: выберите заполнение средним или исключение регионов"
+            )
+        matrix = frame.select(columns).to_numpy().astype(np.float64)
+        raw = PCA(n_components=1).fit_transform(matrix).ravel()
+        result = pl.DataFrame({'Индекс': rescale_0_100(raw, 50.0)})
+        if dropped:
+            result = result.with_columns(frame['__row'])
+        return self._scatter(result, dropped, n_rows)
+
+
+BACKENDS = {
+    'pandas': PandasBackend,
+    'polars': PolarsBackend,
+}
+
+_instances: Dict[str, Backend] = {}
+
+
+def get_backend(name: str = 'pandas') -> Backend:
+    """
+    Экземпляр бэкенда по имени
+
+    Raises:
+        CalculationError: Неизвестный бэкенд или не установлена его библиотека
+    """
+    if name not in BACKENDS:
+        raise CalculationError(f"Неизвестный бэкенд: {name}")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
@@ -2,9 +2,21 @@
 Модуль для расчёта индексов по различным методикам
 """
 
+import threading
+
 import pandas as pd
 import numpy as np
-from typing import Dict
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from ..config.settings import IMPUTATION_METHODS, WINSOR_LIMITS, PERCENTILE_KNOTS
+from .dataset import CompactDataset
+from .imputation import impute as impute_values
+from .kernels import (
+    minmax_weighted_sum, nan_minmax_weighted_sum, nan_weighted_mean, has_missing, rescale_0_100,
+    column_min_max, winsorized_weighted_sum, percentile_rank_weighted_sum
+)
+
+Weights = Optional[Union[Dict[str, float], Sequence[float]]]
 
 
 class CalculationError(Exception):
@@ -12,27 +24,226 @@ class CalculationError(Exception):
     pass
 
 
+def resolve_weights(weights: Weights, columns: Sequence[str], dtype=np.float64) -> np.ndarray:
+    """
+    Приводит веса к массиву по колонкам с суммой 1
+    
+    Args:
+        weights: {колонка: вес}, последовательность по порядку колонок или None (равные)
+        columns: Показатели
+        dtype: Тип результата
+        
+    Raises:
+        CalculationError: Неизвестные колонки, неверное число или отрицательные веса
+    """
+    k = len(columns)
+    if weights is None:
+        return np.full(k, 1.0 / k, dtype=dtype)
+    
+    if isinstance(weights, dict):
+        unknown = set(weights) - set(columns)
+        if unknown:
+            raise CalculationError(f"Веса заданы для неизвестных показателей: {', '.join(sorted(unknown))}")
+        w = np.array([weights.get(c, 0.0) for c in columns], dtype=np.float64)
+    else:
+        w = np.asarray(weights, dtype=np.float64)
+        if w.shape != (k,):
+            raise CalculationError(f"Ожидалось {k} весов, получено {w.size}")
+    
+    if (w < 0).any() or w.sum() <= 0:
+        raise CalculationError("Веса должны быть неотрицательными и не все равны нулю")
+    return (w / w.sum()).astype(dtype)
+
+
+class _Flight:
+    """Выполняющийся расчёт, результата которого ждут другие потоки"""
+    
+    __slots__ = ('done', 'result', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
 class IndexCalculator:
-    """Класс для расчёта индексов финансового доверия"""
+    """
+    Класс для расчёта индексов финансового доверия
     
-    def __init__(self, df: pd.DataFrame):
+    Экземпляр можно использовать из нескольких потоков: кэш защищён
+    блокировкой, а одновременные одинаковые запросы (метод, данные, веса)
+    ждут один общий расчёт вместо того, чтобы выполнять его каждый сам.
+    """
+    
+    def __init__(self, df: pd.DataFrame, dtype=np.float64, impute: str = 'skip'):
         """
         Args:
-            df: DataFrame с данными регионов
+            df: DataFrame с данными регионов (не копируется)
+            dtype: Точность вычислений (np.float64 или np.float32)
+            impute: Обработка пропусков (см. IMPUTATION_METHODS): 'skip' -
+                веса отсутствующих показателей перераспределяются в строке,
+                'mean', 'district_mean' - заполнение средним, 'drop' - регионы
+                с пропусками получают NaN
+        """
+        self._df = df
+        self._init(CompactDataset.from_dataframe(df, dtype=dtype), impute)
+    
+    @classmethod
+    def from_dataset(cls, dataset: CompactDataset, impute: str = 'skip') -> 'IndexCalculator':
+        """
+        Создаёт калькулятор поверх готового числового блока (например, в
+        общей памяти другого процесса) без исходного DataFrame
+        
+        Args:
+            dataset: Компактное представление данных
+            impute: Обработка пропусков (см. __init__)
         """
-        self._df = df.copy()
-        self._numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        calc = cls.__new__(cls)
+        calc._df = None
+        calc._init(dataset, impute)
+        return calc
+    
+    def _init(self, dataset: CompactDataset, impute: str):
+        if impute not in IMPUTATION_METHODS:
+            raise CalculationError(f"Неизвестный способ обработки пропусков: {impute}")
+        self._data = dataset
+        self._numeric_cols = dataset.columns
+        self._impute = impute
+        self._prepared = None
+        self._scaling = None
         self._cache = {}
+        self._inflight: Dict[tuple, _Flight] = {}
+        self._lock = threading.Lock()
+        self._prepare_lock = threading.Lock()
+    
+    @property
+    def dataset(self) -> CompactDataset:
+        """Компактное представление данных"""
+        return self._data
+    
+    @property
+    def impute(self) -> str:
+        """Способ обработки пропусков"""
+        return self._impute
+    
+    def _prepare(self):
+        """
+        Матрица для расчёта с учётом обработки пропусков
+        
+        Заполнение выполняется один раз для набора данных; все методы и веса
+        используют один и тот же результат.
+        
+        Returns:
+            Кортеж (values, rows, has_nan): rows - номера строк values в
+            исходном наборе (None - все строки), has_nan - остались ли пропуски
+        """
+        prepared = self._prepared
+        if prepared is not None and prepared[0] == self._data.fingerprint:
+            return prepared[1:]
+        
+        with self._prepare_lock:
+            # Повторная проверка: заполнение мог выполнить другой поток
+            prepared = self._prepared
+            if prepared is None or prepared[0] != self._data.fingerprint:
+                values, rows = self._data.values, None
+                missing = has_missing(values)
+                if missing and self._impute != 'skip':
+                    try:
+                        values, rows = impute_values(self._data, self._impute)
+                    except ValueError as e:
+                        raise CalculationError(str(e))
+                    values.flags.writeable = False
+                    missing = False
+                prepared = (self._data.fingerprint, values, rows, missing)
+                self._prepared = prepared
+        return prepared[1:]
+    
+    @property
+    def rows(self) -> Optional[np.ndarray]:
+        """Номера строк набора данных в нормализованной матрице (None - все строки)"""
+        return self._prepare()[1]
     
-    def calculate_index(self, method: str = 'min_max_normalized') -> pd.DataFrame:
+    def _normalization(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Минимумы, 1/размах и нормализованные средние (для пропусков) по показателям"""
+        scaling = self._scaling
+        fingerprint = self._data.fingerprint
+        if scaling is None or scaling[0] != fingerprint:
+            values, _, has_nan = self._prepare()
+            mins, maxs = column_min_max(values, skipna=has_nan)
+            span = maxs - mins
+            scale = np.divide(1.0, span, out=np.zeros_like(span), where=span > 0)
+            if has_nan:
+                with np.errstate(invalid='ignore'):
+                    means = np.nan_to_num((np.nanmean(values, axis=0) - mins) * scale)
+            else:
+                means = (values.mean(axis=0) - mins) * scale
+            scaling = self._scaling = (fingerprint, mins, scale, means)
+        return scaling[1:]
+    
+    def normalized(self, rows=None) -> np.ndarray:
+        """
+        Min-Max нормализованные показатели (0..1) подготовленной матрицы
+        
+        Нормализуются только запрошенные строки, поэтому большие наборы
+        можно обрабатывать по частям без копии всей матрицы.
+        
+        Args:
+            rows: Срез или массив номеров строк подготовленной матрицы
+                (см. rows; None - все строки)
+            
+        Returns:
+            Новый массив (len(rows), n_columns); пропуски заменены средним
+            показателя, постоянные показатели - 0
+        """
+        values, _, has_nan = self._prepare()
+        mins, scale, means = self._normalization()
+        block = values if rows is None else values[rows]
+        out = (block - mins) * scale
+        if has_nan:
+            missing = np.isnan(out)
+            if missing.any():
+                out[missing] = np.broadcast_to(means, out.shape)[missing]
+        return out
+    
+    @property
+    def n_prepared(self) -> int:
+        """Количество строк подготовленной матрицы (без исключённых регионов)"""
+        return self._prepare()[0].shape[0]
+    
+    def calculate_index(self, method: str = 'min_max_normalized',
+                        weights: Weights = None) -> pd.DataFrame:
         """
         Рассчитывает индекс по выбранному методу
         
         Args:
-            method: Метод расчёта ('min_max_normalized', 'simple_average', 'pca', 'cbr_method')
+            method: Метод расчёта ('min_max_normalized', 'simple_average', 'pca', 'cbr_method',
+                'winsorized', 'percentile_rank')
+            weights: Веса показателей - {колонка: вес} или последовательность
+                по порядку числовых колонок; None - равные веса
+            
+        Returns:
+            DataFrame с добавленной колонкой 'Индекс'. Исходные колонки не
+            копируются (при Copy-on-Write pandas они общие с входным DataFrame).
+            
+        Raises:
+            CalculationError: При ошибке расчёта
+        """
+        if self._df is None:
+            raise CalculationError("Калькулятор создан без DataFrame: используйте calculate_values")
+        index = self.calculate_values(method, weights)
+        return self._df.assign(**{'Индекс': index})
+    
+    def calculate_values(self, method: str = 'min_max_normalized',
+                         weights: Weights = None) -> np.ndarray:
+        """
+        Рассчитывает только значения индекса, без построения DataFrame
+        
+        Args:
+            method: Метод расчёта
+            weights: Веса показателей (см. calculate_index)
             
         Returns:
-            DataFrame с добавленной колонкой 'Индекс'
+            Массив значений индекса (только для чтения, хранится в кэше)
             
         Raises:
             CalculationError: При ошибке расчёта
@@ -40,52 +251,101 @@ class IndexCalculator:
         if not self._numeric_cols:
             raise CalculationError("Нет числовых показателей для расчёта")
         
-        # Проверка кэша
-        cache_key = f"{method}_{hash(tuple(self._df.values.flatten()))}"
-        if cache_key in self._cache:
-            return self._cache[cache_key].copy()
+        w = self._resolve_weights(weights)
+        if weights is not None and method == 'pca':
+            raise CalculationError("Метод PCA не поддерживает веса показателей")
+        
+        # Проверка кэша; если такой же расчёт уже идёт в другом потоке - ждём его
+        cache_key = (method, self._data.fingerprint, self._impute,
+                     None if weights is None else w.tobytes())
+        with self._lock:
+            result = self._cache.get(cache_key)
+            if result is not None:
+                return result
+            flight = self._inflight.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[cache_key] = _Flight()
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
         
         try:
-            if method == 'min_max_normalized':
-                result = self._min_max_normalized()
-            elif method == 'simple_average':
-                result = self._simple_average()
-            elif method == 'pca':
-                result = self._pca_method()
-            elif method == 'cbr_method':
-                result = self._cbr_method()
-            else:
-                raise CalculationError(f"Неизвестный метод: {method}")
-            
-            # Сохранение в кэш
-            self._cache[cache_key] = result.copy()
-            return result
-            
+            result = self._compute(method, w)
+        except CalculationError as e:
+            flight.error = e
         except Exception as e:
-            raise CalculationError(f"Ошибка при расчёте индекса: {str(e)}")
-    
-    def _min_max_normalized(self) -> pd.DataFrame:
-        """Min-Max нормализация"""
-        df = self._df.copy()
-        normalized = df[self._numeric_cols].copy()
+            flight.error = CalculationError(f"Ошибка при расчёте индекса: {str(e)}")
+        else:
+            # Сохранение в кэш: массив неизменяемый, поэтому копия не нужна
+            result.flags.writeable = False
+            flight.result = result
+        finally:
+            if flight.result is None and flight.error is None:
+                # Расчёт прерван (KeyboardInterrupt и т.п.): ожидающие не должны зависнуть
+                flight.error = CalculationError("Расчёт индекса прерван")
+            with self._lock:
+                if flight.error is None:
+                    self._cache[cache_key] = flight.result
+                del self._inflight[cache_key]
+            flight.done.set()
         
-        for col in self._numeric_cols:
-            min_val, max_val = normalized[col].min(), normalized[col].max()
-            if max_val > min_val:
-                normalized[col] = (normalized[col] - min_val) / (max_val - min_val)
-            else:
-                normalized[col] = 0.0
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+    
+    def _compute(self, method: str, w: np.ndarray) -> np.ndarray:
+        """Расчёт индекса без кэша"""
+        values, rows, has_nan = self._prepare()
+        if method == 'min_max_normalized':
+            result = self._min_max_normalized(values, w, has_nan)
+        elif method == 'simple_average':
+            result = self._simple_average(values, w, has_nan)
+        elif method == 'pca':
+            if has_nan:
+                raise CalculationError(
+                    "Метод PCA не работает с пропусками: выберите заполнение средним или исключение регионов"
+                )
+            result = self._pca_method(values)
+        elif method == 'cbr_method':
+            result = self._cbr_method(values, w, has_nan)
+        elif method == 'winsorized':
+            result = self._winsorized(values, w, has_nan)
+        elif method == 'percentile_rank':
+            result = self._percentile_rank(values, w, has_nan)
+        else:
+            raise CalculationError(f"Неизвестный метод: {method}")
         
-        df['Индекс'] = 100 * normalized.mean(axis=1)
-        return df
+        if rows is not None:
+            # Исключённые регионы остаются в результате с NaN
+            full = np.full(self._data.n_rows, np.nan, dtype=result.dtype)
+            full[rows] = result
+            result = full
+        return result
+    
+    def _resolve_weights(self, weights: Weights) -> np.ndarray:
+        """Приводит веса к массиву по числовым колонкам с суммой 1"""
+        return resolve_weights(weights, self._numeric_cols, self._data.dtype)
+    
+    def _min_max_normalized(self, values: np.ndarray, weights: np.ndarray,
+                            has_nan: bool = False) -> np.ndarray:
+        """Min-Max нормализация"""
+        kernel = nan_minmax_weighted_sum if has_nan else minmax_weighted_sum
+        index = kernel(values, weights, 0.0)
+        index *= 100
+        return index
     
-    def _simple_average(self) -> pd.DataFrame:
-        """Простое среднее"""
-        df = self._df.copy()
-        df['Индекс'] = df[self._numeric_cols].mean(axis=1)
-        return df
+    def _simple_average(self, values: np.ndarray, weights: np.ndarray,
+                        has_nan: bool = False) -> np.ndarray:
+        """Простое (взвешенное) среднее"""
+        if has_nan:
+            return nan_weighted_mean(values, weights)
+        return values @ weights
     
-    def _pca_method(self) -> pd.DataFrame:
+    def _pca_method(self, values: np.ndarray) -> np.ndarray:
         """PCA метод"""
         try:
             from sklearn.preprocessing import StandardScaler
@@ -95,44 +355,42 @@ class IndexCalculator:
                 "Для метода PCA требуется установить scikit-learn: pip install scikit-learn"
             )
         
-        df = self._df.copy()
-        
         # Стандартизация
         scaler = StandardScaler()
-        scaled = scaler.fit_transform(df[self._numeric_cols])
+        scaled = scaler.fit_transform(values)
         
         # PCA
         pca = PCA(n_components=1)
-        idx_raw = pca.fit_transform(scaled).flatten()
+        idx_raw = pca.fit_transform(scaled).ravel()
         
         # Нормализация к [0, 100]
-        if idx_raw.max() != idx_raw.min():
-            df['Индекс'] = 100 * (idx_raw - idx_raw.min()) / (idx_raw.max() - idx_raw.min())
-        else:
-            df['Индекс'] = 50.0
-        
-        return df
+        return rescale_0_100(idx_raw, 50.0)
     
-    def _cbr_method(self) -> pd.DataFrame:
+    def _cbr_method(self, values: np.ndarray, weights: np.ndarray,
+                    has_nan: bool = False) -> np.ndarray:
         """Методика ЦБ РФ"""
-        df = self._df.copy()
-        normalized = df[self._numeric_cols].copy()
-        
-        # Нормализация каждого показателя
-        for col in self._numeric_cols:
-            min_val, max_val = normalized[col].min(), normalized[col].max()
-            if max_val > min_val:
-                normalized[col] = (normalized[col] - min_val) / (max_val - min_val)
-            else:
-                normalized[col] = 0.5
-        
-        # Равные веса
-        weights = np.ones(len(self._numeric_cols)) / len(self._numeric_cols)
-        df['Индекс'] = normalized.dot(weights) * 100
-        
-        return df
+        # Нормализация каждого показателя (0.5 для постоянных), по умолчанию равные веса
+        kernel = nan_minmax_weighted_sum if has_nan else minmax_weighted_sum
+        index = kernel(values, weights, 0.5)
+        index *= 100
+        return index
+    
+    def _winsorized(self, values: np.ndarray, weights: np.ndarray,
+                    has_nan: bool = False) -> np.ndarray:
+        """Min-Max нормализация между перцентилями WINSOR_LIMITS (выбросы обрезаются)"""
+        index = winsorized_weighted_sum(values, weights, WINSOR_LIMITS, 0.5, skipna=has_nan)
+        index *= 100
+        return index
+    
+    def _percentile_rank(self, values: np.ndarray, weights: np.ndarray,
+                         has_nan: bool = False) -> np.ndarray:
+        """Взвешенный перцентильный ранг регионов по показателям"""
+        index = percentile_rank_weighted_sum(values, weights, PERCENTILE_KNOTS, skipna=has_nan)
+        index *= 100
+        return index
     
-    def get_statistics(self, df: pd.DataFrame) -> Dict[str, float]:
+    @staticmethod
+    def get_statistics(df: pd.DataFrame) -> Dict[str, float]:
         """
         Возвращает статистику по рассчитанному индексу
         
@@ -155,5 +413,8 @@ class IndexCalculator:
         }
     
     def clear_cache(self):
-        """Очистка кэша"""
-        self._cache.clear()
\ No newline at end of file
+        """Очистка кэша (выполняющиеся расчёты завершатся и попадут в кэш)"""
+        with self._lock:
+            self._cache.clear()
+        self._prepared = None
+        self._scaling = None
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Группировка регионов (и филиалов) по профилю показателей: mini-batch k-means (scikit-learn)
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import (
+    CLUSTER_K_RANGE, CLUSTER_BATCH_SIZE, CLUSTER_MAX_ITER, CLUSTER_SAMPLE, CLUSTER_CHUNK_ROWS
+)
+from .calculator import IndexCalculator
+
+CLUSTER_COLUMN = 'Группа'
+
+
+class ClusteringError(Exception):
+    """Исключение при ошибке кластеризации"""
+    pass
+
+
+class ClusterResult:
+    """
+    Результат кластеризации
+
+    labels - номер группы (с 0) для каждой строки набора данных, -1 - строка
+    исключена при подготовке данных. Группы упорядочены по среднему
+    нормализованному профилю центра: группа 0 - самые высокие показатели.
+    """
+
+    def __init__(self, labels: np.ndarray, centers: np.ndarray, columns: List[str],
+                 inertia: float, scores: Dict[int, float]):
+        self.labels = labels
+        self.centers = centers
+        self.columns = list(columns)
+        self.inertia = inertia
+        self.scores = scores
+
+    @property
+    def k(self) -> int:
+        """Количество групп"""
+        return len(self.centers)
+
+    @property
+    def silhouette(self) -> float:
+        """Силуэт выбранного разбиения (по выборке строк)"""
+        return self.scores.get(self.k, float('nan'))
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """Количество строк в каждой группе"""
+        return np.bincount(self.labels[self.labels >= 0], minlength=self.k)
+
+    def group_numbers(self) -> pd.api.extensions.ExtensionArray:
+        """Номера групп для таблицы результатов (с 1; исключённые строки - <NA>)"""
+        numbers = pd.array(self.labels + 1, dtype='Int64')
+        numbers[self.labels < 0] = pd.NA
+        return numbers
+
+    def profiles(self, values: np.ndarray) -> pd.DataFrame:
+        """
+        Средние значения показателей по группам в исходных единицах
+
+        Args:
+            values: Числовой блок набора данных (CompactDataset.values)
+        """
+        present = self.labels >= 0
+        labels = self.labels[present]
+        block = values[present]
+        m = block.shape[1]
+        finite = ~np.isnan(block)
+        cell = (labels[:, None] * m + np.arange(m)).ravel()
+        total = np.bincount(cell, weights=np.where(finite, block, 0.0).ravel(), minlength=self.k * m)
+        count = np.bincount(cell, weights=finite.ravel(), minlength=self.k * m)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = (total / count).reshape(self.k, m)
+        frame = pd.DataFrame(means, columns=self.columns)
+        frame.insert(0, 'Строк', self.sizes)
+        frame.insert(0, CLUSTER_COLUMN, np.arange(1, self.k + 1))
+        return frame
+
+    def __repr__(self) -> str:
+        return f"ClusterResult(k={self.k}, silhouette={self.silhouette:.3f}, sizes={self.sizes.tolist()})"
+
+
+def _sklearn():
+    """MiniBatchKMeans и silhouette_score (scikit-learn импортируется при первой кластеризации)"""
+    try:
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.metrics import silhouette_score
+    except ImportError:
+        raise ClusteringError(
+            "Для группировки регионов требуется установить scikit-learn: pip install scikit-learn"
+        )
+    return MiniBatchKMeans, silhouette_score
+
+
+def _fit_model(calc: IndexCalculator, k: int, seed: int, batch_size: int, max_iter: int,
+               tol: float = 1e-6):
+    """
+    Модель MiniBatchKMeans: fit по всей матрице, если она помещается в блок
+    CLUSTER_CHUNK_ROWS строк, иначе partial_fit по случайным пакетам строк
+    """
+    MiniBatchKMeans, _ = _sklearn()
+    n = calc.n_prepared
+    model = MiniBatchKMeans(n_clusters=k, batch_size=batch_size, max_iter=max_iter,
+                            n_init=3, random_state=seed)
+    if n <= CLUSTER_CHUNK_ROWS:
+        return model.fit(calc.normalized())
+
+    rng = np.random.default_rng(seed)
+    # Первый вызов - начальные центры k-means++ по выборке строк
+    model.partial_fit(calc.normalized(np.sort(rng.choice(n, min(n, CLUSTER_SAMPLE), replace=False))))
+    for _ in range(max_iter):
+        centers = model.cluster_centers_.copy()
+        model.partial_fit(calc.normalized(np.sort(rng.integers(0, n, batch_size))))
+        if ((model.cluster_centers_ - centers) ** 2).sum() <= tol:
+            break
+    return model
+
+
+def _score(X: np.ndarray, labels: np.ndarray) -> float:
+    """Силуэт разбиения выборки X; 0 - если непустых групп меньше двух"""
+    _, silhouette_score = _sklearn()
+    if not 1 < len(np.unique(labels)) < len(X):
+        return 0.0
+    return float(silhouette_score(X, labels))
+
+
+def _assign_all(calc: IndexCalculator, model, order: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Назначение всех строк по частям: в памяти только блок CLUSTER_CHUNK_ROWS строк
+
+    order - номера центров модели в порядке групп результата
+    """
+    n = calc.n_prepared
+    rank = np.empty(len(order), dtype=np.int32)
+    rank[order] = np.arange(len(order))
+    labels = np.empty(n, dtype=np.int32)
+    inertia = 0.0
+    for start in range(0, n, CLUSTER_CHUNK_ROWS):
+        stop = min(start + CLUSTER_CHUNK_ROWS, n)
+        block = calc.normalized(slice(start, stop))
+        labels[start:stop] = rank[model.predict(block)]
+        inertia -= float(model.score(block))
+    return labels, inertia
+
+
+def cluster_profiles(calc: IndexCalculator, k: Optional[int] = None,
+                     k_range: Sequence[int] = CLUSTER_K_RANGE, seed: int = 0,
+                     batch_size: int = CLUSTER_BATCH_SIZE,
+                     max_iter: int = CLUSTER_MAX_ITER) -> ClusterResult:
+    """
+    Группирует строки по нормализованным показателям калькулятора
+
+    Центры ищет MiniBatchKMeans: для больших наборов - partial_fit по
+    случайным пакетам строк, поэтому время подбора не зависит от размера
+    набора; затем все строки назначаются группам по частям. Память
+    ограничена пакетом, блоком CLUSTER_CHUNK_ROWS строк и массивом номеров
+    групп.
+
+    Args:
+        calc: Калькулятор (его подготовленная матрица с учётом пропусков)
+        k: Количество групп; None - выбор по наибольшему силуэту из k_range
+        k_range: Диапазон (min, max) количества групп для выбора
+        seed: Зерно генератора (одинаковые данные и seed - одинаковые группы)
+        batch_size: Строк в пакете mini-batch
+        max_iter: Максимум пакетов (итераций для небольших наборов)
+
+    Raises:
+        ClusteringError: Недостаточно строк для заданного количества групп
+            или не установлен scikit-learn
+    """
+    n = calc.n_prepared
+    if k is not None:
+        candidates = [int(k)]
+    else:
+        lo, hi = k_range
+        candidates = list(range(max(2, lo), min(hi, n - 1) + 1))
+    if not candidates or candidates[0] < 1 or candidates[-1] > n:
+        wanted = k if k is not None else k_range[0]
+        raise ClusteringError(f"Недостаточно строк ({n}) для разбиения на {wanted} групп(ы)")
+
+    rng = np.random.default_rng(seed)
+    # Силуэт - по общей выборке строк, чтобы оценки разных k были сравнимы
+    probe = np.sort(rng.choice(n, min(n, CLUSTER_SAMPLE // 5), replace=False))
+    X_probe = calc.normalized(probe)
+
+    scores = {}
+    best = None
+    for kk in candidates:
+        model = _fit_model(calc, kk, int(np.random.default_rng([seed, kk]).integers(2 ** 31)),
+                           batch_size, max_iter)
+        scores[kk] = _score(X_probe, model.predict(X_probe)) if kk > 1 else 0.0
+        if best is None or scores[kk] > scores[best.n_clusters]:
+            best = model
+
+    # Номера групп по убыванию среднего профиля центра
+    order = np.argsort(-best.cluster_centers_.mean(axis=1), kind='stable')
+    centers = best.cluster_centers_[order].astype(np.float64)
+    labels, inertia = _assign_all(calc, best, order)
+
+    rows = calc.rows
+    if rows is not None:
+        full = np.full(calc.dataset.n_rows, -1, dtype=np.int32)
+        full[rows] = labels
+        labels = full
+    return ClusterResult(labels, centers, calc.dataset.columns, inertia, scores)
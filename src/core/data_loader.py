@@ -4,75 +4,337 @@
 
 import pandas as pd
 import numpy as np
-from typing import List
-from ..config.settings import REQUIRED_COLUMN, MIN_NUMERIC_COLUMNS
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice, repeat
+from typing import Callable, Dict, List, Optional, Sequence, Union
+from ..config.settings import REQUIRED_COLUMN, SHEET_COLUMN, STREAM_CHUNK_ROWS
+from .backends import get_backend
+from .dataset import CompactDataset
+from .validation import (
+    ValidationReport, ValidationSchema, DEFAULT_SCHEMA, validate_dataframe
+)
+
+
+SheetSelector = Union[None, str, 're.Pattern', Sequence[Union[str, int]], Callable[[str], bool]]
+ColumnSelector = Union[None, Sequence[str], Callable[[str], bool]]
+
+
+def _select_sheets(all_sheets: List[str], selector: SheetSelector) -> List[str]:
+    """
+    Имена листов, выбранных селектором, в порядке книги
+
+    Строка - сначала точное имя листа ('Q1 (2024)' выбирает сам себя),
+    иначе регулярное выражение для полного имени; re.Pattern - всегда
+    регулярное выражение.
+    """
+    if selector is None:
+        return list(all_sheets)
+    if isinstance(selector, str) and selector in all_sheets:
+        return [selector]
+    if isinstance(selector, (str, re.Pattern)):
+        pattern = re.compile(selector)
+        return [name for name in all_sheets if pattern.fullmatch(name)]
+    if callable(selector):
+        return [name for name in all_sheets if selector(name)]
+    
+    names = []
+    for item in selector:
+        if isinstance(item, int):
+            if not -len(all_sheets) <= item < len(all_sheets):
+                raise DataLoadError(f"Нет листа с номером {item} (листов: {len(all_sheets)})")
+            names.append(all_sheets[item])
+        elif item in all_sheets:
+            names.append(item)
+        else:
+            raise DataLoadError(f"Лист не найден: {item}")
+    return names
+
+
+def _usecols(columns: ColumnSelector):
+    """Селектор колонок для read_excel, всегда включающий колонку региона"""
+    if columns is None:
+        return None
+    if callable(columns):
+        return _ColumnFilter(frozenset([REQUIRED_COLUMN]), columns)
+    return _ColumnFilter(frozenset(columns) | {REQUIRED_COLUMN})
+
+
+class _ColumnFilter:
+    """Фильтр колонок для usecols, передаваемый в дочерние процессы"""
+    
+    def __init__(self, names: frozenset, predicate: Optional[Callable[[str], bool]] = None):
+        self._names = names
+        self._predicate = predicate
+    
+    def __call__(self, name: str) -> bool:
+        if name in self._names:
+            return True
+        return self._predicate is not None and self._predicate(name)
+
+
+def _picklable(obj) -> bool:
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return False
+    return True
+
+
+def _read_sheet(file_path: str, sheet: str, usecols) -> pd.DataFrame:
+    """Чтение одного листа (выполняется в дочернем процессе)"""
+    return pd.read_excel(file_path, sheet_name=sheet, usecols=usecols)
 
 
 class DataLoadError(Exception):
     """Исключение при ошибке загрузки данных"""
-    pass
+    
+    def __init__(self, message: str, report: Optional[ValidationReport] = None):
+        super().__init__(message)
+        self.report = report
 
 
 class DataLoader:
     """Класс для загрузки и валидации Excel данных"""
     
-    def __init__(self):
+    def __init__(self, schema: ValidationSchema = DEFAULT_SCHEMA, backend: str = 'pandas'):
+        """
+        Args:
+            schema: Схема проверки данных
+            backend: Бэкенд чтения листа ('pandas' или 'polars', см. backends)
+        """
+        self._backend = backend
         self._df = None
         self._file_path = None
+        self._schema = schema
+        self._report = None
+        self._sheets = None
     
-    def load_excel(self, file_path: str) -> pd.DataFrame:
+    def load_excel(self, file_path: str, sheet: Union[str, int] = 0,
+                   columns: ColumnSelector = None) -> pd.DataFrame:
         """
         Загружает данные из Excel файла с валидацией
         
         Args:
             file_path: Путь к Excel файлу
+            sheet: Имя или номер листа
+            columns: Список колонок или функция-фильтр по имени колонки;
+                остальные колонки не разбираются. 'Регион' добавляется всегда
             
         Returns:
-            DataFrame с загруженными данными
+            DataFrame с загруженными данными (без копирования; загрузчик
+            хранит ссылку на тот же объект)
             
         Raises:
             DataLoadError: При ошибке загрузки или валидации
         """
         try:
-            df = pd.read_excel(file_path)
-            self._validate_dataframe(df)
-            self._df = df
-            self._file_path = file_path
-            return df.copy()
-            
+            df = get_backend(self._backend).read_excel(file_path, sheet, _usecols(columns))
         except FileNotFoundError:
             raise DataLoadError(f"Файл не найден: {file_path}")
         except Exception as e:
             raise DataLoadError(f"Ошибка загрузки файла: {str(e)}")
+        
+        self._validate_dataframe(df)
+        self._df = df
+        self._file_path = file_path
+        self._sheets = None
+        return df
     
-    def _validate_dataframe(self, df: pd.DataFrame) -> None:
+    def load_workbook(self, file_path: str, sheets: SheetSelector = None,
+                      columns: ColumnSelector = None, stack: bool = False,
+                      max_workers: Optional[int] = None
+                      ) -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
         """
-        Валидирует DataFrame на соответствие требованиям
+        Загружает несколько листов книги, разбирая их параллельно
         
         Args:
-            df: DataFrame для валидации
+            file_path: Путь к Excel файлу
+            sheets: Листы - список имён/номеров, имя листа, регулярное выражение
+                для имён (строка, не совпавшая ни с одним именем, или re.Pattern)
+                или функция-фильтр; None - все листы
+            columns: Список колонок или функция-фильтр по имени колонки
+            stack: Вернуть один DataFrame с колонкой 'Лист' вместо словаря
+            max_workers: Количество процессов (по умолчанию - по числу листов,
+                но не больше числа ядер)
+            
+        Returns:
+            Словарь {лист: DataFrame} или объединённый DataFrame. Без stack
+            загрузчик хранит только первый лист: get_statistics(), compact()
+            и dataframe описывают его (список листов - в get_statistics()['sheets'])
             
         Raises:
-            DataLoadError: При несоответствии требованиям
+            DataLoadError: При ошибке загрузки, валидации любого листа или
+                если выбранного листа нет в книге
         """
-        # Проверка наличия обязательной колонки
-        if REQUIRED_COLUMN not in df.columns:
-            raise DataLoadError(
-                f"В файле обязательно должна быть колонка '{REQUIRED_COLUMN}'"
-            )
+        try:
+            with pd.ExcelFile(file_path) as book:
+                all_sheets = book.sheet_names
+        except FileNotFoundError:
+            raise DataLoadError(f"Файл не найден: {file_path}")
+        except Exception as e:
+            raise DataLoadError(f"Ошибка загрузки файла: {str(e)}")
         
-        # Проверка наличия числовых колонок
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        if len(numeric_cols) < MIN_NUMERIC_COLUMNS:
-            raise DataLoadError(
-                f"В файле должно быть минимум {MIN_NUMERIC_COLUMNS} числовых показателей"
+        names = _select_sheets(all_sheets, sheets)
+        if not names:
+            raise DataLoadError(f"В файле нет подходящих листов (есть: {', '.join(all_sheets)})")
+        
+        usecols = _usecols(columns)
+        try:
+            if len(names) == 1 or max_workers == 1:
+                frames = [_read_sheet(file_path, name, usecols) for name in names]
+            else:
+                workers = min(len(names), max_workers or os.cpu_count() or 1)
+                # Разбор листа - чистый Python (GIL), поэтому процессы; если фильтр
+                # колонок нельзя передать в процесс (lambda), остаются потоки
+                executor = ProcessPoolExecutor if _picklable(usecols) else ThreadPoolExecutor
+                with executor(max_workers=workers) as pool:
+                    frames = list(pool.map(
+                        _read_sheet, repeat(file_path), names, repeat(usecols)
+                    ))
+        except Exception as e:
+            raise DataLoadError(f"Ошибка загрузки файла: {str(e)}")
+        
+        result = dict(zip(names, frames))
+        report = ValidationReport()
+        for name, df in result.items():
+            sheet_report = self.validate(df)
+            for issue in sheet_report.issues:
+                issue.message = f"[{name}] {issue.message}"
+            report.extend(sheet_report)
+        self._report = report
+        if not report.is_valid:
+            raise DataLoadError(report.summary(), report)
+        
+        if stack:
+            stacked = pd.concat(
+                [df.assign(**{SHEET_COLUMN: name}) for name, df in result.items()],
+                ignore_index=True
             )
+            stacked.insert(0, SHEET_COLUMN, stacked.pop(SHEET_COLUMN))
+            self._df = stacked
+        else:
+            self._df = frames[0]
+        self._file_path = file_path
+        self._sheets = names
+        return self._df if stack else result
+    
+    def load_excel_streaming(self, file_path: str, sheet: Union[str, int] = 0,
+                             chunk_size: int = STREAM_CHUNK_ROWS) -> pd.DataFrame:
+        """
+        Загружает .xlsx по частям, проверяя каждую часть сразу после чтения.
         
-        # Проверка на пустые значения в колонке регионов
-        if df[REQUIRED_COLUMN].isnull().any():
+        Остаток файла не разбирается, если в очередной части найдены ошибки.
+        
+        Args:
+            file_path: Путь к .xlsx файлу
+            sheet: Имя или номер листа
+            chunk_size: Количество строк в одной части
+            
+        Returns:
+            DataFrame с загруженными данными
+            
+        Raises:
+            DataLoadError: При ошибке загрузки или в первой части с ошибками
+        """
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
             raise DataLoadError(
-                f"Колонка '{REQUIRED_COLUMN}' содержит пустые значения"
+                "Для потоковой загрузки требуется openpyxl: pip install openpyxl"
             )
+        
+        try:
+            wb = load_workbook(file_path, read_only=True, data_only=True)
+        except FileNotFoundError:
+            raise DataLoadError(f"Файл не найден: {file_path}")
+        except Exception as e:
+            raise DataLoadError(f"Ошибка загрузки файла: {str(e)}")
+        
+        try:
+            ws = wb[_select_sheets(wb.sheetnames, [sheet])[0]]
+            rows = ws.iter_rows(values_only=True)
+            header = list(next(rows, ()))
+            report = ValidationReport()
+            seen_regions = set()
+            numeric_columns = None
+            chunks = []
+            offset = 0
+            
+            while True:
+                raw = list(islice(rows, chunk_size))
+                # Пустые строки пропускаются, но конец листа - только конец данных:
+                # пустая строка внутри части не должна обрывать чтение
+                batch = [r for r in raw if any(v is not None for v in r)]
+                if batch or not chunks:
+                    chunk = pd.DataFrame(batch, columns=header)
+                    if numeric_columns is None:
+                        chunk_report = validate_dataframe(
+                            chunk, self._schema, seen_regions=seen_regions
+                        )
+                        numeric_columns = chunk.select_dtypes(include=[np.number]).columns.tolist()
+                    else:
+                        # Колонка из одних пустых ячеек читается как object: приводим
+                        # к числам, нечисловые значения остаются для проверки
+                        for col in numeric_columns:
+                            if col in chunk.columns:
+                                try:
+                                    chunk[col] = pd.to_numeric(chunk[col])
+                                except (ValueError, TypeError):
+                                    pass
+                        chunk_report = validate_dataframe(
+                            chunk, self._schema, numeric_columns=numeric_columns,
+                            seen_regions=seen_regions, row_offset=offset
+                        )
+                    report.extend(chunk_report)
+                    if not chunk_report.is_valid:
+                        raise DataLoadError(
+                            f"Ошибка в строках {offset + 2}-{offset + len(raw) + 1}:\n"
+                            + chunk_report.summary(),
+                            report
+                        )
+                    chunks.append(chunk)
+                offset += len(raw)
+                if len(raw) < chunk_size:
+                    break
+        finally:
+            wb.close()
+        
+        df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        self._report = report
+        self._df = df
+        self._file_path = file_path
+        self._sheets = None
+        return df
+    
+    def validate(self, df: pd.DataFrame) -> ValidationReport:
+        """
+        Полная проверка данных без выбрасывания исключений
+        
+        Args:
+            df: DataFrame для проверки
+            
+        Returns:
+            ValidationReport со всеми найденными проблемами
+        """
+        return validate_dataframe(df, self._schema)
+    
+    def _validate_dataframe(self, df: pd.DataFrame) -> None:
+        """
+        Валидирует DataFrame на соответствие требованиям
+        
+        Args:
+            df: DataFrame для валидации
+            
+        Raises:
+            DataLoadError: При несоответствии требованиям (с полным отчётом)
+        """
+        report = self.validate(df)
+        self._report = report
+        if not report.is_valid:
+            raise DataLoadError(report.summary(), report)
     
     def get_numeric_columns(self) -> List[str]:
         """Возвращает список числовых колонок"""
@@ -89,14 +351,31 @@ class DataLoader:
             'total_regions': len(self._df),
             'numeric_columns': len(self.get_numeric_columns()),
             'columns': list(self._df.columns),
-            'file_path': self._file_path
+            'file_path': self._file_path,
+            'sheets': self._sheets
         }
     
+    def compact(self, dtype=np.float64) -> CompactDataset:
+        """
+        Возвращает компактное представление загруженных данных
+        
+        Args:
+            dtype: Точность числового блока (np.float64 или np.float32)
+        """
+        if self._df is None:
+            raise DataLoadError("Данные не загружены")
+        return CompactDataset.from_dataframe(self._df, dtype=dtype)
+    
     @property
     def dataframe(self) -> pd.DataFrame:
         """Возвращает копию загруженного DataFrame"""
         return self._df.copy() if self._df is not None else None
     
+    @property
+    def validation_report(self) -> Optional[ValidationReport]:
+        """Отчёт о проверке последнего загруженного файла"""
+        return self._report
+    
     @property
     def is_loaded(self) -> bool:
         """Проверяет, загружены ли данные"""
@@ -0,0 +1,108 @@
+"""
+Компактное внутреннее представление набора данных
+"""
+
+import hashlib
+from typing import List, Optional
+
+import pandas as pd
+import numpy as np
+
+from ..config.settings import REQUIRED_COLUMN, NON_INDICATOR_COLUMNS
+
+
+def indicator_columns(df: pd.DataFrame) -> List[str]:
+    """Показатели по умолчанию: числовые колонки, кроме NON_INDICATOR_COLUMNS"""
+    return [c for c in df.select_dtypes(include=[np.number]).columns
+            if c not in NON_INDICATOR_COLUMNS]
+
+
+class CompactDataset:
+    """
+    Набор данных в виде кодов регионов и одного непрерывного числового блока.
+
+    Колонка 'Регион' хранится как категориальные int-коды, все показатели -
+    как C-непрерывная матрица (строки - регионы, столбцы - показатели)
+    выбранной точности. Методы расчёта работают напрямую с этой матрицей,
+    не создавая промежуточных DataFrame.
+    """
+
+    def __init__(self, codes: np.ndarray, categories: pd.Index,
+                 values: np.ndarray, columns: List[str]):
+        """
+        Args:
+            codes: Коды регионов (int32), -1 для пустых значений
+            categories: Уникальные названия регионов
+            values: Матрица показателей формы (n_rows, n_columns)
+            columns: Названия показателей
+        """
+        self.codes = codes
+        self.categories = categories
+        self.values = np.ascontiguousarray(values)
+        self.columns = list(columns)
+        self._fingerprint = None
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, dtype=np.float64,
+                       columns: Optional[List[str]] = None) -> 'CompactDataset':
+        """
+        Строит компактное представление из DataFrame
+
+        Args:
+            df: Исходные данные
+            dtype: Точность числового блока (np.float64 или np.float32)
+            columns: Показатели (по умолчанию - indicator_columns(df))
+
+        Returns:
+            CompactDataset
+        """
+        if columns is None:
+            columns = indicator_columns(df)
+
+        if REQUIRED_COLUMN in df.columns:
+            regions = pd.Categorical(df[REQUIRED_COLUMN])
+            codes = regions.codes.astype(np.int32, copy=False)
+            categories = regions.categories
+        else:
+            codes = np.full(len(df), -1, dtype=np.int32)
+            categories = pd.Index([])
+
+        # Один проход по колонкам в заранее выделенный блок без промежуточных копий
+        values = np.empty((len(df), len(columns)), dtype=dtype)
+        for j, col in enumerate(columns):
+            values[:, j] = df[col].to_numpy()
+
+        return cls(codes, categories, values, columns)
+
+    @property
+    def n_rows(self) -> int:
+        """Количество строк"""
+        return self.values.shape[0]
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Тип числового блока"""
+        return self.values.dtype
+
+    @property
+    def nbytes(self) -> int:
+        """Объём памяти, занимаемый представлением"""
+        return self.values.nbytes + self.codes.nbytes
+
+    @property
+    def regions(self) -> np.ndarray:
+        """Названия регионов по строкам"""
+        return np.asarray(self.categories, dtype=object).take(self.codes)
+
+    @property
+    def fingerprint(self) -> str:
+        """Хэш содержимого (для ключей кэша)"""
+        if self._fingerprint is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(str(self.values.dtype).encode())
+            h.update("\x1f".join(self.columns).encode())
+            h.update("\x1f".join(map(str, self.categories)).encode())
+            h.update(self.codes.tobytes())
+            h.update(self.values.tobytes())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
@@ -0,0 +1,192 @@
+"""
+История расчётов: запуски и значения индекса по регионам в SQLite
+"""
+
+import itertools
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import HISTORY_DB_PATH
+from .ranking import ranks
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    created_at  TEXT    NOT NULL,
+    source      TEXT,
+    fingerprint TEXT    NOT NULL,
+    method      TEXT    NOT NULL,
+    params      TEXT,
+    n_regions   INTEGER NOT NULL,
+    seconds     REAL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id  INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    region  TEXT    NOT NULL,
+    value   REAL,
+    rank    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_method_time ON runs(method, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_time ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_fingerprint ON runs(fingerprint);
+CREATE INDEX IF NOT EXISTS idx_results_region ON results(region, run_id);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id);
+"""
+
+
+class HistoryStore:
+    """
+    Локальная база истории расчётов.
+
+    Каждый расчёт - одна строка в runs (отпечаток данных, метод, параметры,
+    время) и по строке на регион в results. Значения пишутся одним
+    executemany внутри транзакции; запросы по региону, методу и времени
+    идут по индексам, без пересчёта.
+    """
+
+    def __init__(self, path: str = HISTORY_DB_PATH):
+        """
+        Args:
+            path: Файл базы (каталог создаётся при необходимости)
+        """
+        in_memory = path == ':memory:'
+        if not in_memory:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if not in_memory:
+            # Чтение истории не блокирует запись нового запуска
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """Закрывает соединение"""
+        self._conn.close()
+
+    def __enter__(self) -> 'HistoryStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record_run(self, regions: Sequence[str], values: np.ndarray, method: str,
+                   fingerprint: str, source: Optional[str] = None,
+                   params: Optional[dict] = None, seconds: Optional[float] = None) -> int:
+        """
+        Сохраняет результаты одного расчёта
+
+        Args:
+            regions: Названия регионов по строкам
+            values: Значения индекса
+            method: Метод расчёта
+            fingerprint: Отпечаток набора данных (CompactDataset.fingerprint)
+            source: Файл с исходными данными
+            params: Параметры расчёта (веса, обработка пропусков и т.п.)
+            seconds: Время расчёта
+
+        Returns:
+            Номер запуска
+        """
+        values = np.asarray(values, dtype=np.float64)
+        created_at = datetime.now().isoformat(timespec='microseconds')
+        # NaN в SQLite - NULL
+        stored = np.where(np.isnan(values), None, values.round(6)).tolist()
+
+        with self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO runs (created_at, source, fingerprint, method, params, n_regions, seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (created_at, source, fingerprint, method,
+                 json.dumps(params, ensure_ascii=False, sort_keys=True) if params else None,
+                 len(values), seconds)
+            )
+            run_id = cur.lastrowid
+            self._conn.executemany(
+                "INSERT INTO results (run_id, region, value, rank) VALUES (?, ?, ?, ?)",
+                zip(itertools.repeat(run_id), map(str, regions), stored, ranks(values).tolist())
+            )
+        return run_id
+
+    def record_frame(self, df: pd.DataFrame, method: str, fingerprint: str,
+                     value_column: str = 'Индекс', key: str = 'Регион', **kwargs) -> int:
+        """Сохраняет результаты из DataFrame (см. record_run)"""
+        return self.record_run(df[key].to_numpy(), df[value_column].to_numpy(dtype=np.float64),
+                               method, fingerprint, **kwargs)
+
+    def runs(self, method: Optional[str] = None, limit: int = 20) -> pd.DataFrame:
+        """Последние запуски (новые первыми)"""
+        where, args = ("WHERE method = ?", [method]) if method else ("", [])
+        return pd.read_sql_query(
+            f"SELECT id, created_at, source, method, params, n_regions, seconds, fingerprint "
+            f"FROM runs {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+            self._conn, params=args + [limit]
+        )
+
+    def region_history(self, region: str, method: Optional[str] = None,
+                       limit: int = 20) -> pd.DataFrame:
+        """
+        Значения индекса региона в последних запусках
+
+        Returns:
+            DataFrame (run_id, created_at, method, value, rank) в хронологическом порядке
+        """
+        where, args = ("AND r.method = ?", [method]) if method else ("", [])
+        df = pd.read_sql_query(
+            f"SELECT r.id AS run_id, r.created_at, r.method, x.value, x.rank "
+            f"FROM results x JOIN runs r ON r.id = x.run_id "
+            f"WHERE x.region = ? {where} "
+            f"ORDER BY r.created_at DESC, r.id DESC LIMIT ?",
+            self._conn, params=[region] + args + [limit]
+        )
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def trends(self, method: str, limit: int = 20) -> pd.DataFrame:
+        """
+        Динамика всех регионов за последние запуски метода
+
+        Returns:
+            DataFrame по регионам: число запусков, первое и последнее значение,
+            изменение значения и ранга, наклон линейного тренда (за запуск)
+        """
+        df = pd.read_sql_query(
+            "SELECT x.run_id, x.region, x.value, x.rank FROM results x "
+            "JOIN (SELECT id FROM runs WHERE method = ? ORDER BY created_at DESC, id DESC LIMIT ?) r "
+            "ON r.id = x.run_id",
+            self._conn, params=[method, limit]
+        )
+        columns = ['Регион', 'Запусков', 'Первое', 'Последнее', 'Изменение', 'Δ Ранг', 'Тренд']
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+
+        # Номер запуска по порядку (0 - самый ранний) и сортировка внутри регионов
+        run_pos = pd.Index(np.sort(df['run_id'].unique())).get_indexer(df['run_id'])
+        df = df.assign(t=run_pos.astype(np.float64)).dropna(subset=['value'])
+        df = df.sort_values(['region', 't'], kind='stable')
+
+        g = df.groupby('region', sort=True)
+        first, last = g.first(), g.last()
+        n = g.size()
+        # Наклон МНК по всем регионам сразу: cov(t, v) / var(t)
+        t_mean, v_mean = g['t'].transform('mean'), g['value'].transform('mean')
+        dt = df['t'] - t_mean
+        cov = (dt * (df['value'] - v_mean)).groupby(df['region']).sum()
+        var = (dt * dt).groupby(df['region']).sum()
+        slope = (cov / var.where(var > 0)).reindex(n.index)
+
+        out = pd.DataFrame({
+            'Регион': n.index,
+            'Запусков': n.to_numpy(),
+            'Первое': first['value'].to_numpy(),
+            'Последнее': last['value'].to_numpy(),
+            'Изменение': (last['value'] - first['value']).to_numpy(),
+            'Δ Ранг': (first['rank'] - last['rank']).to_numpy(),
+            'Тренд': slope.to_numpy(),
+        })
+        return out.sort_values('Изменение', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,98 @@
+"""
+Заполнение пропущенных значений показателей
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import REQUIRED_COLUMN, IMPUTATION_METHODS
+from .aggregation import RollupEngine
+from .dataset import CompactDataset
+
+
+def column_means(values: np.ndarray) -> np.ndarray:
+    """Средние по показателям без учёта NaN (для показателя без значений - NaN)"""
+    present = ~np.isnan(values)
+    count = present.sum(axis=0)
+    total = np.where(present, values, 0.0).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (total / count).astype(values.dtype)
+
+
+def group_means(values: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Средние по показателям внутри групп строк без цикла по группам
+
+    Args:
+        values: Матрица (n_rows, n_columns), может содержать NaN
+        codes: Номер группы для каждой строки (0..n_groups-1)
+        n_groups: Количество групп
+
+    Returns:
+        Матрица (n_groups, n_columns); NaN, если в группе нет значений
+    """
+    n_rows, k = values.shape
+    present = ~np.isnan(values)
+    # Номер ячейки (группа, показатель) для каждого элемента матрицы
+    cell = (codes.astype(np.intp)[:, None] * k + np.arange(k)).ravel()
+    size = n_groups * k
+    total = np.bincount(cell, weights=np.where(present, values, 0.0).ravel(), minlength=size)
+    count = np.bincount(cell, weights=present.ravel(), minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (total / count).reshape(n_groups, k)
+
+
+def district_codes(dataset: CompactDataset, engine: Optional[RollupEngine] = None) -> np.ndarray:
+    """Коды федеральных округов для строк набора данных (неизвестные - "Прочие")"""
+    engine = engine or RollupEngine()
+    # Справочник применяется к уникальным названиям, строки получают коды индексацией
+    category_codes = engine.region_codes(pd.DataFrame({REQUIRED_COLUMN: dataset.categories}))
+    region_codes = np.where(dataset.codes >= 0, category_codes[np.maximum(dataset.codes, 0)], -1)
+    return engine.district_codes(region_codes)
+
+
+def impute(dataset: CompactDataset, strategy: str,
+           engine: Optional[RollupEngine] = None):
+    """
+    Заполняет пропуски в числовом блоке
+
+    Args:
+        dataset: Компактное представление данных
+        strategy: 'mean' - среднее по показателю; 'district_mean' - среднее по
+            федеральному округу (если в округе нет значений - по показателю);
+            'drop' - строки с пропусками исключаются
+        engine: Справочник округов для 'district_mean'
+
+    Returns:
+        Кортеж (values, rows): матрица без пропусков и номера её строк в
+        исходном наборе (None, если строки не исключались)
+
+    Raises:
+        ValueError: Неизвестная стратегия или у набора нет колонки регионов
+    """
+    if strategy not in IMPUTATION_METHODS or strategy == 'skip':
+        raise ValueError(f"Неизвестный способ заполнения пропусков: {strategy}")
+
+    values = dataset.values
+    missing = np.isnan(values)
+
+    if strategy == 'drop':
+        rows = np.flatnonzero(~missing.any(axis=1))
+        return values[rows], rows
+
+    filled = values.copy()
+    fallback = column_means(values)
+    if strategy == 'district_mean':
+        if len(dataset.codes) != dataset.n_rows:
+            raise ValueError("Для заполнения по округам нужны названия регионов")
+        engine = engine or RollupEngine()
+        codes = district_codes(dataset, engine)
+        means = group_means(values, codes, len(engine.districts))
+        means = np.where(np.isnan(means), fallback, means)
+        rows, cols = np.nonzero(missing)
+        filled[rows, cols] = means[codes[rows], cols]
+    else:
+        np.copyto(filled, np.broadcast_to(fallback, values.shape), where=missing)
+    return filled, None
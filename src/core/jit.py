@@ -0,0 +1,82 @@
+"""
+JIT-компилируемые ядра (numba) для горячих циклов расчёта.
+
+numba - необязательная зависимость: если она не установлена или отключена
+переменной окружения FINTRUSTMAP_DISABLE_NUMBA, AVAILABLE = False и модули
+kernels/ranking/aggregation используют реализации на NumPy. Скомпилированный
+код кэшируется на диске (cache=True), поэтому компиляция происходит один раз,
+а не при каждом запуске.
+"""
+
+import numpy as np
+
+from ..config.settings import NUMBA_ENABLED
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+AVAILABLE = NUMBA_ENABLED and njit is not None
+
+
+if AVAILABLE:
+
+    @njit(cache=True, nogil=True)
+    def column_min_max(values):
+        """Минимум и максимум по столбцам за один проход по строкам (NaN - как в NumPy)"""
+        n, k = values.shape
+        mins = values[0].copy()
+        maxs = values[0].copy()
+        for i in range(1, n):
+            for j in range(k):
+                v = values[i, j]
+                if v != v:
+                    # Сравнения с NaN ложны, поэтому однажды записанный NaN сохраняется
+                    mins[j] = v
+                    maxs[j] = v
+                elif v < mins[j]:
+                    mins[j] = v
+                elif v > maxs[j]:
+                    maxs[j] = v
+        return mins, maxs
+
+    @njit(cache=True, nogil=True)
+    def minmax_weighted_sum(values, mins, scale, base, out):
+        """out[i] = base + sum_j (values[i, j] - mins[j]) * scale[j] без промежуточной матрицы"""
+        n, k = values.shape
+        for i in range(n):
+            acc = 0.0
+            for j in range(k):
+                acc += (values[i, j] - mins[j]) * scale[j]
+            out[i] = acc + base
+        return out
+
+    @njit(cache=True, nogil=True)
+    def nan_minmax_weighted_sum(values, mins, scale, const_part, weights, out):
+        """Вариант с пропусками: веса отсутствующих показателей исключаются в строке"""
+        n, k = values.shape
+        for i in range(n):
+            acc = 0.0
+            total = 0.0
+            for j in range(k):
+                v = values[i, j]
+                if v == v:
+                    acc += (v - mins[j]) * scale[j] + const_part[j]
+                    total += weights[j]
+            out[i] = acc / total if total != 0.0 else np.nan
+        return out
+
+    @njit(cache=True, nogil=True)
+    def group_moments(codes, values, n_groups):
+        """Количество, сумма и сумма квадратов значений по группам за один проход"""
+        count = np.zeros(n_groups, dtype=np.int64)
+        total = np.zeros(n_groups, dtype=np.float64)
+        total_sq = np.zeros(n_groups, dtype=np.float64)
+        for i in range(codes.shape[0]):
+            g = codes[i]
+            v = values[i]
+            count[g] += 1
+            total[g] += v
+            total_sq[g] += v * v
+        return count, total, total_sq
@@ -0,0 +1,319 @@
+"""
+Вычислительные ядра для расчёта индексов на NumPy-матрицах
+"""
+
+import numpy as np
+
+from . import jit
+
+# Размер блока строк: промежуточные массивы не превышают CHUNK_ROWS x n_columns
+CHUNK_ROWS = 65536
+
+
+def column_min_max(values: np.ndarray, skipna: bool = False):
+    """
+    Минимум и максимум по каждому показателю
+
+    Args:
+        values: Матрица (n_rows, n_columns)
+        skipna: Пропускать NaN (для показателя без значений - NaN)
+
+    Returns:
+        Кортеж (mins, maxs)
+    """
+    if not skipna:
+        if jit.AVAILABLE and values.shape[0] > 0:
+            return jit.column_min_max(values)
+        return values.min(axis=0), values.max(axis=0)
+    # fmin/fmax.reduce пропускают NaN без предупреждений о пустых столбцах
+    return np.fmin.reduce(values, axis=0), np.fmax.reduce(values, axis=0)
+
+
+def has_missing(values: np.ndarray) -> bool:
+    """Есть ли в матрице NaN (один проход без временной булевой матрицы)"""
+    return bool(np.isnan(values.sum())) and bool(np.isnan(values).any())
+
+
+def minmax_weighted_sum(values: np.ndarray, weights: np.ndarray,
+                        constant_fill: float = 0.0, out: np.ndarray = None) -> np.ndarray:
+    """
+    Взвешенная сумма min-max нормализованных показателей за один проход.
+
+    Нормализованная матрица целиком не создаётся: строки обрабатываются
+    блоками по CHUNK_ROWS, поэтому дополнительная память ограничена
+    размером одного блока.
+
+    Args:
+        values: Матрица (n_rows, n_columns)
+        weights: Веса показателей (n_columns,)
+        constant_fill: Значение нормализованного показателя, если max == min
+        out: Необязательный выходной массив (n_rows,)
+
+    Returns:
+        Массив (n_rows,) со значениями в единицах нормализованной шкалы
+    """
+    weights = np.asarray(weights, dtype=values.dtype)
+    mins, maxs = column_min_max(values)
+    span = maxs - mins
+    varying = span > 0
+
+    scale = np.zeros_like(weights)
+    scale[varying] = weights[varying] / span[varying]
+    # Вклад постоянных показателей одинаков для всех строк
+    base = float(weights[~varying].sum()) * constant_fill
+
+    if out is None:
+        out = np.empty(values.shape[0], dtype=values.dtype)
+    if jit.AVAILABLE:
+        # Построчный проход без временного блока, константа добавляется в том же цикле
+        return jit.minmax_weighted_sum(values, mins, scale, values.dtype.type(base), out)
+    for start in range(0, values.shape[0], CHUNK_ROWS):
+        block = values[start:start + CHUNK_ROWS] - mins
+        np.dot(block, scale, out=out[start:start + CHUNK_ROWS])
+    if base:
+        out += base
+    return out
+
+
+def nan_minmax_weighted_sum(values: np.ndarray, weights: np.ndarray,
+                            constant_fill: float = 0.0, out: np.ndarray = None) -> np.ndarray:
+    """
+    Вариант minmax_weighted_sum для матрицы с пропусками.
+
+    Минимум и максимум считаются по имеющимся значениям; для каждой строки
+    веса отсутствующих показателей исключаются, а остальные нормируются на
+    их сумму. Без пропусков результат совпадает с minmax_weighted_sum.
+    Строки без единого значения получают NaN.
+
+    Args:
+        values: Матрица (n_rows, n_columns), может содержать NaN
+        weights: Веса показателей (n_columns,) с суммой 1
+        constant_fill: Значение нормализованного показателя, если max == min
+        out: Необязательный выходной массив (n_rows,)
+
+    Returns:
+        Массив (n_rows,) со значениями в единицах нормализованной шкалы
+    """
+    weights = np.asarray(weights, dtype=values.dtype)
+    mins, maxs = column_min_max(values, skipna=True)
+    span = maxs - mins
+    varying = span > 0
+
+    scale = np.zeros_like(weights)
+    scale[varying] = weights[varying] / span[varying]
+    const_part = np.where(varying, 0.0, weights * constant_fill).astype(values.dtype)
+    mins = np.nan_to_num(mins)
+
+    if out is None:
+        out = np.empty(values.shape[0], dtype=values.dtype)
+    if jit.AVAILABLE:
+        return jit.nan_minmax_weighted_sum(values, mins, scale, const_part, weights, out)
+    for start in range(0, values.shape[0], CHUNK_ROWS):
+        stop = start + CHUNK_ROWS
+        block = values[start:stop] - mins
+        present = ~np.isnan(block)
+        np.copyto(block, 0.0, where=~present)
+        present = present.astype(values.dtype)
+        total = present @ weights
+        np.dot(block, scale, out=out[start:stop])
+        out[start:stop] += present @ const_part
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[start:stop] /= total
+    return out
+
+
+def nan_weighted_mean(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Взвешенное среднее по строкам с перераспределением весов пропущенных показателей"""
+    weights = np.asarray(weights, dtype=values.dtype)
+    out = np.empty(values.shape[0], dtype=values.dtype)
+    for start in range(0, values.shape[0], CHUNK_ROWS):
+        stop = start + CHUNK_ROWS
+        block = values[start:stop]
+        present = ~np.isnan(block)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[start:stop] = (np.where(present, block, 0.0) @ weights) / (present @ weights)
+    return out
+
+
+def _count_groups(values: np.ndarray, skipna: bool):
+    """Группы колонок с одинаковым количеством значений: пары (count, cols)"""
+    n, m = values.shape
+    counts = n - np.isnan(values).sum(axis=0) if skipna else np.full(m, n)
+    for count in np.unique(counts):
+        yield int(count), np.flatnonzero(counts == count)
+
+
+def _select_quantiles(values: np.ndarray, cols: np.ndarray, q: np.ndarray, count: int) -> np.ndarray:
+    """Квантили q колонок cols, в каждой из которых count значений (остальное - NaN)"""
+    if count == 0:
+        return np.full((len(q), len(cols)), np.nan)
+    pos = q * (count - 1)
+    # Позиции, отличающиеся от целых на погрешность округления, - точные порядковые статистики
+    whole = np.round(pos)
+    pos = np.where(np.abs(pos - whole) < 1e-9, whole, pos)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.ceil(pos).astype(np.intp)
+    # Выбор на копии, где каждый показатель - непрерывная строка: исходная матрица
+    # только для чтения, а выбор по строкам быстрее, чем по столбцам C-матрицы
+    block = values.T[cols]
+    block.partition(np.unique(np.concatenate([lo, hi])), axis=1)
+    return (block[:, lo] + (block[:, hi] - block[:, lo]) * (pos - lo)).T
+
+
+def column_quantiles(values: np.ndarray, q, skipna: bool = False) -> np.ndarray:
+    """
+    Квантили всех показателей (линейная интерполяция, как np.quantile)
+
+    Порядковые статистики выбираются np.partition без полной сортировки:
+    один вызов на все колонки с одинаковым количеством значений (без
+    пропусков - один вызов на всю матрицу). NaN при выборе уходят в конец.
+
+    Args:
+        values: Матрица (n_rows, n_columns)
+        q: Уровни квантилей (0..1)
+        skipna: Пропускать NaN (для показателя без значений - NaN)
+
+    Returns:
+        Массив (len(q), n_columns)
+    """
+    q = np.asarray(q, dtype=np.float64)
+    out = np.empty((len(q), values.shape[1]))
+    for count, cols in _count_groups(values, skipna):
+        out[:, cols] = _select_quantiles(values, cols, q, count)
+    return out
+
+
+def winsorized_weighted_sum(values: np.ndarray, weights: np.ndarray, limits=(0.05, 0.95),
+                            constant_fill: float = 0.0, skipna: bool = False,
+                            out: np.ndarray = None) -> np.ndarray:
+    """
+    Взвешенная сумма показателей, нормализованных между квантилями limits.
+
+    Значения за пределами квантилей обрезаются до границ, поэтому один
+    выброс не сжимает шкалу остальных регионов. Границы выбираются одним
+    вызовом column_quantiles, затем строки обрабатываются блоками по
+    CHUNK_ROWS. С пропусками веса отсутствующих показателей исключаются,
+    как в nan_minmax_weighted_sum.
+
+    Args:
+        values: Матрица (n_rows, n_columns)
+        weights: Веса показателей (n_columns,) с суммой 1
+        limits: Нижний и верхний уровни квантилей
+        constant_fill: Значение нормализованного показателя, если границы совпадают
+        skipna: Матрица содержит пропуски
+        out: Необязательный выходной массив (n_rows,)
+
+    Returns:
+        Массив (n_rows,) со значениями в единицах нормализованной шкалы
+    """
+    weights = np.asarray(weights, dtype=values.dtype)
+    lows, highs = column_quantiles(values, limits, skipna).astype(values.dtype)
+    span = highs - lows
+    varying = span > 0
+
+    scale = np.zeros_like(weights)
+    scale[varying] = weights[varying] / span[varying]
+    const_part = np.where(varying, 0.0, weights * constant_fill).astype(values.dtype)
+    lows = np.nan_to_num(lows)
+
+    base = const_part.sum()
+
+    if out is None:
+        out = np.empty(values.shape[0], dtype=values.dtype)
+    for start in range(0, values.shape[0], CHUNK_ROWS):
+        stop = start + CHUNK_ROWS
+        block = np.clip(values[start:stop], lows, highs)
+        block -= lows
+        if not skipna:
+            np.dot(block, scale, out=out[start:stop])
+            out[start:stop] += base
+            continue
+        present = ~np.isnan(block)
+        np.copyto(block, 0.0, where=~present)
+        present = present.astype(values.dtype)
+        total = present @ weights
+        np.dot(block, scale, out=out[start:stop])
+        out[start:stop] += present @ const_part
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[start:stop] /= total
+    return out
+
+
+def _grid_ranks(x: np.ndarray, grid: np.ndarray, probs: np.ndarray, distinct: bool) -> np.ndarray:
+    """
+    Доля значений показателя ниже x по сетке его квантилей (совпадения - средний ранг)
+
+    distinct - узлы сетки строго возрастают: тогда достаточно интерполяции,
+    иначе значению, совпавшему с несколькими узлами, - средний из их уровней.
+    """
+    ranks = np.interp(x, grid, probs)
+    if distinct:
+        return ranks
+    left = np.searchsorted(grid, x, 'left')
+    right = np.searchsorted(grid, x, 'right')
+    # NaN совпадает с NaN-сеткой показателя без значений: пропуск остаётся пропуском
+    tied = (right > left) & ~np.isnan(x)
+    if tied.any():
+        k = len(grid)
+        ranks[tied] = (probs[np.minimum(left[tied], k - 1)] + probs[right[tied] - 1]) / 2
+    return ranks
+
+
+def percentile_rank_weighted_sum(values: np.ndarray, weights: np.ndarray, knots: int = 1001,
+                                 skipna: bool = False, out: np.ndarray = None) -> np.ndarray:
+    """
+    Взвешенная сумма перцентильных рангов показателей (0..1).
+
+    Ранг берётся по сетке из min(count, knots) квантилей каждого
+    показателя (count - количество его значений), выбранных np.partition
+    одним вызовом на колонки с одинаковым count; между узлами сетки -
+    линейная интерполяция. Если значений не больше knots, ранг точный:
+    (средний ранг - 1) / (count - 1), одинаковые значения получают
+    одинаковый ранг, постоянный показатель - 0.5. Строки обрабатываются
+    блоками по CHUNK_ROWS; с пропусками веса отсутствующих показателей
+    исключаются.
+
+    Args:
+        values: Матрица (n_rows, n_columns)
+        weights: Веса показателей (n_columns,) с суммой 1
+        knots: Максимальное количество узлов сетки квантилей
+        skipna: Матрица содержит пропуски
+        out: Необязательный выходной массив (n_rows,)
+
+    Returns:
+        Массив (n_rows,) со значениями 0..1
+    """
+    weights = np.asarray(weights, dtype=values.dtype)
+    grids = [None] * values.shape[1]
+    for count, cols in _count_groups(values, skipna):
+        probs = np.linspace(0.0, 1.0, max(2, min(count, knots)))
+        for j, grid in zip(cols, _select_quantiles(values, cols, probs, count).T):
+            grids[j] = (grid, probs, bool(np.all(grid[1:] > grid[:-1])))
+
+    if out is None:
+        out = np.empty(values.shape[0], dtype=values.dtype)
+    for start in range(0, values.shape[0], CHUNK_ROWS):
+        stop = start + CHUNK_ROWS
+        block = values[start:stop]
+        ranks = np.empty(block.shape, dtype=values.dtype)
+        for j, (grid, probs, distinct) in enumerate(grids):
+            ranks[:, j] = _grid_ranks(block[:, j], grid, probs, distinct)
+        if not skipna:
+            np.dot(ranks, weights, out=out[start:stop])
+            continue
+        present = ~np.isnan(ranks)
+        np.copyto(ranks, 0.0, where=~present)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[start:stop] = (ranks @ weights) / (present.astype(values.dtype) @ weights)
+    return out
+
+
+def rescale_0_100(raw: np.ndarray, constant: float = 50.0) -> np.ndarray:
+    """Линейное приведение к шкале [0, 100] на месте"""
+    lo, hi = raw.min(), raw.max()
+    if hi == lo:
+        raw.fill(constant)
+        return raw
+    raw -= lo
+    raw *= 100.0 / (hi - lo)
+    return raw
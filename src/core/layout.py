@@ -0,0 +1,107 @@
+"""
+Раскладка регионов по блокам федеральных округов для тепловой карты
+"""
+
+from typing import Dict, List, Tuple
+
+import pandas as pd
+import numpy as np
+
+from ..config.settings import REQUIRED_COLUMN
+from ..config.federal_districts import FEDERAL_DISTRICTS
+
+
+class DistrictLayout:
+    """
+    Положение каждого региона в сетке своего федерального округа.
+
+    Повторяет раскладку тепловой карты GUI: регионы округа в порядке
+    справочника заполняют сетку ceil(sqrt(n)) колонок по строкам. Все поля -
+    плоские массивы по ячейкам, готовые для передачи в библиотеки графиков.
+    """
+
+    def __init__(self, names: List[str], shapes: np.ndarray, district: np.ndarray,
+                 row: np.ndarray, col: np.ndarray, regions: np.ndarray,
+                 values: np.ndarray, vmin: float, vmax: float):
+        self.names = names
+        self.shapes = shapes
+        self.district = district
+        self.row = row
+        self.col = col
+        self.regions = regions
+        self.values = values
+        self.vmin = vmin
+        self.vmax = vmax
+        # Значения, приведённые к [0, 1] по всем регионам
+        if vmax == vmin:
+            self.norm = np.zeros_like(values)
+        else:
+            self.norm = (values - vmin) / (vmax - vmin)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, value_column: str = 'Индекс',
+              districts: Dict[str, List[str]] = FEDERAL_DISTRICTS) -> 'DistrictLayout':
+        """
+        Строит раскладку по результатам расчёта
+
+        Args:
+            df: Результаты с колонками 'Регион' и value_column
+            value_column: Колонка значений
+            districts: Справочник федеральных округов
+
+        Returns:
+            DistrictLayout (регионы вне справочника не отображаются)
+        """
+        names = list(districts)
+        catalog = pd.Index([r for d in districts.values() for r in d])
+        catalog_district = np.repeat(np.arange(len(names)), [len(d) for d in districts.values()])
+
+        pos = catalog.get_indexer(df[REQUIRED_COLUMN])
+        present = np.flatnonzero(pos >= 0)
+        # Порядок справочника внутри округа, как в GUI
+        present = present[np.argsort(pos[present], kind='stable')]
+        district = catalog_district[pos[present]].astype(np.int32)
+
+        counts = np.bincount(district, minlength=len(names))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        rank = np.arange(len(district)) - starts[district]
+
+        ncols = np.where(counts > 0, np.ceil(np.sqrt(counts)), 1).astype(np.int32)
+        nrows = np.ceil(counts / ncols).astype(np.int32)
+
+        values = df[value_column].to_numpy(dtype=np.float64)
+        all_values = values[~np.isnan(values)]
+        vmin = float(all_values.min()) if len(all_values) else 0.0
+        vmax = float(all_values.max()) if len(all_values) else 0.0
+
+        return cls(
+            names=names,
+            shapes=np.column_stack((nrows, ncols)),
+            district=district,
+            row=(rank // ncols[district]).astype(np.int32),
+            col=(rank % ncols[district]).astype(np.int32),
+            regions=df[REQUIRED_COLUMN].to_numpy()[present],
+            values=values[present],
+            vmin=vmin,
+            vmax=vmax,
+        )
+
+    def cells(self, d: int) -> np.ndarray:
+        """Позиции ячеек округа d в плоских массивах"""
+        return np.flatnonzero(self.district == d)
+
+    def grid(self, d: int, fill: float = np.nan) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Сетка округа d
+
+        Returns:
+            Кортеж (нормированные значения (rows, cols), позиции ячеек (rows, cols),
+            -1 для пустых ячеек)
+        """
+        rows, cols = self.shapes[d]
+        idx = self.cells(d)
+        grid = np.full((rows, cols), fill)
+        where = np.full((rows, cols), -1, dtype=np.intp)
+        grid[self.row[idx], self.col[idx]] = self.norm[idx]
+        where[self.row[idx], self.col[idx]] = idx
+        return grid, where
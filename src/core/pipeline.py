@@ -0,0 +1,494 @@
+"""
+Ленивый конвейер расчёта: загрузка → выбор показателей → индекс → агрегаты → рейтинг → экспорт
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import (
+    REQUIRED_COLUMN, POPULATION_COLUMN, SPATIAL_PERMUTATIONS, SPATIAL_ALPHA, CLUSTER_K_RANGE
+)
+from .aggregation import RollupEngine
+from .backends import get_backend
+from .calculator import IndexCalculator, Weights
+from .clustering import CLUSTER_COLUMN, ClusterResult, cluster_profiles
+from .data_loader import DataLoader
+from .dataset import CompactDataset, indicator_columns
+from .ranking import ranked_frame, top_n
+from .spatial import MoranResult, SpatialWeights, morans_i, local_moran
+from .validation import ValidationReport, ValidationSchema, DEFAULT_SCHEMA
+
+EXPORT_KINDS = ('results', 'xlsx_heatmap', 'html')
+# Колонки, добавляемые конвейером: не считаются показателями при повторном расчёте
+RESULT_COLUMNS = ('Индекс', CLUSTER_COLUMN)
+CLUSTERS_SHEET = 'Группы'
+
+
+class PipelineError(Exception):
+    """Исключение при ошибке в описании конвейера"""
+    pass
+
+
+class PipelineCache:
+    """
+    Промежуточные результаты, общие для всех запусков конвейеров.
+
+    Загруженные таблицы хранятся по (путь, время изменения, размер, лист,
+    колонки, схема), калькуляторы и группировки - по отпечатку данных и
+    параметрам, поэтому повторный запуск с другим методом не перечитывает
+    файл и не повторяет заполнение пропусков, а уже посчитанные индексы и
+    группы берутся из кэша.
+    """
+
+    def __init__(self, max_frames: int = 8, max_calculators: int = 16, max_clusters: int = 16):
+        self._frames = OrderedDict()
+        self._calculators = OrderedDict()
+        self._clusters = OrderedDict()
+        self._max_frames = max_frames
+        self._max_calculators = max_calculators
+        self._max_clusters = max_clusters
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get(store: OrderedDict, key):
+        value = store.get(key)
+        if value is not None:
+            store.move_to_end(key)
+        return value
+
+    @staticmethod
+    def _put(store: OrderedDict, key, value, limit: int):
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > limit:
+            store.popitem(last=False)
+
+    def frame(self, key):
+        with self._lock:
+            return self._get(self._frames, key)
+
+    def put_frame(self, key, value):
+        with self._lock:
+            self._put(self._frames, key, value, self._max_frames)
+
+    def calculator(self, dataset: CompactDataset, impute: str) -> IndexCalculator:
+        """Калькулятор для набора данных (один на отпечаток, колонки и обработку пропусков)"""
+        key = (dataset.fingerprint, impute)
+        with self._lock:
+            calc = self._get(self._calculators, key)
+            if calc is None:
+                calc = IndexCalculator.from_dataset(dataset, impute)
+                self._put(self._calculators, key, calc, self._max_calculators)
+            return calc
+
+    def clusters(self, calc: IndexCalculator, k: Optional[int], k_range: Sequence[int],
+                 seed: int) -> ClusterResult:
+        """Группировка строк калькулятора (одна на отпечаток данных и параметры)"""
+        key = (calc.dataset.fingerprint, calc.impute, k, tuple(k_range), seed)
+        with self._lock:
+            result = self._get(self._clusters, key)
+        if result is None:
+            # Расчёт вне блокировки: остальные этапы других конвейеров не ждут
+            result = cluster_profiles(calc, k, k_range, seed)
+            with self._lock:
+                self._put(self._clusters, key, result, self._max_clusters)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._calculators.clear()
+            self._clusters.clear()
+
+
+DEFAULT_CACHE = PipelineCache()
+
+
+class PipelineResult:
+    """Результаты выполнения конвейера"""
+
+    def __init__(self):
+        self.frame: Optional[pd.DataFrame] = None
+        self.values: Optional[np.ndarray] = None
+        self.columns: List[str] = []
+        self.calculator: Optional[IndexCalculator] = None
+        self.clusters: Optional[ClusterResult] = None
+        self.impute: Optional[str] = None
+        self.report: Optional[ValidationReport] = None
+        self.rollups: Dict[str, pd.DataFrame] = {}
+        self.ranked: Optional[pd.DataFrame] = None
+        self.moran: Optional[MoranResult] = None
+        self.lisa: Optional[pd.DataFrame] = None
+        self.exports: Dict[str, Optional[Exception]] = {}
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def dataset(self) -> Optional[CompactDataset]:
+        """Числовой блок расчёта (для бэкендов без калькулятора строится по запросу)"""
+        if self.calculator is not None:
+            return self.calculator.dataset
+        if self.frame is None or not self.columns:
+            return None
+        return CompactDataset.from_dataframe(self.frame, columns=self.columns)
+
+    @property
+    def statistics(self) -> Dict[str, float]:
+        """Статистика индекса (пустой словарь, если индекс не рассчитан)"""
+        if self.frame is None:
+            return {}
+        return IndexCalculator.get_statistics(self.frame)
+
+    @property
+    def export_errors(self) -> Dict[str, Exception]:
+        """Неудавшиеся экспорты {путь: ошибка}"""
+        return {path: e for path, e in self.exports.items() if e is not None}
+
+
+class Pipeline:
+    """
+    Описание расчёта, выполняемое только при collect().
+
+    Каждый метод-построитель возвращает новый конвейер, исходный не
+    меняется. Перед выполнением план оптимизируется:
+    - колонки, не нужные ни одному этапу, не читаются из файла (usecols);
+    - нормализация и взвешивание выполняются одним проходом по числовому
+      блоку (fused min-max + weighted sum), без промежуточных таблиц;
+    - загруженные таблицы и калькуляторы берутся из PipelineCache.
+
+    backend='polars' выполняет чтение и расчёт индекса в Polars (см.
+    backends); агрегаты, рейтинг и экспорт работают с pandas.DataFrame.
+
+    Пример:
+        result = (Pipeline.load('data.xlsx')
+                  .select(['Показатель 1', 'Показатель 2'])
+                  .normalize('cbr_method').weight({'Показатель 1': 2})
+                  .aggregate().rank()
+                  .export('out.xlsx')
+                  .collect())
+    """
+
+    def __init__(self, source=None, stages: Optional[List[tuple]] = None,
+                 cache: Optional[PipelineCache] = None, backend: str = 'pandas'):
+        self._source = source
+        self._stages = list(stages or [])
+        self._cache = cache or DEFAULT_CACHE
+        self._backend = backend
+
+    # --- Построение плана ---
+
+    @classmethod
+    def load(cls, file_path: str, sheet: Union[str, int] = 0,
+             schema: ValidationSchema = DEFAULT_SCHEMA, stream: bool = False,
+             cache: Optional[PipelineCache] = None, backend: str = 'pandas') -> 'Pipeline':
+        """
+        Конвейер с чтением Excel-файла
+
+        Args:
+            file_path: Путь к файлу
+            sheet: Имя или номер листа
+            schema: Схема проверки данных
+            stream: Потоковое чтение с проверкой по частям (без отбора колонок)
+            cache: Кэш промежуточных результатов (по умолчанию - общий)
+            backend: 'pandas' или 'polars'
+        """
+        return cls(('file', str(file_path), sheet, schema, stream), cache=cache, backend=backend)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, cache: Optional[PipelineCache] = None,
+                   backend: str = 'pandas') -> 'Pipeline':
+        """Конвейер над уже загруженной таблицей (не копируется)"""
+        return cls(('frame', df), cache=cache, backend=backend)
+
+    def _with(self, stage: tuple) -> 'Pipeline':
+        return Pipeline(self._source, self._stages + [stage], self._cache, self._backend)
+
+    def _find(self, name: str) -> Optional[tuple]:
+        for stage in reversed(self._stages):
+            if stage[0] == name:
+                return stage
+        return None
+
+    def select(self, columns: Sequence[str]) -> 'Pipeline':
+        """Показатели для расчёта (по умолчанию - все числовые колонки)"""
+        return self._with(('select', list(columns)))
+
+    def normalize(self, method: str = 'min_max_normalized', impute: str = 'skip') -> 'Pipeline':
+        """
+        Метод нормализации/расчёта индекса
+
+        Args:
+            method: 'min_max_normalized', 'simple_average', 'pca', 'cbr_method',
+                'winsorized' или 'percentile_rank'
+            impute: Обработка пропусков (см. IndexCalculator)
+        """
+        return self._with(('normalize', method, impute))
+
+    def weight(self, weights: Weights = None) -> 'Pipeline':
+        """Веса показателей (None - равные)"""
+        return self._with(('weight', weights))
+
+    def index(self, method: str = 'min_max_normalized', weights: Weights = None,
+              impute: str = 'skip') -> 'Pipeline':
+        """Сокращение для normalize(method, impute).weight(weights)"""
+        return self.normalize(method, impute).weight(weights)
+
+    def aggregate(self, engine: Optional[RollupEngine] = None,
+                  weight_column: Optional[str] = POPULATION_COLUMN) -> 'Pipeline':
+        """Агрегаты по федеральным округам (и регионам для филиалов)"""
+        return self._with(('aggregate', engine, weight_column))
+
+    def rank(self, n: Optional[int] = None) -> 'Pipeline':
+        """Рейтинг по индексу (n - только первые n мест)"""
+        return self._with(('rank', n))
+
+    def cluster(self, k: Optional[int] = None, k_range: Sequence[int] = CLUSTER_K_RANGE,
+                seed: int = 0) -> 'Pipeline':
+        """
+        Группы регионов по профилю нормализованных показателей (колонка 'Группа')
+
+        Args:
+            k: Количество групп; None - выбор по силуэту из k_range
+            k_range: Диапазон (min, max) для выбора количества групп
+            seed: Зерно генератора
+        """
+        return self._with(('cluster', k, tuple(k_range), seed))
+
+    def spatial(self, permutations: int = SPATIAL_PERMUTATIONS, alpha: float = SPATIAL_ALPHA,
+                seed: Optional[int] = None) -> 'Pipeline':
+        """Moran's I и локальные кластеры (LISA) по соседству регионов (см. spatial)"""
+        return self._with(('spatial', permutations, alpha, seed))
+
+    def export(self, file_path: str, kind: str = 'results', **options) -> 'Pipeline':
+        """
+        Экспорт результатов
+
+        Args:
+            file_path: Путь к файлу
+            kind: 'results' - таблица рейтинга и агрегатов (.xlsx),
+                'xlsx_heatmap' - раскрашенная книга, 'html' - интерактивная карта
+            **options: Параметры функции экспорта (colormap, show_values, ...)
+        """
+        if kind not in EXPORT_KINDS:
+            raise PipelineError(f"Неизвестный вид экспорта: {kind}")
+        return self._with(('export', str(file_path), kind, options))
+
+    # --- Планирование ---
+
+    def _plan(self) -> dict:
+        """Оптимизированный план: что читать и какие этапы выполнять"""
+        if self._source is None:
+            raise PipelineError("Конвейер без источника данных: используйте Pipeline.load или from_frame")
+
+        select = self._find('select')
+        normalize = self._find('normalize')
+        weight = self._find('weight')
+        aggregate = self._find('aggregate')
+        rank = self._find('rank')
+        spatial = self._find('spatial')
+        cluster = self._find('cluster')
+        exports = [s for s in self._stages if s[0] == 'export']
+
+        if weight is not None and normalize is None:
+            normalize = ('normalize', 'min_max_normalized', 'skip')
+        if any(kind == 'results' for _, _, kind, _ in exports) and rank is None:
+            rank = ('rank', None)
+
+        # Отбор колонок для чтения: регион, выбранные показатели, веса агрегатов
+        usecols = None
+        if select is not None:
+            usecols = [REQUIRED_COLUMN] + [c for c in select[1] if c != REQUIRED_COLUMN]
+            if aggregate is not None and aggregate[2]:
+                usecols.append(aggregate[2])
+
+        return {
+            'usecols': usecols,
+            'columns': select[1] if select is not None else None,
+            'index': None if normalize is None else
+                     (normalize[1], None if weight is None else weight[1], normalize[2]),
+            'aggregate': aggregate,
+            'rank': rank,
+            'spatial': spatial,
+            'cluster': cluster,
+            'exports': exports,
+        }
+
+    def explain(self) -> str:
+        """Текстовое описание оптимизированного плана"""
+        plan = self._plan()
+        lines = []
+        if self._source[0] == 'file':
+            _, path, sheet, _, stream = self._source
+            how = f"лист {sheet}" + (", потоково" if stream else "")
+            cols = "все колонки" if plan['usecols'] is None or stream else ", ".join(plan['usecols'])
+            lines.append(f"чтение {os.path.basename(path)} ({how}; {cols}) + проверка")
+        else:
+            lines.append("таблица в памяти")
+        if plan['index']:
+            method, weights, impute = plan['index']
+            how = "за один проход" if self._backend == 'pandas' else f"запросом {self._backend}"
+            lines.append(f"индекс {method}: нормализация и веса {how} "
+                         f"(веса: {'равные' if weights is None else weights}; пропуски: {impute})")
+        if plan['cluster']:
+            k = plan['cluster'][1]
+            lines.append("группы по профилю показателей (mini-batch k-means, "
+                         + (f"k={k})" if k else "k по силуэту)"))
+        if plan['aggregate']:
+            lines.append("агрегаты по федеральным округам")
+        if plan['rank']:
+            n = plan['rank'][1]
+            lines.append("рейтинг" + (f" (первые {n})" if n else ""))
+        if plan['spatial']:
+            lines.append(f"Moran's I и LISA ({plan['spatial'][1]} перестановок)")
+        for _, path, kind, _ in plan['exports']:
+            lines.append(f"экспорт {kind} → {path}")
+        return "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1))
+
+    # --- Выполнение ---
+
+    def _read(self, plan: dict, result: PipelineResult) -> pd.DataFrame:
+        if self._source[0] == 'frame':
+            return self._source[1]
+
+        _, path, sheet, schema, stream = self._source
+        stat = os.stat(path) if os.path.exists(path) else None
+        key = (os.path.abspath(path), stat and stat.st_mtime_ns, stat and stat.st_size,
+               sheet, stream, None if stream or plan['usecols'] is None else tuple(plan['usecols']),
+               schema.key, self._backend)
+        cached = self._cache.frame(key) if stat is not None else None
+        if cached is not None:
+            df, result.report = cached
+            return df
+
+        loader = DataLoader(schema, self._backend)
+        if stream:
+            df = loader.load_excel_streaming(path, sheet=sheet)
+        else:
+            df = loader.load_excel(path, sheet=sheet, columns=plan['usecols'])
+        result.report = loader.validation_report
+        if stat is not None:
+            self._cache.put_frame(key, (df, result.report))
+        return df
+
+    def read(self) -> pd.DataFrame:
+        """
+        Загрузка источника по плану конвейера, без расчёта
+
+        Читаются те же колонки, что и при collect(), а таблица попадает в
+        кэш, поэтому следующий collect() файл не перечитывает.
+
+        Raises:
+            DataLoadError: При ошибке загрузки
+        """
+        return self._read(self._plan(), PipelineResult())
+
+    def collect(self, strict_exports: bool = False) -> PipelineResult:
+        """
+        Выполняет конвейер
+
+        Args:
+            strict_exports: Прерывать выполнение при ошибке экспорта
+                (по умолчанию ошибки собираются в result.exports)
+
+        Returns:
+            PipelineResult
+
+        Raises:
+            DataLoadError: При ошибке загрузки
+            CalculationError: При ошибке расчёта
+            PipelineError: При ошибке в описании конвейера
+            SpatialError: При ошибке пространственного анализа
+        """
+        plan = self._plan()
+        result = PipelineResult()
+
+        start = time.perf_counter()
+        df = self._read(plan, result)
+        result.timings['load'] = time.perf_counter() - start
+
+        if plan['index']:
+            method, weights, impute = plan['index']
+            start = time.perf_counter()
+            columns = plan['columns']
+            if columns is None:
+                columns = indicator_columns(df)
+            if self._backend == 'pandas':
+                dataset = CompactDataset.from_dataframe(df, columns=columns)
+                calc = self._cache.calculator(dataset, impute)
+                result.values = calc.calculate_values(method, weights)
+                result.calculator = calc
+            else:
+                result.values = get_backend(self._backend).calculate_values(
+                    df, method, weights, columns, impute)
+            result.columns = columns
+            result.impute = impute
+            # Исходные колонки не копируются (Copy-on-Write)
+            df = df.assign(**{'Индекс': result.values})
+            result.timings['index'] = time.perf_counter() - start
+        elif 'Индекс' in df.columns:
+            result.values = df['Индекс'].to_numpy()
+        if plan['cluster']:
+            _, k, k_range, seed = plan['cluster']
+            start = time.perf_counter()
+            calc = result.calculator
+            if calc is None:
+                columns = result.columns or plan['columns'] or indicator_columns(df)
+                impute = plan['index'][2] if plan['index'] else 'skip'
+                calc = self._cache.calculator(CompactDataset.from_dataframe(df, columns=columns), impute)
+            result.clusters = self._cache.clusters(calc, k, k_range, seed)
+            result.rollups[CLUSTERS_SHEET] = result.clusters.profiles(calc.dataset.values)
+            df = df.assign(**{CLUSTER_COLUMN: result.clusters.group_numbers()})
+            result.timings['cluster'] = time.perf_counter() - start
+        result.frame = df
+
+        needs_index = plan['aggregate'] or plan['rank'] or plan['spatial'] or plan['exports']
+        if needs_index and 'Индекс' not in df.columns:
+            raise PipelineError("Нет колонки 'Индекс': добавьте этап normalize/index")
+
+        if plan['aggregate']:
+            _, engine, weight_column = plan['aggregate']
+            start = time.perf_counter()
+            result.rollups.update((engine or RollupEngine()).rollup(df, weight_column=weight_column))
+            result.timings['aggregate'] = time.perf_counter() - start
+
+        if plan['rank']:
+            n = plan['rank'][1]
+            result.ranked = ranked_frame(df) if n is None else top_n(df, n)
+
+        if plan['spatial']:
+            _, permutations, alpha, seed = plan['spatial']
+            start = time.perf_counter()
+            weights = SpatialWeights.from_regions(df[REQUIRED_COLUMN].astype(str).tolist())
+            result.moran = morans_i(df['Индекс'].to_numpy(), weights, permutations, seed)
+            result.lisa = local_moran(df, weights, permutations=permutations, alpha=alpha, seed=seed)
+            result.timings['spatial'] = time.perf_counter() - start
+
+        for _, path, kind, options in plan['exports']:
+            start = time.perf_counter()
+            try:
+                self._export(result, path, kind, options)
+                result.exports[path] = None
+            except Exception as e:
+                if strict_exports:
+                    raise
+                result.exports[path] = e
+            result.timings[f'export {kind}'] = time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def _export(result: PipelineResult, path: str, kind: str, options: dict):
+        # Модули экспорта импортируются только при необходимости
+        if kind == 'results':
+            from ..export.excel import write_results
+            write_results(path, result.ranked, result.rollups or None)
+        elif kind == 'xlsx_heatmap':
+            from ..export.excel import write_heatmap_workbook
+            write_heatmap_workbook(result.frame, path, **options)
+        else:
+            from ..export.html import write_heatmap_html
+            write_heatmap_html(result.frame, path, **options)
@@ -0,0 +1,155 @@
+"""
+Рейтинги: топ/антитоп без полной сортировки и изменения рангов между периодами
+"""
+
+from typing import Tuple
+
+import pandas as pd
+import numpy as np
+
+from ..config.settings import REQUIRED_COLUMN
+
+INDEX_COLUMN = 'Индекс'
+RANK_COLUMN = 'Ранг'
+
+
+def top_n_indices(values: np.ndarray, n: int, largest: bool = True) -> np.ndarray:
+    """
+    Позиции n наибольших (наименьших) значений в порядке рейтинга.
+
+    Выбор - np.argpartition за O(len), сортируются только n найденных
+    элементов. NaN всегда попадают в конец рейтинга.
+
+    Args:
+        values: Значения
+        n: Количество позиций
+        largest: True - наибольшие, False - наименьшие
+
+    Returns:
+        Массив позиций длины min(n, len(values))
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = max(0, min(n, len(values)))
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    keys = -values if largest else values.copy()
+    keys[np.isnan(keys)] = np.inf
+
+    if n < len(keys):
+        candidates = np.argpartition(keys, n - 1)[:n]
+    else:
+        candidates = np.arange(len(keys))
+    return candidates[np.argsort(keys[candidates], kind='stable')]
+
+
+def rank_order(values: np.ndarray, largest: bool = True) -> np.ndarray:
+    """Полный порядок рейтинга (одна устойчивая сортировка, NaN в конце)"""
+    return top_n_indices(values, len(values), largest)
+
+
+def ranks(values: np.ndarray, largest: bool = True) -> np.ndarray:
+    """Места в рейтинге (1 - лучшее) для каждой позиции"""
+    order = rank_order(values, largest)
+    result = np.empty(len(order), dtype=np.int64)
+    result[order] = np.arange(1, len(order) + 1)
+    return result
+
+
+def _ranked(df: pd.DataFrame, positions: np.ndarray, start: int = 1) -> pd.DataFrame:
+    out = df.take(positions).reset_index(drop=True)
+    out.index = pd.RangeIndex(start, start + len(out), name=RANK_COLUMN)
+    return out
+
+
+def top_n(df: pd.DataFrame, n: int, column: str = INDEX_COLUMN) -> pd.DataFrame:
+    """
+    Первые n строк рейтинга по колонке
+
+    Returns:
+        DataFrame с индексом 'Ранг'
+    """
+    return _ranked(df, top_n_indices(df[column].to_numpy(), n, largest=True))
+
+
+def bottom_n(df: pd.DataFrame, n: int, column: str = INDEX_COLUMN) -> pd.DataFrame:
+    """
+    Последние n строк рейтинга по колонке (от худшего)
+
+    Returns:
+        DataFrame с индексом 'Ранг' (места считаются от последнего места
+        среди строк со значением; строки без значения не входят)
+    """
+    values = df[column].to_numpy(dtype=np.float64)
+    valid = int(np.count_nonzero(~np.isnan(values)))
+    positions = top_n_indices(values, min(n, valid), largest=False)
+    out = _ranked(df, positions)
+    out.index = pd.Index(valid - np.arange(len(out)), name=RANK_COLUMN)
+    return out
+
+
+def ranked_frame(df: pd.DataFrame, column: str = INDEX_COLUMN) -> pd.DataFrame:
+    """Полный рейтинг по колонке с индексом 'Ранг' (для экспорта)"""
+    return _ranked(df, rank_order(df[column].to_numpy()))
+
+
+def compare_ranks(previous: pd.DataFrame, current: pd.DataFrame,
+                  column: str = INDEX_COLUMN, key: str = REQUIRED_COLUMN) -> pd.DataFrame:
+    """
+    Сравнивает два рейтинга (два набора данных или два периода)
+
+    Args:
+        previous: Результаты предыдущего периода
+        current: Результаты текущего периода
+        column: Колонка индекса
+        key: Колонка с названием региона
+
+    Returns:
+        DataFrame по регионам текущего периода: значения и ранги в обоих
+        периодах и их изменения. 'Δ Ранг' > 0 - регион поднялся в рейтинге.
+        Регионы, отсутствующие в предыдущем периоде, имеют NaN. Если регион
+        повторяется в предыдущем периоде, учитывается его первая строка
+    """
+    previous = previous[~previous[key].duplicated().to_numpy()]
+    prev_values = previous[column].to_numpy(dtype=np.float64)
+    curr_values = current[column].to_numpy(dtype=np.float64)
+    prev_ranks = ranks(prev_values).astype(np.float64)
+    curr_ranks = ranks(curr_values).astype(np.float64)
+
+    # Соединение по названию региона одним get_indexer
+    match = pd.Index(previous[key]).get_indexer(current[key])
+    found = match >= 0
+    prev_v = np.full(len(current), np.nan)
+    prev_r = np.full(len(current), np.nan)
+    prev_v[found] = prev_values[match[found]]
+    prev_r[found] = prev_ranks[match[found]]
+
+    return pd.DataFrame({
+        key: current[key].to_numpy(),
+        f'{column} (пред.)': prev_v,
+        column: curr_values,
+        f'Δ {column}': curr_values - prev_v,
+        f'{RANK_COLUMN} (пред.)': prev_r,
+        RANK_COLUMN: curr_ranks,
+        f'Δ {RANK_COLUMN}': prev_r - curr_ranks,
+    })
+
+
+def movers(comparison: pd.DataFrame, n: int = 5) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Регионы с наибольшим ростом и падением в рейтинге
+
+    Args:
+        comparison: Результат compare_ranks
+        n: Количество регионов в каждом списке
+
+    Returns:
+        Кортеж (поднявшиеся, опустившиеся)
+    """
+    delta = comparison[f'Δ {RANK_COLUMN}'].to_numpy()
+    up = top_n_indices(np.where(delta > 0, delta, np.nan), n, largest=True)
+    down = top_n_indices(np.where(delta < 0, delta, np.nan), n, largest=False)
+    up = up[delta[up] > 0]
+    down = down[delta[down] < 0]
+    return (comparison.take(up).reset_index(drop=True),
+            comparison.take(down).reset_index(drop=True))
@@ -0,0 +1,230 @@
+"""
+Пакетный расчёт сценариев: наборы данных × методы × веса
+"""
+
+import csv
+import json
+import os
+import time
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import pandas as pd
+import numpy as np
+
+from ..config.settings import REQUIRED_COLUMN, IMPUTATION_METHODS
+from .calculator import IndexCalculator, CalculationError
+from .data_loader import DataLoader
+from .dataset import CompactDataset
+from .validation import ValidationSchema
+from .ranking import ranks
+
+RESULT_COLUMNS = ['Сценарий', 'Набор данных', 'Метод', 'Веса',
+                  'Регион', 'Индекс', 'Ранг', 'Время расчёта, с']
+
+
+class ScenarioError(Exception):
+    """Исключение при ошибке в описании или выполнении сценариев"""
+    pass
+
+
+class Scenario:
+    """Одна комбинация набора данных, метода и весов"""
+
+    def __init__(self, name: str, dataset: str, method: str,
+                 weights_name: Optional[str] = None, weights: Optional[dict] = None):
+        self.name = name
+        self.dataset = dataset
+        self.method = method
+        self.weights_name = weights_name
+        self.weights = weights
+
+
+def load_scenario_file(path: str) -> dict:
+    """
+    Читает файл сценариев (.json, .yaml/.yml)
+
+    Формат:
+        datasets:             # {имя: путь} или {имя: {path, sheet, columns}}
+          q1: data/q1.xlsx
+        methods: [cbr_method, pca]
+        impute: mean          # необязательно; обработка пропусков (IMPUTATION_METHODS)
+        weights:              # необязательно; null - равные веса
+          equal: null
+          digital: {"Проникновение цифровых услуг (%)": 2}
+        scenarios:            # необязательно; по умолчанию - все комбинации
+                              # (pca - только с весами null)
+          - {dataset: q1, method: cbr_method, weights: digital}
+    """
+    with open(path, encoding='utf-8') as f:
+        if path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ScenarioError("Для YAML-сценариев требуется PyYAML: pip install pyyaml")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+
+    if not isinstance(spec, dict) or not spec.get('datasets'):
+        raise ScenarioError("В файле сценариев должен быть раздел 'datasets'")
+
+    # Относительные пути наборов данных - от каталога файла сценариев
+    base = os.path.dirname(os.path.abspath(path))
+    datasets = {}
+    for name, entry in spec['datasets'].items():
+        entry = {'path': entry} if isinstance(entry, str) else dict(entry)
+        entry['path'] = os.path.join(base, entry['path'])
+        datasets[name] = entry
+    spec['datasets'] = datasets
+    return spec
+
+
+def expand_scenarios(spec: dict) -> List[Scenario]:
+    """Список сценариев из описания (явный или декартово произведение)"""
+    weights = spec.get('weights') or {'equal': None}
+    methods = spec.get('methods') or ['cbr_method']
+
+    if spec.get('scenarios'):
+        combos = [(s['dataset'], s.get('method', methods[0]), s.get('weights'))
+                  for s in spec['scenarios']]
+    else:
+        # PCA выводит веса из данных сам, поэтому комбинируется только с равными весами
+        combos = [(d, m, w) for d, m, w in itertools.product(spec['datasets'], methods, weights)
+                  if not (m == 'pca' and weights[w] is not None)]
+
+    scenarios = []
+    for dataset, method, weights_name in combos:
+        if dataset not in spec['datasets']:
+            raise ScenarioError(f"Неизвестный набор данных в сценарии: {dataset}")
+        if weights_name is not None and weights_name not in weights:
+            raise ScenarioError(f"Неизвестный набор весов в сценарии: {weights_name}")
+        name = f"{dataset}/{method}" + (f"/{weights_name}" if weights_name else "")
+        scenarios.append(Scenario(name, dataset, method, weights_name,
+                                  weights.get(weights_name) if weights_name else None))
+    return scenarios
+
+
+# Блоки общей памяти, подключённые в процессе-исполнителе: {набор данных: (shm, IndexCalculator)}
+_worker_blocks = {}
+
+
+def _attach_blocks(blocks: Dict[str, tuple], impute: str = 'skip'):
+    """Инициализатор процесса: подключение к общей памяти без копирования данных"""
+    for name, (shm_name, shape, dtype, columns, codes, categories) in blocks.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        values = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        values.flags.writeable = False
+        dataset = CompactDataset(codes, pd.Index(categories), values, columns)
+        _worker_blocks[name] = (shm, IndexCalculator.from_dataset(dataset, impute))
+
+
+def _run_scenario(dataset: str, method: str, weights: Optional[dict]):
+    """Расчёт одного сценария в процессе-исполнителе"""
+    _, calc = _worker_blocks[dataset]
+    start = time.perf_counter()
+    values = calc.calculate_values(method, weights)
+    return np.array(values), time.perf_counter() - start
+
+
+class ScenarioRunner:
+    """
+    Выполняет сценарии в пуле процессов.
+
+    Числовой блок каждого набора данных загружается один раз и помещается в
+    multiprocessing.shared_memory; процессы-исполнители подключаются к нему
+    по имени, поэтому DataFrame между процессами не передаются. Результаты
+    записываются в выходную таблицу по мере готовности сценариев.
+    """
+
+    def __init__(self, spec: dict, max_workers: Optional[int] = None):
+        """
+        Args:
+            spec: Описание сценариев (см. load_scenario_file)
+            max_workers: Количество процессов (по умолчанию - по числу ядер)
+        """
+        if spec.get('impute', 'skip') not in IMPUTATION_METHODS:
+            raise ScenarioError(f"Неизвестный способ обработки пропусков: {spec['impute']}")
+        self._spec = spec
+        self._scenarios = expand_scenarios(spec)
+        self._max_workers = max_workers
+
+    @property
+    def scenarios(self) -> List[Scenario]:
+        """Сценарии в порядке описания"""
+        return list(self._scenarios)
+
+    def run(self, output_path: str, on_result=None) -> pd.DataFrame:
+        """
+        Выполняет все сценарии
+
+        Args:
+            output_path: CSV-файл для результатов (строки дописываются по мере расчёта)
+            on_result: Необязательная функция (scenario, seconds, error), вызываемая
+                после каждого сценария
+
+        Returns:
+            DataFrame с временем расчёта каждого сценария
+        """
+        loader = DataLoader(ValidationSchema(allow_missing='impute' in self._spec))
+        used = {s.dataset for s in self._scenarios}
+        segments = []
+        regions = {}
+        blocks = {}
+        timings = []
+
+        try:
+            for name in used:
+                entry = self._spec['datasets'][name]
+                df = loader.load_excel(entry['path'], sheet=entry.get('sheet', 0),
+                                       columns=entry.get('columns'))
+                data = CompactDataset.from_dataframe(df)
+                shm = shared_memory.SharedMemory(create=True, size=max(data.values.nbytes, 1))
+                segments.append(shm)
+                np.ndarray(data.values.shape, dtype=data.dtype, buffer=shm.buf)[:] = data.values
+                # Коды регионов нужны исполнителям только для заполнения по округам
+                blocks[name] = (shm.name, data.values.shape, data.dtype.str, data.columns,
+                                data.codes, list(data.categories))
+                regions[name] = df[REQUIRED_COLUMN].to_numpy()
+
+            with open(output_path, 'w', newline='', encoding='utf-8') as f, \
+                    ProcessPoolExecutor(max_workers=self._max_workers,
+                                        initializer=_attach_blocks,
+                                        initargs=(blocks, self._spec.get('impute', 'skip'))) as pool:
+                writer = csv.writer(f)
+                writer.writerow(RESULT_COLUMNS)
+                futures = {
+                    pool.submit(_run_scenario, s.dataset, s.method, s.weights): s
+                    for s in self._scenarios
+                }
+                for future in as_completed(futures):
+                    scenario = futures[future]
+                    try:
+                        values, seconds = future.result()
+                    except CalculationError as e:
+                        timings.append((scenario.name, scenario.dataset, scenario.method,
+                                        scenario.weights_name, np.nan, str(e)))
+                        if on_result:
+                            on_result(scenario, None, e)
+                        continue
+
+                    names = regions[scenario.dataset]
+                    writer.writerows(zip(
+                        itertools.repeat(scenario.name), itertools.repeat(scenario.dataset),
+                        itertools.repeat(scenario.method), itertools.repeat(scenario.weights_name or ''),
+                        names, values.round(6), ranks(values), itertools.repeat(round(seconds, 6))
+                    ))
+                    f.flush()
+                    timings.append((scenario.name, scenario.dataset, scenario.method,
+                                    scenario.weights_name, seconds, None))
+                    if on_result:
+                        on_result(scenario, seconds, None)
+        finally:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+
+        return pd.DataFrame(timings, columns=['Сценарий', 'Набор данных', 'Метод', 'Веса',
+                                              'Время расчёта, с', 'Ошибка'])
@@ -0,0 +1,311 @@
+"""
+Пространственная автокорреляция индекса: глобальный Moran's I и локальные LISA-кластеры
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import (
+    REQUIRED_COLUMN, SPATIAL_PERMUTATIONS, SPATIAL_ALPHA, SPATIAL_BATCH
+)
+from ..config.adjacency import REGION_NEIGHBORS, REGION_LINKS
+
+INDEX_COLUMN = 'Индекс'
+LAG_COLUMN = 'Лаг индекса'
+LOCAL_I_COLUMN = 'Локальный I'
+P_COLUMN = 'p'
+CLUSTER_COLUMN = 'Кластер'
+
+# Типы локальных кластеров (квадранты диаграммы Морана)
+HOT_SPOT = 'Горячая точка'            # высокий индекс среди высоких
+COLD_SPOT = 'Холодная точка'          # низкий среди низких
+HIGH_OUTLIER = 'Высокий среди низких'
+LOW_OUTLIER = 'Низкий среди высоких'
+NOT_SIGNIFICANT = 'Незначимо'
+NO_NEIGHBORS = 'Нет соседей'
+NO_DATA = 'Нет данных'
+
+_QUADRANTS = np.array([HOT_SPOT, LOW_OUTLIER, COLD_SPOT, HIGH_OUTLIER], dtype=object)
+
+# Ограничение размера промежуточного блока перестановок LISA (элементов float64)
+_MAX_BLOCK = 8_000_000
+
+
+class SpatialError(Exception):
+    """Исключение при ошибке пространственного анализа"""
+    pass
+
+
+def _sparse():
+    try:
+        from scipy import sparse
+    except ImportError:
+        raise SpatialError("Для пространственного анализа требуется scipy: pip install scipy")
+    return sparse
+
+
+class SpatialWeights:
+    """
+    Стандартизованная по строкам матрица соседства строк таблицы (scipy.sparse CSR).
+
+    Строки с одинаковым регионом (филиалы) получают общих соседей, но не
+    считаются соседями друг друга. Строки без соседей (эксклавы, регионы
+    вне справочника) остаются нулевыми строками матрицы.
+    """
+
+    def __init__(self, binary, regions: Sequence[str]):
+        sparse = _sparse()
+        self.binary = sparse.csr_matrix(binary, dtype=np.float64)
+        self.binary.eliminate_zeros()
+        self.regions = list(regions)
+        self.cardinalities = np.diff(self.binary.indptr)
+        with np.errstate(divide='ignore'):
+            inv = np.where(self.cardinalities > 0, 1.0 / self.cardinalities, 0.0)
+        self.matrix = sparse.diags(inv).dot(self.binary).tocsr()
+
+    @classmethod
+    def from_regions(cls, regions: Sequence[str],
+                     neighbors: Dict[str, List[str]] = REGION_NEIGHBORS,
+                     links: bool = True) -> 'SpatialWeights':
+        """
+        Строит матрицу соседства для строк с названиями регионов
+
+        Args:
+            regions: Регион каждой строки
+            neighbors: Справочник соседства {регион: [соседи]}
+            links: Учитывать транспортные связи (Крымский мост, паромы)
+        """
+        sparse = _sparse()
+        catalog = pd.Index(list(neighbors))
+        pairs = [(a, b) for a, ns in neighbors.items() for b in ns]
+        if links:
+            pairs += list(REGION_LINKS) + [(b, a) for a, b in REGION_LINKS]
+        src = catalog.get_indexer([a for a, _ in pairs])
+        dst = catalog.get_indexer([b for _, b in pairs])
+        keep = (src >= 0) & (dst >= 0)
+        r = len(catalog)
+        adjacency = sparse.csr_matrix(
+            (np.ones(keep.sum()), (src[keep], dst[keep])), shape=(r, r))
+        adjacency.data[:] = 1.0  # повторы пар не увеличивают вес
+
+        # Строки → регионы справочника; неизвестные регионы без соседей
+        codes = catalog.get_indexer(list(regions))
+        rows = np.flatnonzero(codes >= 0)
+        membership = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, codes[rows])), shape=(len(codes), r))
+        binary = membership @ adjacency @ membership.T
+        binary = (sparse.triu(binary, 1) + sparse.tril(binary, -1)).tocsr()
+        binary.data[:] = 1.0
+        return cls(binary, regions)
+
+    @property
+    def n(self) -> int:
+        """Количество строк"""
+        return self.binary.shape[0]
+
+    @property
+    def islands(self) -> np.ndarray:
+        """Маска строк без соседей"""
+        return self.cardinalities == 0
+
+    def subset(self, mask: np.ndarray) -> 'SpatialWeights':
+        """Матрица только для строк mask (соседи вне mask отбрасываются)"""
+        idx = np.flatnonzero(mask)
+        return SpatialWeights(self.binary[idx][:, idx], [self.regions[i] for i in idx])
+
+    def lag(self, values: np.ndarray) -> np.ndarray:
+        """Пространственный лаг: среднее значение соседей"""
+        return self.matrix @ values
+
+
+class MoranResult:
+    """Глобальный Moran's I с перестановочной и нормальной значимостью"""
+
+    def __init__(self, I: float, n: int, permutations: int, p_sim: float,
+                 mean_sim: float, std_sim: float, z_norm: float, p_norm: float):
+        self.I = I
+        self.n = n
+        self.permutations = permutations
+        self.p_sim = p_sim
+        self.mean_sim = mean_sim
+        self.std_sim = std_sim
+        self.z_norm = z_norm
+        self.p_norm = p_norm
+
+    @property
+    def expected(self) -> float:
+        """Ожидание I при отсутствии автокорреляции"""
+        return -1.0 / (self.n - 1)
+
+    @property
+    def z_sim(self) -> float:
+        """z-оценка относительно распределения перестановок"""
+        return (self.I - self.mean_sim) / self.std_sim if self.std_sim > 0 else float('nan')
+
+    def __repr__(self) -> str:
+        return (f"MoranResult(I={self.I:.4f}, E[I]={self.expected:.4f}, "
+                f"p_sim={self.p_sim:.4f}, permutations={self.permutations})")
+
+
+def _prepare(values: np.ndarray, weights: SpatialWeights):
+    """Строки с известным значением и хотя бы одним соседом среди таких же строк"""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) != weights.n:
+        raise SpatialError(f"Ожидалось {weights.n} значений, получено {len(values)}")
+    mask = np.isfinite(values)
+    w = weights.subset(mask) if not mask.all() else weights
+    if w.islands.any():
+        keep = np.flatnonzero(mask)[~w.islands]
+        mask = np.zeros(len(values), dtype=bool)
+        mask[keep] = True
+        w = weights.subset(mask)
+    if mask.sum() < 3:
+        raise SpatialError("Недостаточно регионов с соседями для пространственного анализа")
+    z = values[mask] - values[mask].mean()
+    if not (z @ z) > 0:
+        raise SpatialError("Индекс одинаков во всех регионах: автокорреляция не определена")
+    return mask, w, z
+
+
+def _folded_p(larger: np.ndarray, permutations: int) -> np.ndarray:
+    """Псевдо-p по перестановкам: доля не менее экстремальных в сторону наблюдения"""
+    larger = np.minimum(larger, permutations - larger)
+    return (larger + 1.0) / (permutations + 1.0)
+
+
+def morans_i(values: np.ndarray, weights: SpatialWeights,
+             permutations: int = SPATIAL_PERMUTATIONS, seed: Optional[int] = None) -> MoranResult:
+    """
+    Глобальный Moran's I
+
+    Перестановки выполняются блоками по SPATIAL_BATCH: каждый блок - одна
+    матрица перестановок и одно умножение разреженной матрицы на неё.
+
+    Args:
+        values: Значения по строкам weights (NaN и строки без соседей исключаются)
+        weights: Матрица соседства
+        permutations: Число случайных перестановок (0 - только нормальное приближение)
+        seed: Зерно генератора для воспроизводимости
+
+    Raises:
+        SpatialError: Недостаточно данных
+    """
+    _, w, z = _prepare(values, weights)
+    n = len(z)
+    W = w.matrix
+    s0 = W.sum()
+    den = z @ z
+    scale = n / s0
+    I = float(scale * (z @ (W @ z)) / den)
+
+    # Нормальное приближение
+    sym = W + W.T
+    s1 = 0.5 * sym.multiply(sym).sum()
+    s2 = float(((np.asarray(W.sum(axis=1)).ravel() + np.asarray(W.sum(axis=0)).ravel()) ** 2).sum())
+    expected = -1.0 / (n - 1)
+    var = (n * n * s1 - n * s2 + 3 * s0 * s0) / ((n * n - 1) * s0 * s0) - expected ** 2
+    z_norm = (I - expected) / math.sqrt(var) if var > 0 else float('nan')
+    p_norm = math.erfc(abs(z_norm) / math.sqrt(2)) if var > 0 else float('nan')
+
+    p_sim = mean_sim = std_sim = float('nan')
+    if permutations > 0:
+        rng = np.random.default_rng(seed)
+        sims = np.empty(permutations)
+        for start in range(0, permutations, SPATIAL_BATCH):
+            b = min(SPATIAL_BATCH, permutations - start)
+            shuffled = rng.permuted(np.broadcast_to(z, (b, n)), axis=1)
+            lagged = (W @ shuffled.T).T
+            sims[start:start + b] = scale * np.einsum('ij,ij->i', shuffled, lagged) / den
+        p_sim = float(_folded_p((sims >= I).sum(), permutations))
+        mean_sim, std_sim = float(sims.mean()), float(sims.std())
+
+    return MoranResult(I, n, permutations, p_sim, mean_sim, std_sim, z_norm, p_norm)
+
+
+def local_moran(df: pd.DataFrame, weights: Optional[SpatialWeights] = None,
+                value_column: str = INDEX_COLUMN,
+                permutations: int = SPATIAL_PERMUTATIONS, alpha: float = SPATIAL_ALPHA,
+                seed: Optional[int] = None) -> pd.DataFrame:
+    """
+    Локальные индикаторы пространственной автокорреляции (LISA) по регионам
+
+    Значимость - условная перестановка: для региона с k соседями значения
+    соседей заменяются случайной выборкой k значений остальных регионов.
+    Одна матрица случайных выборок на блок перестановок используется для
+    всех регионов сразу, поэтому 9 999 перестановок для 85 регионов
+    занимают доли секунды.
+
+    Args:
+        df: Результаты с колонками 'Регион' и value_column
+        weights: Матрица соседства строк df (по умолчанию - по справочнику)
+        value_column: Колонка значений
+        permutations: Число перестановок
+        alpha: Уровень значимости для кластеров
+        seed: Зерно генератора для воспроизводимости
+
+    Returns:
+        DataFrame в порядке строк df: регион, значение, лаг, локальный I, p и тип кластера
+        ('Нет данных' - значение не рассчитано, 'Нет соседей' - ни одного соседа со значением)
+
+    Raises:
+        SpatialError: Недостаточно данных
+    """
+    if weights is None:
+        weights = SpatialWeights.from_regions(df[REQUIRED_COLUMN].astype(str).tolist())
+    values = df[value_column].to_numpy(dtype=np.float64)
+    mask, w, z = _prepare(values, weights)
+    n = len(z)
+    lag = w.lag(z)
+    den = z @ z
+    local = (n - 1) * z * lag / den
+
+    # Соседи каждой строки - равные веса 1/k; выборка k из n-1 остальных строк
+    k = w.cardinalities
+    kmax = int(k.max())
+    take = np.arange(kmax)[None, :] < k[:, None]
+    pad_weights = np.where(take, 1.0 / k[:, None], 0.0)
+    rows = np.arange(n)[:, None, None]
+    scale = (n - 1) * z / den
+
+    larger = np.zeros(n, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    batch = max(1, min(SPATIAL_BATCH, _MAX_BLOCK // (n * kmax)))
+    for start in range(0, permutations, batch):
+        b = min(batch, permutations - start)
+        # Случайная выборка kmax позиций без повторов: наименьшие случайные ключи по порядку
+        keys = rng.random((b, n - 1))
+        pick = np.argpartition(keys, kmax - 1, axis=1)[:, :kmax]
+        pick = np.take_along_axis(pick, np.argsort(np.take_along_axis(keys, pick, axis=1), axis=1), axis=1)
+        # Позиции 0..n-2 → номера строк без самой строки i
+        ids = pick[None, :, :] + (pick[None, :, :] >= rows)
+        sim_lag = np.einsum('ibk,ik->ib', z[ids], pad_weights)
+        larger += (scale[:, None] * sim_lag >= local[:, None]).sum(axis=1)
+    p = _folded_p(larger, permutations) if permutations > 0 else np.full(n, np.nan)
+
+    quadrant = np.where(z > 0, np.where(lag > 0, 0, 3), np.where(lag > 0, 1, 2))
+    cluster = np.where(p <= alpha, _QUADRANTS[quadrant], NOT_SIGNIFICANT)
+
+    result = pd.DataFrame({
+        REQUIRED_COLUMN: df[REQUIRED_COLUMN].to_numpy(),
+        value_column: values,
+        LAG_COLUMN: np.nan,
+        LOCAL_I_COLUMN: np.nan,
+        P_COLUMN: np.nan,
+        CLUSTER_COLUMN: NO_NEIGHBORS,
+    }, index=df.index)
+    result.loc[~np.isfinite(values), CLUSTER_COLUMN] = NO_DATA
+    result.loc[mask, LAG_COLUMN] = lag + values[mask].mean()
+    result.loc[mask, LOCAL_I_COLUMN] = local
+    result.loc[mask, P_COLUMN] = p
+    result.loc[mask, CLUSTER_COLUMN] = cluster
+    return result
+
+
+def hot_spots(lisa: pd.DataFrame) -> Dict[str, List[str]]:
+    """Значимые регионы по типам кластеров {тип: [регионы]}"""
+    significant = lisa[lisa[CLUSTER_COLUMN].isin(_QUADRANTS)]
+    return {kind: significant.loc[significant[CLUSTER_COLUMN] == kind, REQUIRED_COLUMN].tolist()
+            for kind in _QUADRANTS if (significant[CLUSTER_COLUMN] == kind).any()}
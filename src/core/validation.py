@@ -0,0 +1,293 @@
+"""
+Схема и полная проверка загружаемых данных
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+import numpy as np
+
+from ..config.settings import (
+    REQUIRED_COLUMN, MIN_NUMERIC_COLUMNS, INDICATOR_RANGES, NUMERIC_LIKE_THRESHOLD
+)
+from ..config.federal_districts import FEDERAL_DISTRICTS
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# Сколько примеров значений/строк сохранять в одной записи отчёта
+MAX_EXAMPLES = 5
+
+
+class ValidationIssue:
+    """Одна найденная проблема в данных"""
+
+    def __init__(self, code: str, severity: str, message: str,
+                 column: Optional[str] = None, count: int = 0,
+                 rows: Optional[List[int]] = None, examples: Optional[list] = None):
+        """
+        Args:
+            code: Машиночитаемый код проблемы ('duplicate_region', 'nan', ...)
+            severity: 'error' или 'warning'
+            message: Описание для пользователя
+            column: Колонка, к которой относится проблема
+            count: Количество затронутых значений
+            rows: Номера строк (первые MAX_EXAMPLES, нумерация как в Excel)
+            examples: Примеры значений
+        """
+        self.code = code
+        self.severity = severity
+        self.message = message
+        self.column = column
+        self.count = count
+        self.rows = rows or []
+        self.examples = examples or []
+
+    def to_dict(self) -> dict:
+        """Представление в виде словаря (для экспорта/логов)"""
+        return {
+            'code': self.code,
+            'severity': self.severity,
+            'message': self.message,
+            'column': self.column,
+            'count': self.count,
+            'rows': self.rows,
+            'examples': self.examples,
+        }
+
+    def __str__(self) -> str:
+        text = self.message
+        if self.rows:
+            text += f" (строки: {', '.join(map(str, self.rows))}"
+            text += ", ...)" if self.count > len(self.rows) else ")"
+        return text
+
+
+class ValidationReport:
+    """Отчёт о проверке: все найденные проблемы, а не только первая"""
+
+    def __init__(self, issues: Optional[List[ValidationIssue]] = None):
+        self.issues = issues or []
+
+    @property
+    def errors(self) -> List[ValidationIssue]:
+        """Проблемы, при которых данные нельзя использовать"""
+        return [i for i in self.issues if i.severity == ERROR]
+
+    @property
+    def warnings(self) -> List[ValidationIssue]:
+        """Проблемы, не мешающие расчёту"""
+        return [i for i in self.issues if i.severity == WARNING]
+
+    @property
+    def is_valid(self) -> bool:
+        """Нет ни одной ошибки"""
+        return not self.errors
+
+    def extend(self, other: 'ValidationReport'):
+        """Добавляет проблемы из другого отчёта"""
+        self.issues.extend(other.issues)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Отчёт в виде таблицы"""
+        return pd.DataFrame([i.to_dict() for i in self.issues],
+                            columns=['code', 'severity', 'message', 'column',
+                                     'count', 'rows', 'examples'])
+
+    def summary(self) -> str:
+        """Текст отчёта для пользователя"""
+        if not self.issues:
+            return "Ошибок не найдено"
+        lines = [f"Ошибок: {len(self.errors)}, предупреждений: {len(self.warnings)}"]
+        for issue in self.errors + self.warnings:
+            mark = "✗" if issue.severity == ERROR else "!"
+            lines.append(f"  {mark} {issue}")
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.summary()
+
+
+class ValidationSchema:
+    """Описание требований к данным"""
+
+    def __init__(self, required_column: str = REQUIRED_COLUMN,
+                 min_numeric_columns: int = MIN_NUMERIC_COLUMNS,
+                 ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+                 known_regions: Optional[Iterable[str]] = None,
+                 allow_missing: bool = False,
+                 numeric_like_threshold: float = NUMERIC_LIKE_THRESHOLD):
+        """
+        Args:
+            required_column: Обязательная колонка с названием региона
+            min_numeric_columns: Минимальное количество числовых показателей
+            ranges: Допустимые диапазоны {показатель: (min, max)}
+            known_regions: Известные регионы (по умолчанию - из FEDERAL_DISTRICTS)
+            allow_missing: Пропуски в показателях - предупреждение, а не ошибка
+            numeric_like_threshold: Доля значений текстовой колонки, приводимых
+                к числу, начиная с которой колонка считается числовой по смыслу
+        """
+        self.required_column = required_column
+        self.min_numeric_columns = min_numeric_columns
+        self.ranges = dict(INDICATOR_RANGES if ranges is None else ranges)
+        if known_regions is None:
+            known_regions = [r for regions in FEDERAL_DISTRICTS.values() for r in regions]
+        self.known_regions = set(known_regions)
+        self.allow_missing = allow_missing
+        self.numeric_like_threshold = numeric_like_threshold
+
+    @property
+    def key(self) -> tuple:
+        """Значение схемы для ключей кэша: одинаковые требования - одинаковый ключ"""
+        return (self.required_column, self.min_numeric_columns,
+                tuple(sorted((c, tuple(r)) for c, r in self.ranges.items())),
+                frozenset(self.known_regions), self.allow_missing, self.numeric_like_threshold)
+
+
+DEFAULT_SCHEMA = ValidationSchema()
+
+
+def _row_numbers(mask: np.ndarray, row_offset: int) -> List[int]:
+    # +2: заголовок в первой строке листа и нумерация Excel с единицы
+    return (np.flatnonzero(mask)[:MAX_EXAMPLES] + row_offset + 2).tolist()
+
+
+def validate_dataframe(df: pd.DataFrame, schema: ValidationSchema = DEFAULT_SCHEMA,
+                       numeric_columns: Optional[List[str]] = None,
+                       seen_regions: Optional[Set[str]] = None,
+                       row_offset: int = 0) -> ValidationReport:
+    """
+    Проверяет данные целиком и собирает все найденные проблемы
+
+    Все проверки показателей выполняются векторно по одному числовому блоку.
+
+    Args:
+        df: Данные для проверки
+        schema: Схема требований
+        numeric_columns: Ожидаемые числовые колонки (для проверки частей файла;
+            по умолчанию - все числовые колонки df)
+        seen_regions: Регионы, встреченные в предыдущих частях файла
+            (дополняется регионами из df)
+        row_offset: Номер первой строки df в исходном файле
+
+    Returns:
+        ValidationReport
+    """
+    report = ValidationReport()
+    issues = report.issues
+    key = schema.required_column
+
+    # Структура
+    if key not in df.columns:
+        issues.append(ValidationIssue(
+            'missing_column', ERROR,
+            f"В файле обязательно должна быть колонка '{key}'", column=key))
+
+    if numeric_columns is None:
+        numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    else:
+        for col in numeric_columns:
+            if col not in df.columns:
+                issues.append(ValidationIssue(
+                    'missing_column', ERROR, f"Нет колонки '{col}'", column=col))
+            elif not pd.api.types.is_numeric_dtype(df[col]):
+                bad = pd.to_numeric(df[col], errors='coerce').isna().to_numpy() \
+                    & df[col].notna().to_numpy()
+                issues.append(ValidationIssue(
+                    'non_numeric', ERROR,
+                    f"Показатель '{col}' содержит нечисловые значения", column=col,
+                    count=int(bad.sum()), rows=_row_numbers(bad, row_offset),
+                    examples=df[col][bad].head(MAX_EXAMPLES).tolist()))
+        numeric_columns = [c for c in numeric_columns
+                           if c in df.columns and pd.api.types.is_numeric_dtype(df[c])]
+
+    if len(numeric_columns) < schema.min_numeric_columns:
+        issues.append(ValidationIssue(
+            'too_few_numeric', ERROR,
+            f"В файле должно быть минимум {schema.min_numeric_columns} числовых показателей"))
+
+    # Регионы
+    if key in df.columns:
+        regions = df[key]
+        empty = regions.isna().to_numpy()
+        if empty.any():
+            issues.append(ValidationIssue(
+                'empty_region', ERROR, f"Колонка '{key}' содержит пустые значения",
+                column=key, count=int(empty.sum()), rows=_row_numbers(empty, row_offset)))
+
+        duplicated = regions.duplicated(keep=False).to_numpy() & ~empty
+        if seen_regions is not None:
+            duplicated |= regions.isin(seen_regions).to_numpy()
+            seen_regions.update(regions[~empty].tolist())
+        if duplicated.any():
+            issues.append(ValidationIssue(
+                'duplicate_region', ERROR, "Повторяющиеся регионы", column=key,
+                count=int(duplicated.sum()), rows=_row_numbers(duplicated, row_offset),
+                examples=regions[duplicated].drop_duplicates().head(MAX_EXAMPLES).tolist()))
+
+        if schema.known_regions:
+            unknown = ~regions.isin(schema.known_regions).to_numpy() & ~empty
+            if unknown.any():
+                issues.append(ValidationIssue(
+                    'unknown_region', WARNING,
+                    "Регионы отсутствуют в справочнике федеральных округов", column=key,
+                    count=int(unknown.sum()), rows=_row_numbers(unknown, row_offset),
+                    examples=regions[unknown].head(MAX_EXAMPLES).tolist()))
+
+    # Показатели: один числовой блок, все проверки по столбцам сразу
+    if numeric_columns:
+        block = np.empty((len(df), len(numeric_columns)), dtype=np.float64)
+        for j, col in enumerate(numeric_columns):
+            block[:, j] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        nan_mask = np.isnan(block)
+        inf_mask = np.isinf(block)
+
+        lo = np.array([schema.ranges.get(c, (-np.inf, np.inf))[0] for c in numeric_columns])
+        hi = np.array([schema.ranges.get(c, (-np.inf, np.inf))[1] for c in numeric_columns])
+        with np.errstate(invalid='ignore'):
+            out_of_range = ((block < lo) | (block > hi)) & ~inf_mask
+
+        nan_counts = nan_mask.sum(axis=0)
+        inf_counts = inf_mask.sum(axis=0)
+        range_counts = out_of_range.sum(axis=0)
+
+        for j in np.flatnonzero(nan_counts | inf_counts | range_counts):
+            col = numeric_columns[j]
+            if nan_counts[j]:
+                issues.append(ValidationIssue(
+                    'nan', WARNING if schema.allow_missing else ERROR,
+                    f"Пропущенные значения в показателе '{col}'", column=col,
+                    count=int(nan_counts[j]), rows=_row_numbers(nan_mask[:, j], row_offset)))
+            if inf_counts[j]:
+                issues.append(ValidationIssue(
+                    'inf', ERROR, f"Бесконечные значения в показателе '{col}'", column=col,
+                    count=int(inf_counts[j]), rows=_row_numbers(inf_mask[:, j], row_offset)))
+            if range_counts[j]:
+                issues.append(ValidationIssue(
+                    'out_of_range', ERROR,
+                    f"Значения показателя '{col}' вне диапазона [{lo[j]:g}, {hi[j]:g}]",
+                    column=col, count=int(range_counts[j]),
+                    rows=_row_numbers(out_of_range[:, j], row_offset),
+                    examples=block[out_of_range[:, j], j][:MAX_EXAMPLES].tolist()))
+
+    # Текстовые колонки, похожие на числа (например, '12,5' с запятой)
+    text_columns = [c for c in df.columns
+                    if c != key and c not in numeric_columns
+                    and not pd.api.types.is_numeric_dtype(df[c])]
+    for col in text_columns:
+        values = df[col].dropna()
+        if values.empty:
+            continue
+        as_text = values.astype(str).str.strip().str.replace(',', '.', regex=False) \
+            .str.replace(r'[\s %]', '', regex=True)
+        parsed = pd.to_numeric(as_text, errors='coerce')
+        share = parsed.notna().mean()
+        if share >= schema.numeric_like_threshold:
+            issues.append(ValidationIssue(
+                'numeric_like_text', WARNING,
+                f"Колонка '{col}' похожа на числовую, но хранится как текст", column=col,
+                count=int(parsed.notna().sum()),
+                examples=values.head(MAX_EXAMPLES).tolist()))
+
+    return report
@@ -0,0 +1,155 @@
+"""
+Модуль для отслеживания изменений файла с данными
+"""
+
+import os
+import time
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import pandas as pd
+import numpy as np
+
+from ..config.settings import REQUIRED_COLUMN, WATCH_POLL_INTERVAL, WATCH_DEBOUNCE
+
+
+class FrameDiff:
+    """Результат сравнения двух загрузок одного файла"""
+
+    def __init__(self, added: List[str], removed: List[str], changed: List[str],
+                 columns_changed: bool):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.columns_changed = columns_changed
+
+    @property
+    def regions(self) -> List[str]:
+        """Все затронутые регионы"""
+        return self.added + self.removed + self.changed
+
+    @property
+    def is_empty(self) -> bool:
+        """Нет ни одного изменения"""
+        return not (self.added or self.removed or self.changed or self.columns_changed)
+
+    def __repr__(self) -> str:
+        return (f"FrameDiff(added={len(self.added)}, removed={len(self.removed)}, "
+                f"changed={len(self.changed)}, columns_changed={self.columns_changed})")
+
+
+def diff_frames(old: Optional[pd.DataFrame], new: pd.DataFrame,
+                columns: Optional[List[str]] = None,
+                key: str = REQUIRED_COLUMN) -> FrameDiff:
+    """
+    Сравнивает две версии данных по ключевой колонке
+
+    Args:
+        old: Предыдущая версия (None - все регионы считаются новыми)
+        new: Новая версия
+        columns: Сравниваемые колонки (по умолчанию - общие числовые)
+        key: Колонка с названием региона
+
+    Returns:
+        FrameDiff со списками добавленных, удалённых и изменённых регионов.
+        Регион, встречающийся в любой из версий несколько раз, считается
+        изменённым: его строки нельзя сопоставить однозначно.
+    """
+    if old is None:
+        return FrameDiff(new[key].tolist(), [], [], True)
+
+    if columns is None:
+        old_cols = old.select_dtypes(include=[np.number]).columns
+        new_cols = new.select_dtypes(include=[np.number]).columns
+        columns_changed = list(old_cols) != list(new_cols)
+        columns = [c for c in new_cols if c in old_cols]
+    else:
+        columns_changed = False
+
+    duplicated = set(old[key][old[key].duplicated()]) | set(new[key][new[key].duplicated()])
+    # По одной строке на регион: .loc по повторяющимся ключам меняет форму
+    old = old.drop_duplicates(key)
+    new = new.drop_duplicates(key)
+
+    old_keys = pd.Index(old[key])
+    new_keys = pd.Index(new[key])
+    added = new_keys.difference(old_keys).tolist()
+    removed = old_keys.difference(new_keys).tolist()
+
+    common = new_keys.intersection(old_keys)
+    a = old.set_index(key).loc[common, columns].to_numpy(dtype=float)
+    b = new.set_index(key).loc[common, columns].to_numpy(dtype=float)
+    same = (a == b) | (np.isnan(a) & np.isnan(b))
+    changed = common[~same.all(axis=1) | common.isin(duplicated)].tolist()
+
+    return FrameDiff(added, removed, changed, columns_changed)
+
+
+class FileWatcher:
+    """
+    Отслеживание изменений файла опросом os.stat с подавлением дребезга.
+
+    Excel и другие редакторы пишут файл в несколько приёмов, поэтому
+    обработчик вызывается только после того, как размер и время
+    изменения файла не менялись в течение `debounce` секунд.
+    """
+
+    def __init__(self, file_path: str, callback: Callable[[str], None],
+                 interval: float = WATCH_POLL_INTERVAL,
+                 debounce: float = WATCH_DEBOUNCE):
+        """
+        Args:
+            file_path: Путь к отслеживаемому файлу
+            callback: Функция, вызываемая с путём к файлу после изменения
+            interval: Период опроса, сек
+            debounce: Время стабильности файла перед вызовом, сек
+        """
+        self._file_path = file_path
+        self._callback = callback
+        self._interval = interval
+        self._debounce = debounce
+        self._signature = self._stat()
+        self._pending = None
+        self._pending_since = 0.0
+        self._stop = threading.Event()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self._file_path)
+        except OSError:
+            # Файл временно отсутствует, пока редактор его перезаписывает
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def poll(self) -> bool:
+        """
+        Однократная проверка файла
+
+        Returns:
+            True, если был вызван обработчик изменения
+        """
+        signature = self._stat()
+        now = time.monotonic()
+
+        if signature is None or signature == self._signature:
+            if self._pending is not None and signature == self._pending \
+                    and now - self._pending_since >= self._debounce:
+                self._pending = None
+                self._callback(self._file_path)
+                return True
+            return False
+
+        if signature != self._pending:
+            self._pending = signature
+            self._pending_since = now
+        self._signature = signature
+        return False
+
+    def run(self):
+        """Блокирующий цикл опроса до вызова stop()"""
+        while not self._stop.wait(self._interval):
+            self.poll()
+
+    def stop(self):
+        """Останавливает цикл опроса"""
+        self._stop.set()
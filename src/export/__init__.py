@@ -0,0 +1,13 @@
+"""
+Модуль экспорта результатов
+"""
+
+from .excel import write_results, write_heatmap_workbook
+from .html import build_heatmap_figure, write_heatmap_html
+
+__all__ = [
+    'write_results',
+    'write_heatmap_workbook',
+    'build_heatmap_figure',
+    'write_heatmap_html'
+]
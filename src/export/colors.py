@@ -0,0 +1,75 @@
+"""
+Цветовые схемы без matplotlib: опорные цвета и векторная интерполяция
+"""
+
+import numpy as np
+
+# Опорные цвета схем из COLORMAPS (ColorBrewer и matplotlib), от 0 к 1
+COLORMAP_STOPS = {
+    "RdYlGn": ["#a50026", "#d73027", "#f46d43", "#fdae61", "#fee08b", "#ffffbf",
+               "#d9ef8b", "#a6d96a", "#66bd63", "#1a9850", "#006837"],
+    "Spectral": ["#9e0142", "#d53e4f", "#f46d43", "#fdae61", "#fee08b", "#ffffbf",
+                 "#e6f598", "#abdda4", "#66c2a5", "#3288bd", "#5e4fa2"],
+    "viridis": ["#440154", "#48186a", "#472d7b", "#424086", "#3b528b", "#33638d",
+                "#2c728e", "#26828e", "#21918c", "#1fa088", "#28ae80", "#3fbc73",
+                "#5ec962", "#84d44b", "#addc30", "#d8e219", "#fde725"],
+    "plasma": ["#0d0887", "#310597", "#4c02a1", "#6600a7", "#7e03a8", "#9511a1",
+               "#aa2395", "#bc3587", "#cc4778", "#da5a6a", "#e66c5c", "#f0804e",
+               "#f89540", "#fdac33", "#fdc527", "#f8df25", "#f0f921"],
+    "coolwarm": ["#3b4cc0", "#4e68d8", "#6282ea", "#779af7", "#8db0fe", "#a3c2fe",
+                 "#b9d0f9", "#ccd9ed", "#dddcdc", "#ecd3c5", "#f5c4ac", "#f7b093",
+                 "#f4987a", "#eb7d62", "#dd5f4b", "#ca3b37", "#b40426"],
+    "Blues": ["#f7fbff", "#deebf7", "#c6dbef", "#9ecae1", "#6baed6",
+              "#4292c6", "#2171b5", "#08519c", "#08306b"],
+    "Reds": ["#fff5f0", "#fee0d2", "#fcbba1", "#fc9272", "#fb6a4a",
+             "#ef3b2c", "#cb181d", "#a50f15", "#67000d"],
+}
+
+
+def _stops(colormap: str) -> np.ndarray:
+    """Опорные цвета схемы как массив (n, 3) в [0, 255]; суффикс _r - обратный порядок"""
+    reverse = colormap.endswith("_r")
+    name = colormap[:-2] if reverse else colormap
+    if name not in COLORMAP_STOPS:
+        raise ValueError(f"Неизвестная цветовая схема: {colormap}")
+    rgb = np.array([[int(h[i:i + 2], 16) for i in (1, 3, 5)] for h in COLORMAP_STOPS[name]],
+                   dtype=np.float64)
+    return rgb[::-1] if reverse else rgb
+
+
+def colorscale(colormap: str = "RdYlGn") -> list:
+    """Схема в формате plotly: [[позиция, '#rrggbb'], ...] по тем же опорным цветам"""
+    stops = _stops(colormap).astype(np.uint8)
+    positions = np.linspace(0.0, 1.0, len(stops))
+    return [[float(pos), "#" + code.lower()] for pos, code in zip(positions, to_hex(stops))]
+
+
+def map_colors(norm: np.ndarray, colormap: str = "RdYlGn") -> np.ndarray:
+    """
+    Цвета для значений в [0, 1]
+
+    Args:
+        norm: Нормированные значения (NaN - серый)
+        colormap: Цветовая схема
+
+    Returns:
+        Массив (n, 3) uint8
+    """
+    stops = _stops(colormap)
+    positions = np.linspace(0.0, 1.0, len(stops))
+    x = np.clip(np.nan_to_num(np.asarray(norm, dtype=np.float64), nan=0.5), 0.0, 1.0)
+    rgb = np.column_stack([np.interp(x, positions, stops[:, ch]) for ch in range(3)])
+    rgb[np.isnan(norm)] = 128
+    return np.rint(rgb).astype(np.uint8)
+
+
+def to_hex(rgb: np.ndarray) -> np.ndarray:
+    """Массив (n, 3) uint8 → строки 'RRGGBB'"""
+    packed = (rgb[:, 0].astype(np.uint32) << 16) | (rgb[:, 1].astype(np.uint32) << 8) | rgb[:, 2]
+    return np.array([f"{v:06X}" for v in packed.tolist()])
+
+
+def is_dark(rgb: np.ndarray) -> np.ndarray:
+    """Тёмный ли фон (для выбора цвета текста)"""
+    luminance = 0.299 * rgb[:, 0] + 0.587 * rgb[:, 1] + 0.114 * rgb[:, 2]
+    return luminance < 128
@@ -0,0 +1,161 @@
+"""
+Экспорт результатов в Excel
+"""
+
+from typing import Dict, Optional
+
+import pandas as pd
+import numpy as np
+
+from ..config.settings import REQUIRED_COLUMN, HEATMAP_GRID_ROWS, HEATMAP_GRID_COLS
+from ..config.federal_districts import get_district_by_region
+from ..core.aggregation import DISTRICT_COLUMN
+from ..core.layout import DistrictLayout
+from ..core.ranking import RANK_COLUMN, ranked_frame
+from .colors import map_colors, to_hex, is_dark
+
+RESULTS_SHEET = "Результаты"
+
+
+def write_results(file_path: str, ranked: pd.DataFrame,
+                  extra_sheets: Optional[Dict[str, pd.DataFrame]] = None) -> None:
+    """
+    Записывает результаты и дополнительные таблицы в одну книгу
+
+    Args:
+        file_path: Путь к .xlsx файлу
+        ranked: Результаты по регионам (индекс - ранг)
+        extra_sheets: Дополнительные листы {название: DataFrame}, например
+            агрегаты по федеральным округам
+    """
+    with pd.ExcelWriter(file_path) as writer:
+        ranked.to_excel(writer, sheet_name=RESULTS_SHEET)
+        for name, frame in (extra_sheets or {}).items():
+            # Excel ограничивает имя листа 31 символом
+            frame.to_excel(writer, sheet_name=name[:31], index=False)
+
+
+HEATMAP_SHEET = "Heatmap"
+RANKING_SHEET = "Рейтинг"
+# Ширина ячейки блока (символы) и высота строки (пункты)
+CELL_WIDTH = 22
+CELL_HEIGHT = 32
+
+
+def write_heatmap_workbook(df: pd.DataFrame, file_path: str, colormap: str = "RdYlGn",
+                           conditional: bool = False, show_values: bool = True,
+                           value_column: str = 'Индекс') -> None:
+    """
+    Записывает тепловую карту по федеральным округам прямо в .xlsx
+
+    Раскладка совпадает с create_heatmap: блок на каждый округ в сетке
+    HEATMAP_GRID_ROWS x HEATMAP_GRID_COLS. Цвета считаются векторно по
+    опорным цветам схемы, matplotlib не импортируется.
+
+    Args:
+        df: Результаты расчёта
+        file_path: Путь к .xlsx файлу
+        colormap: Цветовая схема из COLORMAPS (суффикс _r - обратная)
+        conditional: Вместо статической заливки записать значения и правило
+            условного форматирования (цветовая шкала Excel по 3 опорным цветам)
+        show_values: Подписывать ячейки названием региона и значением
+        value_column: Колонка значений
+    """
+    from openpyxl import Workbook
+    from openpyxl.formatting.rule import ColorScaleRule
+    from openpyxl.styles import Alignment, Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    layout = DistrictLayout.build(df, value_column)
+    rgb = map_colors(layout.norm, colormap)
+    fills = to_hex(rgb)
+    dark = is_dark(rgb)
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = HEATMAP_SHEET
+    ws.sheet_view.showGridLines = False
+
+    # Начало каждого блока: ширина колонки сетки - по самому широкому блоку в ней
+    n_blocks = len(layout.names)
+    grid_pos = np.arange(n_blocks)
+    grid_row, grid_col = grid_pos // HEATMAP_GRID_COLS, grid_pos % HEATMAP_GRID_COLS
+    widths = np.zeros(HEATMAP_GRID_COLS, dtype=int)
+    heights = np.zeros(HEATMAP_GRID_ROWS, dtype=int)
+    np.maximum.at(widths, grid_col, layout.shapes[:, 1])
+    np.maximum.at(heights, grid_row, layout.shapes[:, 0] + 1)  # + строка заголовка
+    col_start = 1 + np.concatenate(([0], np.cumsum(widths + 1)[:-1]))
+    row_start = 1 + np.concatenate(([0], np.cumsum(heights + 1)[:-1]))
+
+    title_font = Font(bold=True, size=12)
+    center = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    fill_cache = {}
+    light_font, dark_font = Font(size=8, color="000000"), Font(size=8, color="FFFFFF")
+
+    for d, name in enumerate(layout.names):
+        top, left = row_start[grid_row[d]], col_start[grid_col[d]]
+        title = ws.cell(row=top, column=left, value=name)
+        title.font = title_font
+        rows, cols = layout.shapes[d]
+        if cols > 1:
+            ws.merge_cells(start_row=top, start_column=left,
+                           end_row=top, end_column=left + cols - 1)
+
+        idx = layout.cells(d)
+        if len(idx) == 0:
+            ws.cell(row=top + 1, column=left, value="Нет данных")
+            continue
+
+        for i in idx:
+            cell = ws.cell(row=top + 1 + int(layout.row[i]), column=left + int(layout.col[i]))
+            if conditional:
+                cell.value = float(layout.values[i])
+                cell.number_format = '0.0'
+            elif show_values:
+                cell.value = f"{layout.regions[i]}\n{layout.values[i]:.1f}"
+            cell.alignment = center
+            if not conditional:
+                color = fills[i]
+                if color not in fill_cache:
+                    fill_cache[color] = PatternFill(fill_type='solid', start_color=color, end_color=color)
+                cell.fill = fill_cache[color]
+                cell.font = dark_font if dark[i] else light_font
+
+        if conditional:
+            block = (f"{get_column_letter(left)}{top + 1}:"
+                     f"{get_column_letter(left + cols - 1)}{top + rows}")
+            low, mid, high = to_hex(map_colors(np.array([0.0, 0.5, 1.0]), colormap))
+            ws.conditional_formatting.add(block, ColorScaleRule(
+                start_type='num', start_value=layout.vmin, start_color=low,
+                mid_type='num', mid_value=(layout.vmin + layout.vmax) / 2, mid_color=mid,
+                end_type='num', end_value=layout.vmax, end_color=high,
+            ))
+
+    for c in range(1, int(col_start[-1] + widths[-1]) + 1):
+        ws.column_dimensions[get_column_letter(c)].width = CELL_WIDTH
+    for r in range(1, int(row_start[-1] + heights[-1]) + 1):
+        ws.row_dimensions[r].height = CELL_HEIGHT
+
+    # Рейтинг с той же заливкой значений
+    ranked = ranked_frame(df, value_column)
+    ws_rank = wb.create_sheet(RANKING_SHEET)
+    ws_rank.append([RANK_COLUMN, REQUIRED_COLUMN, DISTRICT_COLUMN, value_column])
+    for cell in ws_rank[1]:
+        cell.font = Font(bold=True)
+    districts = ranked[REQUIRED_COLUMN].map(get_district_by_region).to_numpy()
+    values = ranked[value_column].to_numpy(dtype=np.float64)
+    span = layout.vmax - layout.vmin
+    rank_rgb = map_colors((values - layout.vmin) / span if span else np.zeros_like(values), colormap)
+    rank_fills = to_hex(rank_rgb)
+    for i, (rank, region) in enumerate(zip(ranked.index, ranked[REQUIRED_COLUMN])):
+        ws_rank.append([int(rank), region, districts[i], float(values[i])])
+        cell = ws_rank.cell(row=i + 2, column=4)
+        cell.number_format = '0.00'
+        color = rank_fills[i]
+        if color not in fill_cache:
+            fill_cache[color] = PatternFill(fill_type='solid', start_color=color, end_color=color)
+        cell.fill = fill_cache[color]
+    for letter, width in zip("ABCD", (8, 40, 24, 12)):
+        ws_rank.column_dimensions[letter].width = width
+
+    wb.save(file_path)
@@ -0,0 +1,99 @@
+"""
+Интерактивная тепловая карта по федеральным округам в автономном HTML
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..config.settings import HEATMAP_GRID_ROWS, HEATMAP_GRID_COLS, MPL_FACECOLOR
+from ..core.layout import DistrictLayout
+from .colors import colorscale
+
+HOVER_TEMPLATE = "<b>%{text}</b><br>Индекс: %{customdata:.2f}<extra></extra>"
+
+
+def build_heatmap_figure(df: pd.DataFrame, colormap: str = "RdYlGn",
+                         show_values: bool = True, value_column: str = 'Индекс',
+                         title: str = "Индекс по федеральным округам"):
+    """
+    Строит plotly-фигуру с раскладкой create_heatmap
+
+    Данные каждого блока передаются массивами float32 (plotly кодирует их
+    в base64), строки - только названия регионов для подсказок. Ячейки -
+    регионы справочника FEDERAL_DISTRICTS (не больше 85), поэтому каждый
+    округ - одна трасса Heatmap; строки вне справочника (филиалы) не
+    отображаются, как и в тепловой карте GUI.
+
+    Args:
+        df: Результаты расчёта
+        colormap: Цветовая схема (имена как в matplotlib, суффикс _r - обратная)
+        show_values: Подписывать ячейки названием и значением
+        value_column: Колонка значений
+        title: Заголовок
+
+    Returns:
+        plotly.graph_objects.Figure
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    layout = DistrictLayout.build(df, value_column)
+    regions = layout.regions.astype(str)
+    values = layout.values.astype(np.float32)
+
+    fig = make_subplots(
+        rows=HEATMAP_GRID_ROWS, cols=HEATMAP_GRID_COLS,
+        subplot_titles=layout.names,
+        horizontal_spacing=0.06, vertical_spacing=0.08,
+    )
+
+    for d, name in enumerate(layout.names):
+        r, c = d // HEATMAP_GRID_COLS + 1, d % HEATMAP_GRID_COLS + 1
+        idx = layout.cells(d)
+        if len(idx) == 0:
+            continue
+
+        grid, where = layout.grid(d)
+        empty = where < 0
+        safe = np.where(empty, 0, where)
+        value_grid = np.where(empty, np.nan, values[safe]).astype(np.float32)
+        text_grid = np.where(empty, "", regions[safe])
+        trace = go.Heatmap(
+            z=grid.astype(np.float32), customdata=value_grid, text=text_grid,
+            coloraxis='coloraxis', hovertemplate=HOVER_TEMPLATE,
+            texttemplate="%{text}<br>%{customdata:.1f}" if show_values else None,
+            textfont=dict(size=9, color='black'), xgap=2, ygap=2, name=name,
+        )
+        fig.add_trace(trace, row=r, col=c)
+
+    fig.update_xaxes(showticklabels=False, showgrid=False, zeroline=False)
+    fig.update_yaxes(showticklabels=False, showgrid=False, zeroline=False, autorange='reversed')
+    fig.update_layout(
+        title=title,
+        coloraxis=dict(colorscale=colorscale(colormap), cmin=0, cmax=1, showscale=False),
+        paper_bgcolor=MPL_FACECOLOR, plot_bgcolor=MPL_FACECOLOR,
+        font=dict(color='white'), showlegend=False,
+        height=320 * HEATMAP_GRID_ROWS, margin=dict(l=20, r=20, t=80, b=20),
+    )
+    return fig
+
+
+def write_heatmap_html(df: pd.DataFrame, file_path: str, colormap: str = "RdYlGn",
+                       show_values: bool = True, value_column: str = 'Индекс') -> None:
+    """
+    Сохраняет интерактивную тепловую карту в один HTML файл
+
+    plotly.js встраивается в файл, поэтому он открывается без интернета.
+
+    Args:
+        df: Результаты расчёта
+        file_path: Путь к .html файлу
+        colormap: Цветовая схема
+        show_values: Подписывать ячейки
+        value_column: Колонка значений
+    """
+    fig = build_heatmap_figure(df, colormap, show_values, value_column)
+    fig.write_html(
+        file_path, include_plotlyjs=True, full_html=True,
+        config={'displaylogo': False, 'responsive': True},
+    )
@@ -4,6 +4,12 @@ UI package for FinTrustMap
 Provides a simple CLI wrapper and a GUI launcher.
 """
 from .cli import run_cli
-from .gui import run_gui
+
+
+def run_gui():
+    """Launch the GUI. Imported lazily so the CLI never loads Qt or matplotlib."""
+    from .gui import run_gui as _run_gui
+    return _run_gui()
+
 
 __all__ = ["run_cli", "run_gui"]
@@ -9,9 +9,10 @@ import sys
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QRadioButton, QButtonGroup, QComboBox, QCheckBox, QFileDialog,
-    QMessageBox, QTextEdit, QGroupBox, QScrollArea
+    QMessageBox, QTextEdit, QGroupBox, QScrollArea, QTabWidget, QTableView,
+    QLineEdit, QHeaderView
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QFileSystemWatcher, QTimer
 from PyQt5.QtGui import QFont
 import pandas as pd
 import numpy as np
@@ -19,9 +20,36 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from matplotlib.colors import ListedColormap
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch, Rectangle
 from datetime import datetime
 import os
 
+from src.config.settings import WATCH_DEBOUNCE, IMPUTATION_METHODS
+from src.core.data_loader import DataLoader
+from src.core.validation import ValidationSchema
+from src.core.pipeline import Pipeline, RESULT_COLUMNS
+from src.core.clustering import ClusteringError, CLUSTER_COLUMN
+from src.core.ranking import top_n, compare_ranks, movers
+from src.core.spatial import (
+    SpatialError, morans_i, local_moran, SpatialWeights,
+    HOT_SPOT, COLD_SPOT, HIGH_OUTLIER, LOW_OUTLIER
+)
+from src.core.watcher import diff_frames
+from src.ui.results_model import ResultsTableModel
+
+# Cell outline for each LISA cluster type: (colour, line style)
+HOTSPOT_STYLES = {
+    HOT_SPOT: ("#ff2d2d", "-"),
+    COLD_SPOT: ("#2d8cff", "-"),
+    HIGH_OUTLIER: ("#ff9f1a", "--"),
+    LOW_OUTLIER: ("#7fd4ff", "--"),
+}
+
+# Categorical palette for indicator-profile groups: group N gets colour N-1
+GROUP_COLORS = plt.get_cmap("tab10").colors
+
 class FinTrustHeatmapApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -32,6 +60,17 @@ class FinTrustHeatmapApp(QMainWindow):
         self.df = None
         self.excel_file = None
         self.canvas = None
+        self.heatmap_fig = None
+        self.district_axes = {}
+        self.clusters = {}
+        
+        # File watching
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self.on_file_changed)
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(int(WATCH_DEBOUNCE * 1000))
+        self.reload_timer.timeout.connect(self.reload_watched_file)
         
         # Setup UI
         self.init_ui()
@@ -117,12 +156,80 @@ class FinTrustHeatmapApp(QMainWindow):
         self.preview_frame = QWidget()
         self.preview_layout = QVBoxLayout()
         self.preview_frame.setLayout(self.preview_layout)
-        right_layout.addWidget(self.preview_frame)
+        
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.preview_frame, "Heatmap")
+        self.tabs.addTab(self.create_results_tab(), "Таблица")
+        right_layout.addWidget(self.tabs)
         
         main_layout.addWidget(right_panel, 1)
         main_layout.setStretch(0, 0)
         main_layout.setStretch(1, 1)
     
+    def create_results_tab(self):
+        """Create the virtualized results table with region/district filters"""
+        tab = QWidget()
+        layout = QVBoxLayout()
+        tab.setLayout(layout)
+        
+        filters = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Поиск по региону")
+        self.filter_edit.textChanged.connect(self.apply_results_filter)
+        filters.addWidget(self.filter_edit, 1)
+        
+        self.district_filter = QComboBox()
+        self.district_filter.addItem("Все округа")
+        self.district_filter.currentIndexChanged.connect(self.apply_results_filter)
+        filters.addWidget(self.district_filter)
+        layout.addLayout(filters)
+        
+        self.results_model = ResultsTableModel(self)
+        self.results_view = QTableView()
+        self.results_view.setModel(self.results_model)
+        self.results_view.setSortingEnabled(True)
+        self.results_view.setAlternatingRowColors(True)
+        # Fixed row heights so Qt never measures rows while scrolling
+        self.results_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.results_view.verticalHeader().setDefaultSectionSize(22)
+        self.results_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.results_view.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.results_view)
+        
+        self.results_label = QLabel("")
+        layout.addWidget(self.results_label)
+        return tab
+    
+    def update_results_table(self):
+        """Reload the results table from self.df"""
+        if self.df is None or 'Индекс' not in self.df.columns:
+            self.results_model.clear()
+            self.results_label.setText("")
+            return
+        self.results_model.set_frame(self.df)
+        
+        self.district_filter.blockSignals(True)
+        self.district_filter.clear()
+        self.district_filter.addItem("Все округа")
+        self.district_filter.addItems(self.results_model.districts)
+        self.district_filter.blockSignals(False)
+        self.filter_edit.blockSignals(True)
+        self.filter_edit.clear()
+        self.filter_edit.blockSignals(False)
+        
+        # Highest index first, as in the ranking
+        self.results_view.sortByColumn(2, Qt.DescendingOrder)
+        self.results_label.setText(f"Строк: {len(self.df)}")
+    
+    def apply_results_filter(self, *args):
+        """Filter the results table by region substring and federal district"""
+        district = self.district_filter.currentIndex() - 1
+        self.results_model.set_filter(self.filter_edit.text(),
+                                      district if district >= 0 else None)
+        self.results_label.setText(
+            f"Строк: {len(self.results_model.source_rows())} из {len(self.df) if self.df is not None else 0}"
+        )
+    
     def create_left_panel(self):
         """Create left control panel"""
         scroll = QScrollArea()
@@ -175,6 +282,10 @@ class FinTrustHeatmapApp(QMainWindow):
         btn_load.clicked.connect(self.load_excel)
         layout.addWidget(btn_load)
         
+        self.watch_check = QCheckBox("Следить за изменениями файла")
+        self.watch_check.toggled.connect(self.toggle_watch)
+        layout.addWidget(self.watch_check)
+        
         group.setLayout(layout)
         return group
     
@@ -185,7 +296,9 @@ class FinTrustHeatmapApp(QMainWindow):
         
         self.method_group = QButtonGroup()
         methods = [
-            ("Методика ЦБ РФ", "cbr_method")
+            ("Методика ЦБ РФ", "cbr_method"),
+            ("Min-Max с обрезкой выбросов (5-95%)", "winsorized"),
+            ("Перцентильный ранг", "percentile_rank"),
         ]
         
         for i, (label, value) in enumerate(methods):
@@ -196,6 +309,12 @@ class FinTrustHeatmapApp(QMainWindow):
             self.method_group.addButton(radio, i)
             layout.addWidget(radio)
         
+        layout.addWidget(QLabel("Пропущенные значения:"))
+        self.impute_combo = QComboBox()
+        for value, label in IMPUTATION_METHODS.items():
+            self.impute_combo.addItem(label, value)
+        layout.addWidget(self.impute_combo)
+        
         group.setLayout(layout)
         return group
     
@@ -213,10 +332,21 @@ class FinTrustHeatmapApp(QMainWindow):
         ])
         layout.addWidget(self.colormap_combo)
         
+        layout.addWidget(QLabel("Раскраска heatmap:"))
+        self.color_mode_combo = QComboBox()
+        self.color_mode_combo.addItem("Индекс", "index")
+        self.color_mode_combo.addItem("Группы профилей показателей", "groups")
+        self.color_mode_combo.currentIndexChanged.connect(self.change_color_mode)
+        layout.addWidget(self.color_mode_combo)
+        
         self.show_values_check = QCheckBox("Показывать названия и значения")
         self.show_values_check.setChecked(True)
         layout.addWidget(self.show_values_check)
         
+        self.hotspots_check = QCheckBox("Выделять горячие/холодные точки (LISA)")
+        self.hotspots_check.toggled.connect(self.toggle_hotspots)
+        layout.addWidget(self.hotspots_check)
+        
         group.setLayout(layout)
         return group
     
@@ -235,11 +365,26 @@ class FinTrustHeatmapApp(QMainWindow):
         self.btn_show.setEnabled(False)
         layout.addWidget(self.btn_show)
         
+        self.btn_compare = QPushButton("📈 Сравнить с другим периодом")
+        self.btn_compare.clicked.connect(self.compare_with_file)
+        self.btn_compare.setEnabled(False)
+        layout.addWidget(self.btn_compare)
+        
         self.btn_export = QPushButton("💾 Экспорт")
         self.btn_export.clicked.connect(self.export_results)
         self.btn_export.setEnabled(False)
         layout.addWidget(self.btn_export)
         
+        self.btn_export_xlsx = QPushButton("📗 Heatmap в Excel")
+        self.btn_export_xlsx.clicked.connect(self.export_xlsx_heatmap)
+        self.btn_export_xlsx.setEnabled(False)
+        layout.addWidget(self.btn_export_xlsx)
+        
+        self.btn_export_html = QPushButton("🌐 Интерактивный HTML")
+        self.btn_export_html.clicked.connect(self.export_html)
+        self.btn_export_html.setEnabled(False)
+        layout.addWidget(self.btn_export_html)
+        
         group.setLayout(layout)
         return group
     
@@ -285,6 +430,17 @@ class FinTrustHeatmapApp(QMainWindow):
         except Exception as e:
             print(f"Error showing placeholder: {e}")
     
+    def read_excel(self, file_path):
+        """Read and validate an Excel file, return (df, numeric columns)"""
+        # Missing values are reported as warnings and handled by the selected imputation
+        loader = DataLoader(ValidationSchema(allow_missing=True))
+        df = loader.load_excel(file_path)
+        for issue in loader.validation_report.warnings:
+            self.log(f"Предупреждение: {issue}")
+        
+        numeric = loader.get_numeric_columns()
+        return df, numeric
+    
     def load_excel(self):
         """Load Excel file"""
         file_path, _ = QFileDialog.getOpenFileName(
@@ -294,27 +450,141 @@ class FinTrustHeatmapApp(QMainWindow):
             return
         
         try:
-            self.df = pd.read_excel(file_path)
+            self.df, numeric = self.read_excel(file_path)
             self.excel_file = file_path
             
-            if 'Регион' not in self.df.columns:
-                raise ValueError("В файле обязательно должна быть колонка 'Регион'")
-            
-            numeric = self.df.select_dtypes(include=[np.number]).columns.tolist()
-            if len(numeric) == 0:
-                raise ValueError("В файле нет числовых показателей.")
-            
             self.file_label.setText(
                 f"✓ {os.path.basename(file_path)} | Р:{len(self.df)} П:{len(numeric)}"
             )
             self.file_label.setStyleSheet("color: #00ff00;")
             self.btn_calc.setEnabled(True)
+            self.btn_show.setEnabled(False)
+            self.btn_compare.setEnabled(False)
+            self.btn_export.setEnabled(False)
+            self.btn_export_xlsx.setEnabled(False)
+            self.btn_export_html.setEnabled(False)
+            self.district_axes = {}
+            self.update_results_table()
+            self.update_watch_path()
             self.log(f"Файл загружен: {os.path.basename(file_path)} (показателей: {len(numeric)})")
             QMessageBox.information(self, "Успех", "Файл загружен")
         except Exception as e:
             self.log(f"Ошибка загрузки: {e}")
             QMessageBox.critical(self, "Ошибка", str(e))
     
+    def toggle_watch(self, checked):
+        """Enable or disable watching of the loaded file"""
+        self.update_watch_path()
+        if checked and self.excel_file:
+            self.log(f"Отслеживание изменений: {os.path.basename(self.excel_file)}")
+    
+    def update_watch_path(self):
+        """Point the file system watcher at the currently loaded file"""
+        watched = self.file_watcher.files()
+        if watched:
+            self.file_watcher.removePaths(watched)
+        if self.watch_check.isChecked() and self.excel_file:
+            self.file_watcher.addPath(self.excel_file)
+    
+    def on_file_changed(self, path):
+        """Debounce change notifications: reload once saving has settled"""
+        # Editors often save by replacing the file, which drops it from the watcher
+        if path not in self.file_watcher.files() and os.path.exists(path):
+            self.file_watcher.addPath(path)
+        self.reload_timer.start()
+    
+    def reload_watched_file(self):
+        """Reload the watched file and refresh only what changed"""
+        if not self.excel_file:
+            return
+        if self.excel_file not in self.file_watcher.files() and os.path.exists(self.excel_file):
+            self.file_watcher.addPath(self.excel_file)
+        
+        try:
+            new_df, numeric = self.read_excel(self.excel_file)
+        except Exception as e:
+            self.log(f"Ошибка перезагрузки: {e}")
+            return
+        
+        # Only source columns: the index and groups are never in the file
+        old_source = None if self.df is None else self.df.drop(columns=list(RESULT_COLUMNS), errors="ignore")
+        diff = diff_frames(old_source, new_df)
+        if diff.is_empty:
+            self.log("Файл сохранён, данные не изменились")
+            return
+        
+        self.log(f"Файл изменён: +{len(diff.added)} -{len(diff.removed)} ~{len(diff.changed)} регионов")
+        had_index = self.df is not None and 'Индекс' in self.df.columns
+        old_df = self.df
+        self.df = new_df
+        self.file_label.setText(
+            f"✓ {os.path.basename(self.excel_file)} | Р:{len(self.df)} П:{len(numeric)}"
+        )
+        
+        if not had_index:
+            return
+        try:
+            self.compute_index()
+        except Exception as e:
+            self.log(f"Ошибка расчёта: {e}")
+            return
+        
+        if self.district_axes:
+            index_diff = diff_frames(old_df, self.df, columns=['Индекс'])
+            self.refresh_heatmap(old_df, index_diff.regions)
+    
+    def selected_method(self):
+        """Return the calculation method chosen in the method group"""
+        return self.method_group.checkedButton().property("value")
+    
+    def compute_index(self):
+        """Calculate the index for the selected method into self.df['Индекс']"""
+        method = self.selected_method()
+        impute = self.impute_combo.currentData()
+        # Calculators are cached by data fingerprint: switching methods reuses prepared data
+        self.df = Pipeline.from_frame(self.df).index(method, impute=impute).collect().frame
+        self.update_groups()
+        self.update_results_table()
+        
+        self.log("Индекс рассчитан")
+        self.log(f"Среднее: {self.df['Индекс'].mean():.2f}, Мин: {self.df['Индекс'].min():.2f}, Макс: {self.df['Индекс'].max():.2f}")
+        leaders = top_n(self.df, 3)
+        self.log("Лидеры: " + ", ".join(
+            f"{rank}. {row['Регион']} ({row['Индекс']:.1f})" for rank, row in leaders.iterrows()
+        ))
+    
+    def groups_mode(self):
+        """True when the heatmap is coloured by indicator-profile groups"""
+        return self.color_mode_combo.currentData() == "groups"
+    
+    def update_groups(self):
+        """Recompute indicator-profile groups into self.df['Группа'] when colouring by groups"""
+        # A stale group column must not outlive the data it was computed from
+        self.df = self.df.drop(columns=CLUSTER_COLUMN, errors="ignore")
+        if not self.groups_mode():
+            return
+        pipeline = Pipeline.from_frame(self.df).index(
+            self.selected_method(), impute=self.impute_combo.currentData()
+        ).cluster()
+        try:
+            result = pipeline.collect()
+        except ClusteringError as e:
+            self.log(f"Группировка недоступна: {e}")
+            return
+        self.df = result.frame
+        clusters = result.clusters
+        self.log(f"Группы профилей: {clusters.k} (силуэт {clusters.silhouette:.3f}), "
+                 f"размеры: {', '.join(map(str, clusters.sizes))}")
+    
+    def change_color_mode(self):
+        """Switch the heatmap between index colours and profile groups"""
+        if self.df is None or 'Индекс' not in self.df.columns:
+            return
+        self.update_groups()
+        self.update_results_table()
+        if self.district_axes:
+            self.create_heatmap()
+    
     def calculate_index(self):
         """Calculate index"""
         if self.df is None:
@@ -322,63 +592,148 @@ class FinTrustHeatmapApp(QMainWindow):
             return
         
         try:
-            # Get selected method
-            selected_button = self.method_group.checkedButton()
-            method = selected_button.property("value")
-            
-            numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-            if len(numeric_cols) == 0:
-                raise ValueError("Нет числовых показателей для расчёта")
-            
-            if method == "simple_average":
-                self.df['Индекс'] = self.df[numeric_cols].mean(axis=1)
-            
-            elif method == "min_max_normalized":
-                normalized = self.df[numeric_cols].copy()
-                for c in numeric_cols:
-                    mi, ma = normalized[c].min(), normalized[c].max()
-                    if ma > mi:
-                        normalized[c] = (normalized[c] - mi) / (ma - mi)
-                    else:
-                        normalized[c] = 0.0
-                self.df['Индекс'] = 100 * normalized.mean(axis=1)
-            
-            elif method == "pca":
-                from sklearn.preprocessing import StandardScaler
-                from sklearn.decomposition import PCA
-                scaler = StandardScaler()
-                scaled = scaler.fit_transform(self.df[numeric_cols])
-                pca = PCA(n_components=1)
-                idx_raw = pca.fit_transform(scaled).flatten()
-                if idx_raw.max() != idx_raw.min():
-                    self.df['Индекс'] = 100 * (idx_raw - idx_raw.min()) / (idx_raw.max() - idx_raw.min())
-                else:
-                    self.df['Индекс'] = 50.0
-            
-            elif method == "cbr_method":
-                normalized = self.df[numeric_cols].copy()
-                for c in numeric_cols:
-                    mi, ma = normalized[c].min(), normalized[c].max()
-                    if ma > mi:
-                        normalized[c] = (normalized[c] - mi) / (ma - mi)
-                    else:
-                        normalized[c] = 0.5
-                
-                weights = np.ones(len(numeric_cols)) / len(numeric_cols)
-                self.df['Индекс'] = normalized.dot(weights) * 100
-            
-            else:
-                self.df['Индекс'] = self.df[numeric_cols].mean(axis=1)
-            
-            self.log("Индекс рассчитан")
-            self.log(f"Среднее: {self.df['Индекс'].mean():.2f}, Мин: {self.df['Индекс'].min():.2f}, Макс: {self.df['Индекс'].max():.2f}")
+            self.compute_index()
             self.btn_show.setEnabled(True)
+            self.btn_compare.setEnabled(True)
             self.btn_export.setEnabled(True)
+            self.btn_export_xlsx.setEnabled(True)
+            self.btn_export_html.setEnabled(True)
             QMessageBox.information(self, "Готово", "Индекс рассчитан")
         except Exception as e:
             self.log(f"Ошибка расчёта: {e}")
             QMessageBox.critical(self, "Ошибка", str(e))
     
+    def draw_district(self, ax, district, df, vmin, vmax):
+        """Draw one federal district block onto `ax`"""
+        regions = FEDERAL_DISTRICTS[district]
+        real_regions = [reg for reg in regions if reg in df.index]
+        
+        ax.set_facecolor("#1e1e1e")
+        ax.set_title(district, fontsize=12, color="white", pad=8)
+        
+        if len(real_regions) == 0:
+            ax.text(0.5, 0.5, "Нет данных", color="gray", ha="center", va="center", fontsize=10)
+            ax.axis("off")
+            return
+        
+        # Create grid
+        n = len(real_regions)
+        cols = int(np.ceil(np.sqrt(n)))
+        rows = int(np.ceil(n / cols))
+        
+        groups = self.groups_mode() and CLUSTER_COLUMN in df.columns
+        # Empty cells stay masked (NaN) in group mode: any number would be a group colour
+        grid = np.full((rows, cols), np.nan) if groups else np.zeros((rows, cols))
+        labels = [["" for _ in range(cols)] for __ in range(rows)]
+        
+        for i, region in enumerate(real_regions):
+            r0 = i // cols
+            c0 = i % cols
+            val = df.loc[region, "Индекс"]
+            if groups:
+                group = df.loc[region, CLUSTER_COLUMN]
+                if pd.isna(group):
+                    labels[r0][c0] = f"{region}\n{val:.1f}"
+                else:
+                    grid[r0, c0] = group
+                    labels[r0][c0] = f"{region}\nгр. {group}"
+                continue
+            if vmax != vmin:
+                norm_val = (val - vmin) / (vmax - vmin)
+            else:
+                norm_val = 0.0
+            
+            grid[r0, c0] = norm_val
+            labels[r0][c0] = f"{region}\n{val:.1f}"
+        
+        if groups:
+            color_kws = {"cmap": ListedColormap(GROUP_COLORS), "vmin": 0.5, "vmax": len(GROUP_COLORS) + 0.5}
+        else:
+            color_kws = {"cmap": self.colormap_combo.currentText()}
+        sns.heatmap(
+            grid, ax=ax, cbar=False, **color_kws,
+            annot=labels if self.show_values_check.isChecked() else False,
+            fmt="", linewidths=1.5, linecolor="#1e1e1e",
+            annot_kws={"color": "black", "size": 6}
+        )
+        
+        for i, region in enumerate(real_regions):
+            style = HOTSPOT_STYLES.get(self.clusters.get(region))
+            if style:
+                color, linestyle = style
+                ax.add_patch(Rectangle((i % cols + 0.05, i // cols + 0.05), 0.9, 0.9, fill=False,
+                                       edgecolor=color, linestyle=linestyle, linewidth=2.5))
+        
+        ax.set_xticks([])
+        ax.set_yticks([])
+    
+    def update_hotspots(self):
+        """Recompute LISA clusters for self.df; returns regions whose cluster changed"""
+        old = self.clusters
+        self.clusters = {}
+        if self.hotspots_check.isChecked():
+            try:
+                weights = SpatialWeights.from_regions(self.df["Регион"].astype(str).tolist())
+                moran = morans_i(self.df["Индекс"].to_numpy(), weights)
+                lisa = local_moran(self.df, weights)
+            except SpatialError as e:
+                self.log(f"Пространственный анализ недоступен: {e}")
+            else:
+                self.clusters = {region: cluster for region, cluster in
+                                 zip(lisa["Регион"], lisa["Кластер"]) if cluster in HOTSPOT_STYLES}
+                self.log(f"Moran's I = {moran.I:.3f} (p = {moran.p_sim:.4f}), "
+                         f"значимых кластеров: {len(self.clusters)}")
+        return [r for r in set(old) | set(self.clusters) if old.get(r) != self.clusters.get(r)]
+    
+    def toggle_hotspots(self, checked):
+        """Redraw the heatmap with or without cluster outlines"""
+        if self.district_axes:
+            self.create_heatmap()
+    
+    def add_legend(self, fig):
+        """Legend for profile groups and cluster outlines below the district blocks"""
+        handles = []
+        if self.groups_mode() and CLUSTER_COLUMN in self.df.columns:
+            sizes = self.df[CLUSTER_COLUMN].value_counts().sort_index()
+            handles += [Patch(color=GROUP_COLORS[(group - 1) % len(GROUP_COLORS)],
+                              label=f"Группа {group} ({count})") for group, count in sizes.items()]
+        if self.hotspots_check.isChecked():
+            handles += [Line2D([], [], color=color, linestyle=linestyle, linewidth=2.5, label=kind)
+                        for kind, (color, linestyle) in HOTSPOT_STYLES.items()]
+        if not handles:
+            return
+        fig.legend(handles=handles, loc="lower center", ncol=len(handles), frameon=False,
+                   labelcolor="white", fontsize=8)
+    
+    def refresh_heatmap(self, old_df, changed_regions):
+        """Redraw only the district blocks affected by `changed_regions`"""
+        values = self.df["Индекс"]
+        old_values = old_df["Индекс"]
+        # LISA clusters depend on neighbours, so they can change outside the edited regions
+        if self.groups_mode() and CLUSTER_COLUMN in self.df.columns:
+            # Groups are refitted on the whole table: any region and the legend may change
+            self.create_heatmap()
+            return
+        changed = set(changed_regions) | set(self.update_hotspots())
+        if (values.min(), values.max()) != (old_values.min(), old_values.max()):
+            # Colour scale moved: every block needs new colours
+            districts = list(self.district_axes)
+        else:
+            districts = [d for d in self.district_axes
+                         if changed.intersection(FEDERAL_DISTRICTS[d])]
+        
+        if not districts:
+            return
+        
+        df = self.df.set_index("Регион")
+        for district in districts:
+            ax = self.district_axes[district]
+            ax.clear()
+            ax.axis("on")
+            self.draw_district(ax, district, df, values.min(), values.max())
+        self.canvas.draw_idle()
+        self.log(f"Heatmap обновлён: {', '.join(districts)}")
+    
     def create_heatmap(self):
         """Create and display heatmap"""
         if self.df is None or 'Индекс' not in self.df.columns:
@@ -391,12 +746,14 @@ class FinTrustHeatmapApp(QMainWindow):
             # Prepare data
             df = self.df.copy().set_index("Регион")
             values = df["Индекс"]
+            self.update_hotspots()
             
             # Create figure
             fig = Figure(figsize=(14, 8), dpi=100, facecolor="#1e1e1e")
             gs = fig.add_gridspec(4, 2, wspace=0.25, hspace=0.35)
             
             district_positions = list(FEDERAL_DISTRICTS.keys())
+            district_axes = {}
             pos_idx = 0
             
             # Draw each district
@@ -406,49 +763,11 @@ class FinTrustHeatmapApp(QMainWindow):
                         break
                     
                     district = district_positions[pos_idx]
-                    regions = FEDERAL_DISTRICTS[district]
-                    real_regions = [reg for reg in regions if reg in df.index]
-                    
                     ax = fig.add_subplot(gs[r, c])
-                    ax.set_facecolor("#1e1e1e")
-                    ax.set_title(district, fontsize=12, color="white", pad=8)
-                    
-                    if len(real_regions) == 0:
-                        ax.text(0.5, 0.5, "Нет данных", color="gray", ha="center", va="center", fontsize=10)
-                        ax.axis("off")
-                        pos_idx += 1
-                        continue
-                    
-                    # Create grid
-                    n = len(real_regions)
-                    cols = int(np.ceil(np.sqrt(n)))
-                    rows = int(np.ceil(n / cols))
-                    
-                    grid = np.zeros((rows, cols))
-                    labels = [["" for _ in range(cols)] for __ in range(rows)]
-                    
-                    for i, region in enumerate(real_regions):
-                        r0 = i // cols
-                        c0 = i % cols
-                        val = df.loc[region, "Индекс"]
-                        if values.max() != values.min():
-                            norm_val = (val - values.min()) / (values.max() - values.min())
-                        else:
-                            norm_val = 0.0
-                        
-                        grid[r0, c0] = norm_val
-                        labels[r0][c0] = f"{region}\n{val:.1f}"
-                    
-                    sns.heatmap(
-                        grid, cmap=self.colormap_combo.currentText(), ax=ax, cbar=False,
-                        annot=labels if self.show_values_check.isChecked() else False,
-                        fmt="", linewidths=1.5, linecolor="#1e1e1e",
-                        annot_kws={"color": "black", "size": 6}
-                    )
-                    
-                    ax.set_xticks([])
-                    ax.set_yticks([])
+                    self.draw_district(ax, district, df, values.min(), values.max())
+                    district_axes[district] = ax
                     pos_idx += 1
+            self.add_legend(fig)
             
             # Clear previous canvas
             for i in reversed(range(self.preview_layout.count())):
@@ -460,6 +779,8 @@ class FinTrustHeatmapApp(QMainWindow):
             self.canvas = FigureCanvas(fig)
             self.preview_layout.addWidget(self.canvas)
             self.canvas.draw()
+            self.heatmap_fig = fig
+            self.district_axes = district_axes
             
             self.log("✓ Красивый Heatmap создан!")
         except Exception as e:
@@ -468,6 +789,36 @@ class FinTrustHeatmapApp(QMainWindow):
             traceback.print_exc()
             QMessageBox.critical(self, "Ошибка", str(e))
     
+    def compare_with_file(self):
+        """Compare current ranks with another period's file and log the movers"""
+        if self.df is None or 'Индекс' not in self.df.columns:
+            QMessageBox.warning(self, "Предупреждение", "Сначала рассчитайте индекс!")
+            return
+        
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Файл другого периода", "", "Excel Files (*.xlsx *.xls);;All Files (*)"
+        )
+        if not file_path:
+            return
+        
+        try:
+            previous_df, _ = self.read_excel(file_path)
+            impute = self.impute_combo.currentData()
+            previous = (Pipeline.from_frame(previous_df)
+                        .index(self.selected_method(), impute=impute).collect().frame)
+            comparison = compare_ranks(previous, self.df)
+            up, down = movers(comparison, 5)
+            
+            self.log(f"Сравнение с {os.path.basename(file_path)}:")
+            for title, frame in (("Поднялись", up), ("Опустились", down)):
+                items = ", ".join(
+                    f"{row['Регион']} ({int(row['Δ Ранг']):+d})" for _, row in frame.iterrows()
+                )
+                self.log(f"{title}: {items or 'нет'}")
+        except Exception as e:
+            self.log(f"Ошибка сравнения: {e}")
+            QMessageBox.critical(self, "Ошибка", str(e))
+    
     def export_results(self):
         """Export results to Excel"""
         if self.df is None or 'Индекс' not in self.df.columns:
@@ -481,10 +832,57 @@ class FinTrustHeatmapApp(QMainWindow):
             if not file_path:
                 return
             
-            out = self.df.sort_values('Индекс', ascending=False).reset_index(drop=True)
-            out.index = out.index + 1
-            out.index.name = 'Ранг'
-            out.to_excel(file_path)
+            Pipeline.from_frame(self.df).aggregate().rank().export(file_path).collect(strict_exports=True)
+            
+            self.log(f"Экспортировано: {os.path.basename(file_path)}")
+            QMessageBox.information(self, "Успех", "Экспорт завершён")
+        except Exception as e:
+            self.log(f"Ошибка экспорта: {e}")
+            QMessageBox.critical(self, "Ошибка", str(e))
+    
+    def export_xlsx_heatmap(self):
+        """Export the district heatmap as a colored Excel workbook"""
+        if self.df is None or 'Индекс' not in self.df.columns:
+            QMessageBox.warning(self, "Предупреждение", "Нечего экспортировать")
+            return
+        
+        try:
+            file_path, _ = QFileDialog.getSaveFileName(
+                self, "Сохранить Heatmap", "", "Excel Files (*.xlsx)"
+            )
+            if not file_path:
+                return
+            
+            Pipeline.from_frame(self.df).export(
+                file_path, 'xlsx_heatmap',
+                colormap=self.colormap_combo.currentText(),
+                show_values=self.show_values_check.isChecked()
+            ).collect(strict_exports=True)
+            
+            self.log(f"Экспортировано: {os.path.basename(file_path)}")
+            QMessageBox.information(self, "Успех", "Экспорт завершён")
+        except Exception as e:
+            self.log(f"Ошибка экспорта: {e}")
+            QMessageBox.critical(self, "Ошибка", str(e))
+    
+    def export_html(self):
+        """Export an interactive heatmap to a standalone HTML file"""
+        if self.df is None or 'Индекс' not in self.df.columns:
+            QMessageBox.warning(self, "Предупреждение", "Нечего экспортировать")
+            return
+        
+        try:
+            file_path, _ = QFileDialog.getSaveFileName(
+                self, "Сохранить HTML", "", "HTML Files (*.html)"
+            )
+            if not file_path:
+                return
+            
+            Pipeline.from_frame(self.df).export(
+                file_path, 'html',
+                colormap=self.colormap_combo.currentText(),
+                show_values=self.show_values_check.isChecked()
+            ).collect(strict_exports=True)
             
             self.log(f"Экспортировано: {os.path.basename(file_path)}")
             QMessageBox.information(self, "Успех", "Экспорт завершён")
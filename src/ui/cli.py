@@ -4,18 +4,73 @@ Command-line interface for FinTrustMap.
 Usage examples:
   python run.py --cli --file data.xlsx --method pca
   python run.py --cli --file data.xlsx --method min_max_normalized --export out.xlsx
+  python run.py --cli --file data.xlsx --method percentile_rank
+  python run.py --cli --file data.xlsx --watch
+  python run.py --cli --file data.xlsx --html heatmap.html
+  python run.py --cli --file data.xlsx --impute district_mean
+  python run.py --cli --file data.xlsx --backend polars
+  python run.py --cli --file data.xlsx --method cbr_method --hotspots
+  python run.py --cli --file data.xlsx --clusters --export out.xlsx
+  python run.py --cli scenarios scenarios.yaml --output results.csv
+  python run.py --cli --file data.xlsx --method cbr_method --history
+  python run.py --cli history region "Республика Татарстан" --method cbr_method -n 20
 """
 import argparse
 import sys
 from pathlib import Path
 import pandas as pd
 
-from src.core.data_loader import DataLoader, DataLoadError
-from src.core.calculator import IndexCalculator, CalculationError
+from src.config.settings import IMPUTATION_METHODS, HISTORY_DB_PATH, SPATIAL_PERMUTATIONS
+from src.core.data_loader import DataLoadError
+from src.core.validation import ValidationSchema
+from src.core.calculator import CalculationError
+from src.core.backends import BACKENDS, METHODS
+from src.core.aggregation import RollupEngine
+from src.core.scenarios import ScenarioRunner, ScenarioError, load_scenario_file
+from src.core.history import HistoryStore
+from src.core.pipeline import Pipeline, PipelineError, RESULT_COLUMNS
+from src.core.ranking import top_n, compare_ranks, movers
+from src.core.spatial import SpatialError, hot_spots
+from src.core.clustering import ClusteringError
+from src.core.watcher import FileWatcher, diff_frames
 
 
-def print_stats(calc: IndexCalculator, df: pd.DataFrame):
-    stats = calc.get_statistics(df)
+def make_schema(args) -> ValidationSchema:
+    """Validation schema for the CLI options: missing values are only accepted with --impute."""
+    return ValidationSchema(allow_missing=args.impute is not None)
+
+
+def load_source(file_path: Path, args) -> Pipeline:
+    """Pipeline source for `file_path` with the --sheet, --stream and --backend options."""
+    sheet = int(args.sheet) if args.sheet.isdigit() else args.sheet
+    return Pipeline.load(file_path, sheet=sheet, schema=make_schema(args), stream=args.stream,
+                         backend=args.backend)
+
+
+def build_pipeline(source: Pipeline, args, rollup_engine: RollupEngine) -> Pipeline:
+    """Add the calculation, aggregation and export stages requested by `args`."""
+    pipeline = source
+    if args.columns:
+        pipeline = pipeline.select(args.columns.split(','))
+    pipeline = pipeline.index(args.method, impute=args.impute or 'skip').aggregate(rollup_engine)
+    if args.clusters is not None:
+        pipeline = pipeline.cluster(args.clusters or None)
+    if args.hotspots:
+        pipeline = pipeline.spatial(args.permutations)
+
+    if args.export:
+        p = Path(args.export)
+        if p.suffix == '':
+            p = p.with_suffix('.xlsx')
+        pipeline = pipeline.export(p, 'results')
+    if args.xlsx_heatmap:
+        pipeline = pipeline.export(args.xlsx_heatmap, 'xlsx_heatmap', colormap=args.colormap)
+    if args.html:
+        pipeline = pipeline.export(args.html, 'html', colormap=args.colormap)
+    return pipeline
+
+
+def print_stats(stats: dict):
     if not stats:
         print("No 'Индекс' column found in result.")
         return
@@ -24,12 +79,268 @@ def print_stats(calc: IndexCalculator, df: pd.DataFrame):
         print(f"  {k}: {v:.3f}")
 
 
+def print_hotspots(run):
+    """Print global Moran's I and the significant LISA clusters."""
+    moran = run.moran
+    if moran.permutations:
+        significance = f"p_sim = {moran.p_sim:.4f}, {moran.permutations} permutations"
+    else:
+        significance = f"p_norm = {moran.p_norm:.4f}"
+    print(f"\nSpatial autocorrelation: Moran's I = {moran.I:.4f} "
+          f"(E[I] = {moran.expected:.4f}, {significance})")
+    clusters = hot_spots(run.lisa)
+    if not clusters:
+        print("  No significant local clusters")
+    for kind, regions in clusters.items():
+        print(f"  {kind}: {', '.join(regions)}")
+
+
+def print_comparison(args, result: pd.DataFrame) -> int:
+    """Print rank changes of `result` against the --compare dataset."""
+    try:
+        previous = (Pipeline.load(args.compare, schema=make_schema(args), backend=args.backend)
+                    .index(args.method, impute=args.impute or 'skip')
+                    .collect().frame)
+    except (DataLoadError, CalculationError) as e:
+        print(f"Error loading comparison data: {e}")
+        return 3
+
+    comparison = compare_ranks(previous, result)
+    up, down = movers(comparison, args.top)
+    columns = ['Регион', 'Ранг (пред.)', 'Ранг', 'Δ Ранг', 'Δ Индекс']
+    print(f"\nRank changes vs {Path(args.compare).name}:")
+    print("  Risers:")
+    print(up[columns].to_string(index=False) if len(up) else "  none")
+    print("  Fallers:")
+    print(down[columns].to_string(index=False) if len(down) else "  none")
+    return 0
+
+
+def compute_and_report(source: Pipeline, args, file_name: str, rollup_engine: RollupEngine):
+    """Run the pipeline for `source`, print the summary and report the exports.
+
+    Returns a tuple (exit_code, result frame).
+    """
+    try:
+        run = build_pipeline(source, args, rollup_engine).collect()
+    except DataLoadError as e:
+        print(f"Error loading data: {e}")
+        return 3, None
+    except (CalculationError, PipelineError, SpatialError, ClusteringError) as e:
+        print(f"Calculation error: {e}")
+        return 4, None
+    result = run.frame
+
+    if run.report is not None:
+        for issue in run.report.warnings:
+            print(f"Warning: {issue}")
+
+    if args.history:
+        try:
+            with HistoryStore(args.history) as store:
+                store.record_frame(result, args.method, run.dataset.fingerprint,
+                                   source=file_name, params={'impute': run.impute,
+                                                             'backend': args.backend},
+                                   seconds=run.timings['index'])
+        except Exception as e:
+            print(f"Failed to record history: {e}")
+
+    # Print basic info
+    print(f"Loaded: {file_name} | regions: {len(result)} | method: {args.method}")
+    print_stats(run.statistics)
+
+    # Show top N
+    print(f"\nTop {args.top} regions by Индекс:")
+    print(top_n(result, args.top)[['Регион', 'Индекс']].to_string(index=True))
+
+    if args.compare:
+        code = print_comparison(args, result)
+        if code:
+            return code, result
+
+    # District (and region, for branch-level input) aggregates
+    print("\nFederal district aggregates:")
+    print(run.rollups['Федеральные округа'].to_string(index=False, float_format='{:.2f}'.format))
+
+    if run.clusters is not None:
+        clusters = run.clusters
+        print(f"\nIndicator profile groups: k = {clusters.k} (silhouette {clusters.silhouette:.3f})")
+        print(run.rollups['Группы'].to_string(index=False, float_format='{:.2f}'.format))
+
+    if run.moran is not None:
+        print_hotspots(run)
+
+    code = 0
+    for path, error in run.exports.items():
+        if error is None:
+            print(f"Exported to {path}")
+        else:
+            print(f"Failed to export {path}: {error}")
+            code = 5
+    return code, result
+
+
+def watch(file_path: Path, df: pd.DataFrame, result, args, rollup_engine: RollupEngine):
+    """Re-run the calculation every time `file_path` is saved."""
+    state = {'df': df, 'result': result}
+
+    def on_change(path):
+        # Reload exactly like the first run: same sheet, columns and streaming mode
+        source = load_source(Path(path), args)
+        try:
+            new_df = build_pipeline(source, args, rollup_engine).read()
+        except DataLoadError as e:
+            # Keep watching: the file is often mid-save or temporarily invalid
+            print(f"Error loading data: {e}")
+            return
+
+        diff = diff_frames(state['df'], new_df)
+        if diff.is_empty and state['result'] is not None:
+            print(f"\n{file_path.name} saved, data unchanged")
+            return
+
+        print(f"\n{file_path.name} changed: +{len(diff.added)} -{len(diff.removed)} "
+              f"~{len(diff.changed)} regions"
+              + (", columns changed" if diff.columns_changed else ""))
+        state['df'] = new_df
+        # The frame just read is cached, so the run does not read the file again
+        _, state['result'] = compute_and_report(source, args, file_path.name, rollup_engine)
+
+    watcher = FileWatcher(str(file_path), on_change)
+    print(f"\nWatching {file_path} for changes (Ctrl+C to stop)...")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+    return 0
+
+
+def run_scenarios_cli(argv):
+    """`scenarios` subcommand: run a scenario file over a process pool."""
+    parser = argparse.ArgumentParser(prog="fintrustmap scenarios",
+                                     description="Run datasets x methods x weights scenarios")
+    parser.add_argument("spec", help="Scenario file (.json, .yaml)")
+    parser.add_argument("--output", "-o", default="scenarios.csv", help="Output CSV path")
+    parser.add_argument("--workers", "-j", type=int, help="Number of worker processes")
+    args = parser.parse_args(argv)
+
+    try:
+        runner = ScenarioRunner(load_scenario_file(args.spec), max_workers=args.workers)
+    except (OSError, ValueError, ScenarioError) as e:
+        print(f"Error loading scenarios: {e}")
+        return 3
+
+    def on_result(scenario, seconds, error):
+        if error is not None:
+            print(f"  {scenario.name}: FAILED ({error})")
+        else:
+            print(f"  {scenario.name}: {seconds * 1000:.1f} ms")
+
+    print(f"Running {len(runner.scenarios)} scenarios...")
+    try:
+        timings = runner.run(args.output, on_result=on_result)
+    except (DataLoadError, ScenarioError) as e:
+        print(f"Error: {e}")
+        return 3
+
+    failed = timings['Ошибка'].notna().sum()
+    print(f"Results written to {args.output} ({len(timings) - failed} ok, {failed} failed)")
+    return 4 if failed else 0
+
+
+def run_history_cli(argv):
+    """`history` subcommand: query stored runs without recomputing."""
+    parser = argparse.ArgumentParser(prog="fintrustmap history",
+                                     description="Query the history of stored runs")
+    parser.add_argument("--db", default=HISTORY_DB_PATH, help="History database path")
+    sub = parser.add_subparsers(dest="query", required=True)
+
+    p_runs = sub.add_parser("runs", help="List recent runs")
+    p_runs.add_argument("--method", "-m", help="Only runs of this method")
+    p_runs.add_argument("-n", type=int, default=20, help="Number of runs")
+
+    p_region = sub.add_parser("region", help="Index history of one region")
+    p_region.add_argument("region", help="Region name")
+    p_region.add_argument("--method", "-m", help="Only runs of this method")
+    p_region.add_argument("-n", type=int, default=20, help="Number of runs")
+
+    p_trends = sub.add_parser("trends", help="Change of every region over recent runs of a method")
+    p_trends.add_argument("--method", "-m", default="min_max_normalized", help="Calculation method")
+    p_trends.add_argument("-n", type=int, default=20, help="Number of runs")
+    p_trends.add_argument("--top", "-t", type=int, default=10, help="Show top N risers and fallers")
+    args = parser.parse_args(argv)
+
+    if not Path(args.db).exists():
+        print(f"History database not found: {args.db}")
+        return 2
+
+    with HistoryStore(args.db) as store:
+        if args.query == "runs":
+            table = store.runs(args.method, args.n)
+        elif args.query == "region":
+            table = store.region_history(args.region, args.method, args.n)
+        else:
+            table = store.trends(args.method, args.n)
+
+    if table.empty:
+        print("No matching runs.")
+        return 0
+    if args.query == "trends":
+        print(f"Risers over the last {args.n} '{args.method}' runs:")
+        print(table.head(args.top).to_string(index=False, float_format='{:.2f}'.format))
+        print("\nFallers:")
+        print(table.tail(args.top).iloc[::-1].to_string(index=False, float_format='{:.2f}'.format))
+    else:
+        print(table.to_string(index=False, float_format='{:.3f}'.format))
+    return 0
+
+
+SUBCOMMANDS = {
+    'scenarios': run_scenarios_cli,
+    'history': run_history_cli,
+}
+
+
 def run_cli(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in SUBCOMMANDS:
+        return SUBCOMMANDS[argv[0]](argv[1:])
+
     parser = argparse.ArgumentParser(description="FinTrustMap CLI")
     parser.add_argument("--file", "-f", required=True, help="Path to Excel file with data")
-    parser.add_argument("--method", "-m", default="min_max_normalized", help="Calculation method")
+    parser.add_argument("--method", "-m", choices=METHODS, default="min_max_normalized",
+                        help="Calculation method")
     parser.add_argument("--export", "-e", help="Optional export path (.xlsx)")
+    parser.add_argument("--html", help="Optional interactive heatmap export path (.html)")
+    parser.add_argument("--xlsx-heatmap", help="Optional colored heatmap workbook export path (.xlsx)")
+    parser.add_argument("--colormap", default="RdYlGn", help="Heatmap colormap for exports")
     parser.add_argument("--top", "-t", type=int, default=10, help="Show top N regions")
+    parser.add_argument("--watch", "-w", action="store_true",
+                        help="Recalculate every time the file is saved")
+    parser.add_argument("--sheet", default="0", help="Sheet name or number to read")
+    parser.add_argument("--columns", help="Comma-separated indicator columns to read")
+    parser.add_argument("--compare", "-c",
+                        help="Excel file of a previous period to report rank changes against")
+    parser.add_argument("--mapping",
+                        help="Excel file mapping branches/municipalities (1st column) to regions (2nd column)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read and validate the file in chunks, stop at the first bad chunk")
+    parser.add_argument("--history", nargs="?", const=HISTORY_DB_PATH,
+                        help=f"Record the run in a history database (default: {HISTORY_DB_PATH})")
+    parser.add_argument("--impute", choices=list(IMPUTATION_METHODS),
+                        help="Accept missing indicator values and handle them: skip (reweight per "
+                             "region), mean, district_mean (federal district mean) or drop")
+    parser.add_argument("--clusters", nargs="?", type=int, const=0, metavar="K",
+                        help="Group regions by indicator profile (K groups; without K it is "
+                             "chosen by silhouette) and add the 'Группа' column to exports")
+    parser.add_argument("--hotspots", action="store_true",
+                        help="Report Moran's I and LISA hot/cold spots over neighbouring regions")
+    parser.add_argument("--permutations", type=int, default=SPATIAL_PERMUTATIONS,
+                        help="Permutations for --hotspots significance")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="pandas",
+                        help="Engine for reading the sheet and computing the index "
+                             "(polars requires: pip install polars fastexcel)")
 
     args = parser.parse_args(argv)
 
@@ -38,44 +349,24 @@ def run_cli(argv=None):
         print(f"File not found: {file_path}")
         return 2
 
-    loader = DataLoader()
-    try:
-        df = loader.load_excel(str(file_path))
-    except DataLoadError as e:
-        print(f"Error loading data: {e}")
-        return 3
-
-    calc = IndexCalculator(df)
-    try:
-        result = calc.calculate_index(method=args.method)
-    except CalculationError as e:
-        print(f"Calculation error: {e}")
-        return 4
-
-    # Print basic info
-    print(f"Loaded: {file_path.name} | regions: {len(result)} | method: {args.method}")
-    print_stats(calc, result)
-
-    # Show top N
-    if 'Индекс' in result.columns:
-        out = result.sort_values('Индекс', ascending=False).reset_index(drop=True)
-        out.index = out.index + 1
-        print(f"\nTop {args.top} regions by Индекс:")
-        print(out[['Регион', 'Индекс']].head(args.top).to_string(index=True))
-
-    # Export if requested
-    if args.export:
+    if args.mapping:
         try:
-            p = Path(args.export)
-            if p.suffix == '':
-                p = p.with_suffix('.xlsx')
-            out.to_excel(p)
-            print(f"Exported results to {p}")
+            mapping = pd.read_excel(args.mapping)
         except Exception as e:
-            print(f"Failed to export: {e}")
-            return 5
+            print(f"Error loading mapping: {e}")
+            return 3
+        rollup_engine = RollupEngine.from_frame(mapping, mapping.columns[0], mapping.columns[1])
+    else:
+        rollup_engine = RollupEngine()
 
-    return 0
+    # Only the columns used by the selected indicators are read (see build_pipeline)
+    source = load_source(file_path, args)
+    code, result = compute_and_report(source, args, file_path.name, rollup_engine)
+    if args.watch and code != 3:
+        # Compare later saves against the source columns only, not the index or groups
+        df = None if result is None else result.drop(columns=list(RESULT_COLUMNS), errors='ignore')
+        return watch(file_path, df, result, args, rollup_engine)
+    return code
 
 
 if __name__ == '__main__':
@@ -0,0 +1,205 @@
+"""
+Модель таблицы результатов для QTableView поверх NumPy-массивов.
+
+Модель не хранит DataFrame и не создаёт строк Qt заранее: ячейки читаются
+из колонок-массивов по номеру строки в текущем представлении. Сортировка и
+фильтрация меняют только массив перестановки `view`.
+"""
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from src.config.settings import REQUIRED_COLUMN
+from src.core.aggregation import RollupEngine, DISTRICT_COLUMN
+
+# Сколько строк отдаётся представлению за один fetchMore
+FETCH_BATCH = 1000
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """
+    Виртуальная таблица результатов: регион, федеральный округ и числовые колонки.
+
+    Текстовые колонки хранятся как коды категорий (pd.factorize с сортировкой),
+    поэтому сортировка по ним - это argsort целых чисел, а фильтр по подстроке
+    проверяет только уникальные названия и переносится на строки индексацией.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._headers: List[str] = []
+        self._numeric: List[np.ndarray] = []
+        self._region_codes = np.empty(0, dtype=np.intp)
+        self._region_names = np.empty(0, dtype=object)
+        self._district_codes = np.empty(0, dtype=np.intp)
+        self._district_names: List[str] = []
+
+        self._order = np.empty(0, dtype=np.intp)   # все строки в порядке сортировки
+        self._view = np.empty(0, dtype=np.intp)    # отфильтрованные строки в порядке сортировки
+        self._loaded = 0
+        self._text = ""
+        self._district: Optional[int] = None
+        self._region_match = np.empty(0, dtype=bool)
+
+    # --- Данные ---
+
+    def set_frame(self, df: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                  engine: Optional[RollupEngine] = None):
+        """
+        Загружает результаты расчёта
+
+        Args:
+            df: Результаты с колонкой 'Регион'
+            columns: Числовые колонки (по умолчанию - все числовые, 'Индекс' первым)
+            engine: Справочник округов (по умолчанию - FEDERAL_DISTRICTS)
+        """
+        if columns is None:
+            columns = df.select_dtypes(include=[np.number]).columns.tolist()
+            if 'Индекс' in columns:
+                columns.remove('Индекс')
+                columns.insert(0, 'Индекс')
+        engine = engine or RollupEngine()
+
+        self.beginResetModel()
+        codes, names = pd.factorize(df[REQUIRED_COLUMN].to_numpy(), sort=True)
+        self._region_codes = codes.astype(np.intp)
+        self._region_names = np.asarray(names, dtype=object)
+        self._district_names = engine.districts
+        self._district_codes = engine.district_codes(engine.region_codes(df)).astype(np.intp)
+        self._numeric = [df[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in columns]
+        self._headers = [REQUIRED_COLUMN, DISTRICT_COLUMN] + list(columns)
+
+        self._order = np.arange(len(df), dtype=np.intp)
+        self._region_match = np.ones(len(self._region_names), dtype=bool)
+        self._text = ""
+        self._district = None
+        self._view = self._order
+        self._loaded = min(FETCH_BATCH, len(self._view))
+        self.endResetModel()
+
+    def clear(self):
+        """Очищает таблицу"""
+        self.set_frame(pd.DataFrame({REQUIRED_COLUMN: []}), columns=[])
+
+    @property
+    def districts(self) -> List[str]:
+        """Федеральные округа в порядке кодов"""
+        return list(self._district_names)
+
+    def source_rows(self) -> np.ndarray:
+        """Номера строк исходной таблицы в текущем представлении"""
+        return self._view
+
+    # --- Интерфейс QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._view)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(FETCH_BATCH, len(self._view) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._view[index.row()]
+        col = index.column()
+
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return str(self._region_names[self._region_codes[row]])
+            if col == 1:
+                return self._district_names[self._district_codes[row]]
+            value = self._numeric[col - 2][row]
+            return "" if np.isnan(value) else f"{value:.2f}"
+        if role == Qt.TextAlignmentRole and col >= 2:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._headers[section] if section < len(self._headers) else None
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Сортировка перестановкой индексов; данные колонок не копируются"""
+        if column < 0 or column >= len(self._headers):
+            return
+        if column == 0:
+            key = self._region_codes
+        elif column == 1:
+            key = self._district_codes
+        else:
+            key = self._numeric[column - 2]
+
+        self.layoutAboutToBeChanged.emit()
+        order_idx = np.argsort(key, kind='stable')
+        if order == Qt.DescendingOrder:
+            if column >= 2:
+                # NaN остаются в конце и при обратном порядке
+                nan = np.isnan(key[order_idx])
+                order_idx = np.concatenate((order_idx[~nan][::-1], order_idx[nan]))
+            else:
+                order_idx = order_idx[::-1]
+        self._order = order_idx
+        self._view = self._order[self._row_mask()[self._order]]
+        self.layoutChanged.emit()
+
+    # --- Фильтрация ---
+
+    def set_filter(self, text: str = "", district: Optional[int] = None):
+        """
+        Фильтр по подстроке названия региона и по федеральному округу
+
+        Если новый текст уточняет предыдущий (содержит его), проверяются только
+        названия, прошедшие прошлый фильтр; если не расширяется и фильтр по
+        округу - строки берутся только из текущего представления.
+
+        Args:
+            text: Подстрока названия региона (без учёта регистра)
+            district: Код федерального округа (None - все округа)
+        """
+        text = text.strip().lower()
+        text_narrows = self._text in text
+        narrowing = text_narrows and (self._district is None or district == self._district)
+
+        if text != self._text:
+            if text_narrows:
+                candidates = np.flatnonzero(self._region_match)
+            else:
+                candidates = np.arange(len(self._region_names))
+            match = np.zeros(len(self._region_names), dtype=bool)
+            match[candidates] = [text in str(self._region_names[i]).lower() for i in candidates]
+            self._region_match = match
+        self._text = text
+        self._district = district
+
+        self.beginResetModel()
+        rows = self._view if narrowing else self._order
+        self._view = rows[self._row_mask(rows)]
+        self._loaded = min(FETCH_BATCH, len(self._view))
+        self.endResetModel()
+
+    def _row_mask(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Какие строки (из rows или всех) проходят текущий фильтр"""
+        rows = slice(None) if rows is None else rows
+        mask = self._region_match[self._region_codes[rows]]
+        if self._district is not None:
+            mask &= self._district_codes[rows] == self._district
+        return mask
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.federal_districts import FEDERAL_DISTRICTS
+from src.core.backends import Backend, PandasBackend, METHODS, get_backend
+from src.core.calculator import CalculationError
+
+IMPUTES = ('skip', 'mean', 'district_mean', 'drop')
+COLUMNS = ['Показатель 1', 'Показатель 2', 'Показатель 3', 'Показатель 4']
+
+
+def make_frame(missing=True):
+    rng = np.random.default_rng(3)
+    regions = [r for regions in FEDERAL_DISTRICTS.values() for r in regions]
+    regions.append('Неизвестная территория')  # вне округов - «прочие»
+    df = pd.DataFrame({'Регион': regions})
+    for c in COLUMNS:
+        df[c] = rng.uniform(0, 100, len(regions))
+    df['Показатель 4'] = 5.0  # постоянный показатель
+    if missing:
+        for c in COLUMNS[:3]:
+            df.loc[rng.random(len(df)) < 0.1, c] = np.nan
+        df.loc[3, COLUMNS] = np.nan  # регион без единого значения
+    return df
+
+
+@pytest.fixture(scope='module')
+def polars_backend():
+    pytest.importorskip("polars")
+    return get_backend('polars')
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        Backend()
+
+    class Partial(Backend):
+        def read_excel(self, file_path, sheet=0, usecols=None):
+            return pd.DataFrame()
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+@pytest.mark.parametrize("impute", IMPUTES)
+@pytest.mark.parametrize("method", METHODS)
+def test_polars_matches_pandas(polars_backend, method, impute):
+    df = make_frame()
+    if method == 'pca' and impute == 'skip':
+        # PCA с пропусками не считается ни одним бэкендом
+        for backend in (PandasBackend(), polars_backend):
+            with pytest.raises(CalculationError):
+                backend.calculate_values(df, method, impute=impute)
+        return
+
+    expected = PandasBackend().calculate_values(df, method, impute=impute)
+    actual = polars_backend.calculate_values(df, method, impute=impute)
+
+    assert actual.shape == expected.shape == (len(df),)
+    assert np.array_equal(np.isnan(actual), np.isnan(expected))
+    assert np.allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+    if impute == 'drop':
+        # Исключённые регионы - NaN на своих местах, остальные - в исходном порядке
+        incomplete = df[COLUMNS].isna().any(axis=1).to_numpy()
+        assert incomplete.any()
+        assert np.isnan(actual[incomplete]).all()
+        assert not np.isnan(actual[~incomplete]).any()
+
+
+@pytest.mark.parametrize("method", [m for m in METHODS if m != 'pca'])
+def test_polars_weights_match_pandas(polars_backend, method):
+    df = make_frame()
+    weights = {'Показатель 1': 3, 'Показатель 2': 1, 'Показатель 3': 2}
+    columns = COLUMNS[:3]
+
+    expected = PandasBackend().calculate_values(df, method, weights, columns, impute='mean')
+    actual = polars_backend.calculate_values(df, method, weights, columns, impute='mean')
+
+    assert np.allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_polars_pca_rejects_weights(polars_backend):
+    with pytest.raises(CalculationError):
+        polars_backend.calculate_values(make_frame(missing=False), 'pca', {'Показатель 1': 1})
+
+
+def test_district_mean_requires_regions(polars_backend):
+    df = make_frame().drop(columns=['Регион'])
+    with pytest.raises(CalculationError):
+        polars_backend.calculate_values(df, 'cbr_method', impute='district_mean')
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.calculator import IndexCalculator, CalculationError
+
+N_THREADS = 16
+
+
+@pytest.fixture
+def calc():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Регион': [f"Регион {i}" for i in range(2000)],
+        'Показатель 1': rng.uniform(0, 100, 2000),
+        'Показатель 2': rng.uniform(0, 5, 2000),
+    })
+    return IndexCalculator(df)
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """Подсчёт вызовов _compute по методу; расчёт замедлен, чтобы потоки пересеклись"""
+    calls = Counter()
+    lock = threading.Lock()
+    original = IndexCalculator._compute
+
+    def compute(self, method, w):
+        with lock:
+            calls[method] += 1
+        time.sleep(0.05)
+        if method == 'broken':
+            raise CalculationError("Сбой расчёта")
+        return original(self, method, w)
+
+    monkeypatch.setattr(IndexCalculator, '_compute', compute)
+    return calls
+
+
+def run_together(fn, n=N_THREADS):
+    """Запускает fn в n потоках одновременно (через барьер); результаты или исключения"""
+    barrier = threading.Barrier(n)
+    outcomes = [None] * n
+
+    def worker(i):
+        barrier.wait()
+        try:
+            outcomes[i] = fn(i)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+    assert not any(t.is_alive() for t in threads)
+    return outcomes
+
+
+def test_single_compute_per_key(calc, counted):
+    results = run_together(lambda i: calc.calculate_values('cbr_method'))
+
+    assert counted['cbr_method'] == 1
+    assert all(r is results[0] for r in results)
+    assert not results[0].flags.writeable
+    # Повторный запрос - из кэша
+    assert calc.calculate_values('cbr_method') is results[0]
+    assert counted['cbr_method'] == 1
+
+
+def test_concurrent_distinct_keys(calc, counted):
+    methods = ['cbr_method', 'min_max_normalized', 'simple_average', 'winsorized']
+    weights = [None, {'Показатель 1': 2, 'Показатель 2': 1}]
+    keys = [(m, w) for m in methods for w in weights]
+
+    results = run_together(lambda i: calc.calculate_values(*keys[i % len(keys)]), n=4 * len(keys))
+
+    assert all(counted[m] == len(weights) for m in methods)
+    for i, result in enumerate(results):
+        first = results[i % len(keys)]
+        assert result is first
+        assert np.array_equal(result, calc.calculate_values(*keys[i % len(keys)]))
+
+
+def test_waiters_receive_leader_error(calc, counted):
+    outcomes = run_together(lambda i: calc.calculate_values('broken'))
+
+    assert counted['broken'] == 1
+    assert all(isinstance(e, CalculationError) for e in outcomes)
+    assert len({id(e) for e in outcomes}) == 1
+    # Ошибки не кэшируются: следующий запрос считается заново
+    with pytest.raises(CalculationError):
+        calc.calculate_values('broken')
+    assert counted['broken'] == 2
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core import clustering
+from src.core.calculator import IndexCalculator
+from src.core.clustering import ClusteringError, cluster_profiles
+
+pytest.importorskip("sklearn")
+
+N_INDICATORS = 4
+
+
+def make_blobs(rows, groups, seed=42):
+    """Строки вокруг известных центров профиля; truth - номер исходного центра"""
+    rng = np.random.default_rng(seed)
+    centres = rng.uniform(10, 90, (groups, N_INDICATORS))
+    truth = rng.integers(0, groups, rows)
+    block = centres[truth] + rng.normal(0, 3, (rows, N_INDICATORS))
+    df = pd.DataFrame(block, columns=[f"Показатель {j + 1}" for j in range(N_INDICATORS)])
+    df.insert(0, 'Регион', [f"Филиал {i}" for i in range(rows)])
+    return df, truth
+
+
+def purity(labels, truth):
+    present = labels >= 0
+    labels, truth = labels[present], truth[present]
+    table = np.zeros((labels.max() + 1, truth.max() + 1), dtype=np.int64)
+    np.add.at(table, (labels, truth), 1)
+    return table.max(axis=1).sum() / len(labels)
+
+
+def test_recovers_blobs_and_chooses_k():
+    df, truth = make_blobs(3000, 4)
+    result = cluster_profiles(IndexCalculator(df))
+
+    assert result.k == 4
+    assert purity(result.labels, truth) > 0.99
+    assert result.silhouette == max(result.scores.values())
+    # Группа 0 - самый высокий средний профиль
+    means = result.centers.mean(axis=1)
+    assert np.all(np.diff(means) <= 0)
+    assert result.sizes.sum() == len(df)
+
+
+def test_partial_fit_on_chunks(monkeypatch):
+    # Набор больше блока: центры подбираются partial_fit по пакетам
+    monkeypatch.setattr(clustering, 'CLUSTER_CHUNK_ROWS', 1000)
+    df, truth = make_blobs(5000, 3)
+    result = cluster_profiles(IndexCalculator(df), k=3, batch_size=256)
+
+    assert purity(result.labels, truth) > 0.99
+    assert result.inertia > 0
+
+
+def test_same_seed_same_groups():
+    df, _ = make_blobs(2000, 3)
+    first = cluster_profiles(IndexCalculator(df), k=3, seed=5)
+    second = cluster_profiles(IndexCalculator(df), k=3, seed=5)
+    assert np.array_equal(first.labels, second.labels)
+
+
+def test_dropped_rows_and_profiles():
+    df, _ = make_blobs(600, 3)
+    df.loc[[0, 10], 'Показатель 2'] = np.nan
+    calc = IndexCalculator(df, impute='drop')
+    result = cluster_profiles(calc, k=3)
+
+    assert (result.labels[[0, 10]] == -1).all()
+    numbers = result.group_numbers()
+    assert numbers[0] is pd.NA and numbers[1] == result.labels[1] + 1
+
+    profiles = result.profiles(calc.dataset.values)
+    assert profiles[clustering.CLUSTER_COLUMN].tolist() == [1, 2, 3]
+    assert profiles['Строк'].sum() == len(df) - 2
+    group = result.labels == 0
+    assert np.allclose(profiles.loc[0, 'Показатель 1'], df.loc[group, 'Показатель 1'].mean())
+
+
+def test_too_few_rows():
+    df, _ = make_blobs(3, 2)
+    with pytest.raises(ClusteringError, match="Недостаточно строк"):
+        cluster_profiles(IndexCalculator(df), k=5)
+
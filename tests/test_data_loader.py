@@ -0,0 +1,119 @@
+import re
+
+import numpy as np
+import pytest
+
+from src.core.data_loader import DataLoader, DataLoadError
+from src.core.validation import ValidationSchema
+
+openpyxl = pytest.importorskip("openpyxl")
+
+HEADER = ['Регион', 'Показатель 1', 'Показатель 2']
+
+
+def write_sheet(path, rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(HEADER)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+    return str(path)
+
+
+def data_rows(n, start=0):
+    return [[f"Регион {i}", float(i), float(2 * i)] for i in range(start, start + n)]
+
+
+def test_streaming_blank_row_inside_chunk_keeps_reading(tmp_path):
+    rows = data_rows(10) + [[None, None, None]] + data_rows(30, start=10)
+    path = write_sheet(tmp_path / "blank.xlsx", rows)
+
+    df = DataLoader().load_excel_streaming(path, chunk_size=20)
+
+    assert len(df) == 40
+    assert df['Регион'].tolist() == [f"Регион {i}" for i in range(40)]
+
+
+def test_streaming_empty_numeric_column_in_later_chunk(tmp_path):
+    rows = data_rows(20) + [[f"Регион {i}", float(i), None] for i in range(20, 30)]
+    path = write_sheet(tmp_path / "empty_column.xlsx", rows)
+
+    schema = ValidationSchema(allow_missing=True)
+    df = DataLoader(schema).load_excel_streaming(path, chunk_size=20)
+
+    assert len(df) == 30
+    assert df['Показатель 2'].dtype == np.float64
+    assert df['Показатель 2'].iloc[20:].isna().all()
+
+
+def test_streaming_matches_full_load(tmp_path):
+    path = write_sheet(tmp_path / "plain.xlsx", data_rows(45))
+    loader = DataLoader()
+
+    streamed = loader.load_excel_streaming(path, chunk_size=20)
+    full = loader.load_excel(path)
+
+    assert streamed.equals(full)
+
+
+def write_book(path, sheets):
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for name, rows in sheets.items():
+        ws = wb.create_sheet(name)
+        ws.append(HEADER)
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def book(tmp_path):
+    return write_book(tmp_path / "book.xlsx", {
+        'Q1 (2024)': data_rows(3),
+        'Q2 2024': data_rows(4),
+        'Справка': data_rows(2),
+    })
+
+
+def test_sheet_name_with_regex_characters_matches_itself(book):
+    result = DataLoader().load_workbook(book, sheets='Q1 (2024)', max_workers=1)
+    assert list(result) == ['Q1 (2024)']
+
+
+def test_sheet_regex_selector(book):
+    loader = DataLoader()
+    assert list(loader.load_workbook(book, sheets=r'Q\d .*', max_workers=1)) == ['Q1 (2024)', 'Q2 2024']
+    pattern = re.compile(r'Q\d.*')
+    assert list(loader.load_workbook(book, sheets=pattern, max_workers=1)) == ['Q1 (2024)', 'Q2 2024']
+
+
+def test_sheet_index_out_of_range(book):
+    with pytest.raises(DataLoadError, match="Нет листа с номером 5"):
+        DataLoader().load_workbook(book, sheets=[0, 5], max_workers=1)
+
+
+def test_unstacked_workbook_statistics_name_sheets(book):
+    loader = DataLoader()
+    loader.load_workbook(book, sheets=[0, 1], max_workers=1)
+    stats = loader.get_statistics()
+    assert stats['sheets'] == ['Q1 (2024)', 'Q2 2024']
+    assert stats['total_regions'] == 3
+
+
+def test_streaming_reads_selected_sheet(book):
+    loader = DataLoader()
+    assert loader.load_excel_streaming(book, sheet='Q2 2024', chunk_size=2).shape[0] == 4
+    assert loader.load_excel_streaming(book, sheet=2).shape[0] == 2
+    with pytest.raises(DataLoadError, match="Нет листа с номером 3"):
+        loader.load_excel_streaming(book, sheet=3)
+
+
+def test_streaming_pipeline_passes_sheet(book):
+    from src.core.pipeline import Pipeline, PipelineCache
+
+    pipeline = Pipeline.load(book, sheet='Q2 2024', stream=True, cache=PipelineCache())
+    assert len(pipeline.read()) == 4
+    assert "лист Q2 2024, потоково" in pipeline.explain()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.settings import COLORMAPS
+from src.export.colors import colorscale
+
+ALL_COLORMAPS = list(COLORMAPS) + [name + "_r" for name in COLORMAPS
+                                   if not name.endswith("_r") and name + "_r" not in COLORMAPS]
+
+
+@pytest.fixture
+def results():
+    return pd.DataFrame({
+        'Регион': ['Москва', 'Тверская область', 'Омская область'],
+        'Индекс': [80.0, 40.0, np.nan],
+    })
+
+
+@pytest.mark.parametrize("colormap", ALL_COLORMAPS)
+def test_colorscale_spans_0_to_1(colormap):
+    scale = colorscale(colormap)
+    assert scale[0][0] == 0.0 and scale[-1][0] == 1.0
+    assert all(color.startswith('#') and len(color) == 7 for _, color in scale)
+
+
+def test_reversed_colorscale():
+    forward = [color for _, color in colorscale("RdYlGn")]
+    assert [color for _, color in colorscale("RdYlGn_r")] == forward[::-1]
+
+
+@pytest.mark.parametrize("colormap", ALL_COLORMAPS)
+def test_html_heatmap_accepts_every_offered_colormap(colormap, results, tmp_path):
+    pytest.importorskip("plotly")
+    from src.export.html import write_heatmap_html
+
+    path = tmp_path / "heatmap.html"
+    write_heatmap_html(results, str(path), colormap=colormap)
+    assert path.stat().st_size > 0
+
+
+def test_html_heatmap_uses_one_heatmap_trace_per_district():
+    pytest.importorskip("plotly")
+    from src.config.federal_districts import FEDERAL_DISTRICTS
+    from src.export.html import build_heatmap_figure
+
+    regions = [r for d in FEDERAL_DISTRICTS.values() for r in d]
+    # Строки вне справочника (филиалы) в раскладку не попадают
+    branches = [f"Филиал {i}" for i in range(3000)]
+    df = pd.DataFrame({
+        'Регион': regions + branches,
+        'Индекс': np.linspace(0, 100, len(regions) + len(branches)),
+    })
+
+    fig = build_heatmap_figure(df)
+
+    assert [trace.type for trace in fig.data] == ['heatmap'] * len(FEDERAL_DISTRICTS)
+    cells = sum(int(np.count_nonzero(trace.text != "")) for trace in fig.data)
+    assert cells == len(regions)
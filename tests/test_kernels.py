@@ -0,0 +1,132 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src.core import jit, kernels
+from src.core.aggregation import grouped_stats
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+N_GROUPS = 9
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(42)
+    values = rng.uniform(0, 100, (5000, 4))
+    values[:, -1] = 7.0  # постоянный показатель
+    return values
+
+
+@pytest.fixture
+def sparse(values):
+    sparse = values.copy()
+    sparse[np.random.default_rng(1).random(sparse.shape) < 0.05] = np.nan
+    sparse[:, 1] = np.nan  # показатель без значений
+    sparse[0, 0] = np.nan  # пропуск в первой строке (начальное значение в JIT)
+    return sparse
+
+
+WEIGHTS = np.full(4, 0.25)
+
+
+def reference_minmax(values, weights, fill):
+    """Нормализация целиком через NumPy, пропуски - перераспределение весов"""
+    mins, maxs = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+    span = maxs - mins
+    with np.errstate(invalid='ignore', divide='ignore'):
+        norm = np.where(span > 0, (values - mins) / np.where(span > 0, span, 1), fill)
+    norm[np.isnan(values)] = np.nan
+    present = ~np.isnan(norm)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (np.where(present, norm, 0) @ weights) / (present @ weights)
+
+
+# --- NumPy-путь (выполняется всегда) ---
+
+def test_column_min_max_numpy(values, sparse, monkeypatch):
+    monkeypatch.setattr(jit, 'AVAILABLE', False)
+    mins, maxs = kernels.column_min_max(values)
+    assert np.array_equal(mins, values.min(axis=0)) and np.array_equal(maxs, values.max(axis=0))
+
+    # Без skipna NaN распространяется, со skipna - пропускается
+    mins, maxs = kernels.column_min_max(sparse)
+    assert np.isnan(mins).all() and np.isnan(maxs).all()
+    with np.errstate(invalid='ignore'), pytest.warns(RuntimeWarning):
+        expected = np.nanmin(sparse, axis=0)
+    mins, _ = kernels.column_min_max(sparse, skipna=True)
+    assert np.array_equal(mins, expected, equal_nan=True)
+
+
+@pytest.mark.parametrize("fill", [0.0, 0.5])
+def test_minmax_weighted_sum_numpy(values, sparse, fill, monkeypatch):
+    monkeypatch.setattr(jit, 'AVAILABLE', False)
+    assert np.allclose(kernels.minmax_weighted_sum(values, WEIGHTS, fill),
+                       reference_minmax(values, WEIGHTS, fill))
+    with pytest.warns(RuntimeWarning):
+        expected = reference_minmax(sparse, WEIGHTS, fill)
+    assert np.allclose(kernels.nan_minmax_weighted_sum(sparse, WEIGHTS, fill), expected, equal_nan=True)
+
+
+# --- Паритет numba и NumPy ---
+
+@pytest.fixture
+def numba_kernels():
+    pytest.importorskip("numba")
+    if not jit.AVAILABLE:
+        pytest.skip("numba отключена через FINTRUSTMAP_DISABLE_NUMBA")
+
+
+def both_paths(fn, monkeypatch):
+    """Результат fn с JIT-ядрами и с реализацией на NumPy"""
+    monkeypatch.setattr(jit, 'AVAILABLE', True)
+    compiled = fn()
+    monkeypatch.setattr(jit, 'AVAILABLE', False)
+    return compiled, fn()
+
+
+def test_column_min_max_parity(numba_kernels, values, sparse, monkeypatch):
+    for data in (values, sparse, values.astype(np.float32)):
+        compiled, fallback = both_paths(lambda: kernels.column_min_max(data), monkeypatch)
+        for a, b in zip(compiled, fallback):
+            assert a.dtype == b.dtype
+            assert np.array_equal(a, b, equal_nan=True)
+
+
+@pytest.mark.parametrize("fill", [0.0, 0.5])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_minmax_weighted_sum_parity(numba_kernels, values, fill, dtype, monkeypatch):
+    data = values.astype(dtype)
+    compiled, fallback = both_paths(lambda: kernels.minmax_weighted_sum(data, WEIGHTS, fill),
+                                    monkeypatch)
+    assert compiled.dtype == fallback.dtype == dtype
+    assert np.allclose(compiled, fallback, rtol=1e-5 if dtype == np.float32 else 1e-12)
+
+
+@pytest.mark.parametrize("fill", [0.0, 0.5])
+def test_nan_minmax_weighted_sum_parity(numba_kernels, sparse, fill, monkeypatch):
+    sparse[5] = np.nan  # строка без единого значения - NaN в обоих путях
+    compiled, fallback = both_paths(lambda: kernels.nan_minmax_weighted_sum(sparse, WEIGHTS, fill),
+                                    monkeypatch)
+    assert np.isnan(compiled[5]) and np.isnan(fallback[5])
+    assert np.allclose(compiled, fallback, rtol=1e-12, equal_nan=True)
+
+
+def test_grouped_stats_parity(numba_kernels, monkeypatch):
+    rng = np.random.default_rng(7)
+    codes = rng.integers(0, N_GROUPS, 5000).astype(np.int32)
+    index = rng.uniform(0, 100, 5000)
+    compiled, fallback = both_paths(lambda: grouped_stats(codes, index, N_GROUPS), monkeypatch)
+    assert compiled.keys() == fallback.keys()
+    for key in compiled:
+        assert np.allclose(compiled[key], fallback[key], equal_nan=True)
+
+
+def test_disable_numba_environment_variable(numba_kernels):
+    code = "from src.core import jit; print(jit.AVAILABLE)"
+    env = dict(os.environ, FINTRUSTMAP_DISABLE_NUMBA="1")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.settings import POPULATION_COLUMN, SHEET_COLUMN
+from src.core.calculator import IndexCalculator
+from src.core.data_loader import DataLoadError
+from src.core.dataset import CompactDataset, indicator_columns
+from src.core.pipeline import Pipeline, PipelineCache
+from src.core.validation import ValidationSchema
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Регион': [f"Регион {i}" for i in range(12)],
+        'Показатель 1': rng.uniform(0, 100, 12),
+        'Показатель 2': rng.uniform(0, 5, 12),
+    })
+
+
+def test_service_columns_are_not_indicators(frame):
+    extended = frame.assign(**{POPULATION_COLUMN: np.arange(12) * 1e5 + 1e5, SHEET_COLUMN: 1})
+    assert indicator_columns(extended) == ['Показатель 1', 'Показатель 2']
+    assert CompactDataset.from_dataframe(extended).columns == ['Показатель 1', 'Показатель 2']
+
+    expected = IndexCalculator(frame).calculate_values('cbr_method')
+    assert np.allclose(IndexCalculator(extended).calculate_values('cbr_method'), expected)
+
+
+def test_population_does_not_change_pipeline_index(frame):
+    extended = frame.assign(**{POPULATION_COLUMN: np.arange(12) * 1e5 + 1e5})
+    plain = Pipeline.from_frame(frame).index('cbr_method').aggregate().collect()
+    weighted = Pipeline.from_frame(extended).index('cbr_method').aggregate().collect()
+    assert weighted.columns == ['Показатель 1', 'Показатель 2']
+    assert np.allclose(weighted.values, plain.values)
+
+
+def test_file_cache_is_keyed_by_schema_value(frame, tmp_path):
+    pytest.importorskip("openpyxl")
+    path = tmp_path / "gaps.xlsx"
+    frame.loc[3, 'Показатель 2'] = np.nan
+    frame.to_excel(path, index=False)
+    cache = PipelineCache()
+
+    lenient = Pipeline.load(path, schema=ValidationSchema(allow_missing=True), cache=cache).read()
+    # Другой объект с теми же требованиями - та же таблица из кэша
+    again = Pipeline.load(path, schema=ValidationSchema(allow_missing=True), cache=cache).read()
+    assert again is lenient
+
+    # Более строгая схема не получает таблицу, загруженную с пропусками
+    with pytest.raises(DataLoadError):
+        Pipeline.load(path, schema=ValidationSchema(), cache=cache).read()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from src.core.ranking import bottom_n, compare_ranks, ranks, top_n
+
+
+def make_results(values):
+    return pd.DataFrame({
+        'Регион': [f"Регион {i}" for i in range(len(values))],
+        'Индекс': values,
+    })
+
+
+def test_bottom_n_ranks_skip_missing_values():
+    df = make_results([50.0, np.nan, 10.0, 30.0, np.nan, 70.0])
+
+    bottom = bottom_n(df, 2)
+    assert bottom['Регион'].tolist() == ['Регион 2', 'Регион 3']
+    assert bottom.index.tolist() == [4, 3]
+    # Места совпадают с полным рейтингом
+    full = ranks(df['Индекс'].to_numpy())
+    assert full[[2, 3]].tolist() == [4, 3]
+
+    # Строки без значения в антитоп не попадают
+    assert bottom_n(df, 10).index.tolist() == [4, 3, 2, 1]
+    assert bottom_n(df, 10)['Индекс'].notna().all()
+    assert top_n(df, 2).index.tolist() == [1, 2]
+
+
+def test_compare_ranks_with_duplicate_previous_regions():
+    previous = pd.DataFrame({
+        'Регион': ['Москва', 'Тверская область', 'Москва', 'Омская область'],
+        'Индекс': [90.0, 40.0, 10.0, 60.0],
+    })
+    current = pd.DataFrame({
+        'Регион': ['Москва', 'Тверская область', 'Омская область', 'Томская область'],
+        'Индекс': [50.0, 70.0, 60.0, 20.0],
+    })
+
+    comparison = compare_ranks(previous, current).set_index('Регион')
+
+    # Учитывается первая строка региона, повтор не занимает место в рейтинге
+    assert comparison.loc['Москва', 'Индекс (пред.)'] == 90.0
+    assert comparison['Ранг (пред.)'].tolist()[:3] == [1.0, 3.0, 2.0]
+    assert comparison.loc['Тверская область', 'Δ Ранг'] == 2.0
+    assert np.isnan(comparison.loc['Томская область', 'Ранг (пред.)'])
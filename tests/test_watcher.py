@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.pipeline import Pipeline, RESULT_COLUMNS
+from src.core.watcher import diff_frames
+
+
+def make_frame():
+    return pd.DataFrame({
+        'Регион': ['Москва', 'Тверская область', 'Омская область'],
+        'Показатель 1': [1.0, 2.0, np.nan],
+        'Показатель 2': [10.0, 20.0, 30.0],
+    })
+
+
+def test_unchanged_file_after_index_is_empty():
+    source = make_frame()
+    result = Pipeline.from_frame(source).index('cbr_method').cluster(2).collect().frame
+    assert {'Индекс', 'Группа'} <= set(result.columns)
+
+    diff = diff_frames(result.drop(columns=list(RESULT_COLUMNS), errors='ignore'), make_frame())
+    assert diff.is_empty
+
+
+def test_changed_added_removed():
+    old = make_frame()
+    new = make_frame()
+    new.loc[1, 'Показатель 2'] = 21.0
+    new.loc[2, 'Регион'] = 'Томская область'
+
+    diff = diff_frames(old, new)
+    assert diff.changed == ['Тверская область']
+    assert diff.added == ['Томская область']
+    assert diff.removed == ['Омская область']
+    assert not diff.columns_changed
+
+
+def test_duplicate_regions_are_reported_as_changed():
+    old = make_frame()
+    new = pd.concat([make_frame(), make_frame().iloc[[0]]], ignore_index=True)
+
+    diff = diff_frames(old, new)
+    assert diff.changed == ['Москва']
+    assert diff.added == [] and diff.removed == []
+
+
+class SavingWatcher:
+    """Вместо опроса файла - заданные сохранения книги и вызов обработчика"""
+    saves = []
+
+    def __init__(self, file_path, callback):
+        self.file_path = file_path
+        self.callback = callback
+
+    def run(self):
+        for save in self.saves:
+            save(self.file_path)
+            self.callback(self.file_path)
+
+    def stop(self):
+        pass
+
+
+def write_quarters(path, frame):
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    notes = wb.active
+    notes.title = 'Справка'
+    notes.append(['Регион', 'Комментарий'])
+    notes.append(['Москва', 'не для расчёта'])
+    ws = wb.create_sheet('Q1')
+    ws.append(list(frame.columns))
+    for row in frame.itertuples(index=False):
+        ws.append([None if isinstance(v, float) and np.isnan(v) else v for v in row])
+    wb.save(path)
+
+
+def test_cli_watch_reloads_selected_sheet(tmp_path, monkeypatch, capsys):
+    from src.ui import cli
+
+    path = tmp_path / "quarters.xlsx"
+    write_quarters(path, make_frame())
+    changed = make_frame()
+    changed.loc[1, 'Показатель 2'] = 21.0
+    SavingWatcher.saves = [lambda p: write_quarters(p, make_frame()),
+                           lambda p: write_quarters(p, changed)]
+    monkeypatch.setattr(cli, 'FileWatcher', SavingWatcher)
+
+    code = cli.run_cli(['--file', str(path), '--sheet', 'Q1', '--impute', 'mean',
+                        '--columns', 'Показатель 1,Показатель 2', '--watch'])
+    out = capsys.readouterr().out
+
+    assert code == 0
+    assert "Error loading data" not in out
+    assert "quarters.xlsx saved, data unchanged" in out
+    assert "quarters.xlsx changed: +0 -0 ~1 regions\n" in out